@@ -4,7 +4,10 @@ Admin configuration for accounting app.
 from django.contrib import admin
 from .models import (
     Invoice, InvoiceItem, Payment, SupplierPayment, Expense,
-    AccountReceivable, AccountPayable
+    AccountReceivable, AccountPayable, NumberSequence, IdempotencyKey,
+    BankStatement, BankStatementLine, ReceivableAging, PayableAging, OverdueSweepRun,
+    LedgerAccount, JournalEntry, JournalLine,
+    FinancialPeriod, PeriodRevenueSnapshot, PeriodExpenseSnapshot
 )
 
 
@@ -17,7 +20,7 @@ class InvoiceAdmin(admin.ModelAdmin):
     list_filter = ['status', 'payment_terms', 'invoice_date', 'due_date']
     search_fields = ['invoice_number', 'customer__first_name', 'customer__last_name', 'job_order__job_number']
     list_editable = ['status']
-    readonly_fields = ['invoice_number', 'invoice_date', 'updated_at', 'balance_due']
+    readonly_fields = ['invoice_number', 'invoice_date', 'updated_at', 'balance_due', 'overdue_since']
     raw_id_fields = ['customer', 'job_order', 'created_by']
     date_hierarchy = 'invoice_date'
     
@@ -26,7 +29,7 @@ class InvoiceAdmin(admin.ModelAdmin):
             'fields': ('invoice_number', 'customer', 'job_order', 'status', 'payment_terms')
         }),
         ('Dates', {
-            'fields': ('invoice_date', 'due_date', 'paid_date')
+            'fields': ('invoice_date', 'due_date', 'paid_date', 'overdue_since')
         }),
         ('Financial', {
             'fields': ('subtotal', 'tax_rate', 'tax_amount', 'discount_amount', 'total_amount', 'paid_amount', 'balance_due')
@@ -119,3 +122,157 @@ class AccountPayableAdmin(admin.ModelAdmin):
     raw_id_fields = ['supplier', 'purchase_order']
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'due_date'
+
+
+@admin.register(NumberSequence)
+class NumberSequenceAdmin(admin.ModelAdmin):
+    """
+    Number Sequence admin interface.
+    """
+    list_display = ['prefix', 'last_number', 'updated_at']
+    search_fields = ['prefix']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    """
+    Idempotency key admin interface.
+    """
+    list_display = ['key', 'user', 'created_at']
+    search_fields = ['key']
+    raw_id_fields = ['user']
+    readonly_fields = ['key', 'request_hash', 'response_body', 'created_at']
+
+
+@admin.register(BankStatement)
+class BankStatementAdmin(admin.ModelAdmin):
+    """
+    Bank statement admin interface.
+    """
+    list_display = ['source_name', 'line_count', 'matched_count', 'uploaded_by', 'created_at']
+    search_fields = ['source_name']
+    raw_id_fields = ['uploaded_by']
+    readonly_fields = ['created_at']
+
+
+@admin.register(BankStatementLine)
+class BankStatementLineAdmin(admin.ModelAdmin):
+    """
+    Bank statement line admin interface.
+    """
+    list_display = ['statement', 'line_number', 'transaction_date', 'amount', 'reference', 'match_type', 'payment', 'invoice']
+    list_filter = ['match_type', 'transaction_date']
+    search_fields = ['reference', 'transaction_id', 'description']
+    raw_id_fields = ['statement', 'payment', 'invoice']
+    readonly_fields = ['matched_at']
+
+
+@admin.register(ReceivableAging)
+class ReceivableAgingAdmin(admin.ModelAdmin):
+    """
+    Receivable aging admin interface.
+    """
+    list_display = ['customer', 'current', 'days_1_30', 'days_31_60', 'days_61_90', 'days_over_90', 'total', 'as_of']
+    search_fields = ['customer__first_name', 'customer__last_name']
+    raw_id_fields = ['customer']
+    readonly_fields = ['refreshed_at']
+
+
+@admin.register(PayableAging)
+class PayableAgingAdmin(admin.ModelAdmin):
+    """
+    Payable aging admin interface.
+    """
+    list_display = ['supplier', 'current', 'days_1_30', 'days_31_60', 'days_61_90', 'days_over_90', 'total', 'as_of']
+    search_fields = ['supplier__name']
+    raw_id_fields = ['supplier']
+    readonly_fields = ['refreshed_at']
+
+
+@admin.register(OverdueSweepRun)
+class OverdueSweepRunAdmin(admin.ModelAdmin):
+    """
+    Overdue sweep run admin interface.
+    """
+    list_display = ['started_at', 'invoices_marked', 'customers_affected', 'balance_marked', 'duration']
+    date_hierarchy = 'started_at'
+    readonly_fields = ['started_at', 'duration', 'invoices_marked', 'customers_affected', 'balance_marked']
+
+
+@admin.register(LedgerAccount)
+class LedgerAccountAdmin(admin.ModelAdmin):
+    """
+    Ledger account admin interface.
+    """
+    list_display = ['code', 'name', 'account_type', 'balance', 'last_entry_date', 'is_active']
+    list_filter = ['account_type', 'is_active']
+    search_fields = ['code', 'name']
+    readonly_fields = ['balance', 'last_entry_date']
+
+
+class JournalLineInline(admin.TabularInline):
+    """
+    Journal line inline admin.
+    """
+    model = JournalLine
+    fields = ['account', 'debit', 'credit', 'balance_after']
+    readonly_fields = fields
+    can_delete = False
+    extra = 0
+
+
+@admin.register(JournalEntry)
+class JournalEntryAdmin(admin.ModelAdmin):
+    """
+    Journal entry admin interface; entries are read-only.
+    """
+    list_display = ['id', 'entry_date', 'source_type', 'source_id', 'description', 'posted_at']
+    list_filter = ['source_type', 'entry_date']
+    search_fields = ['description']
+    date_hierarchy = 'entry_date'
+    inlines = [JournalLineInline]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class PeriodRevenueSnapshotInline(admin.TabularInline):
+    """
+    Period revenue snapshot inline admin.
+    """
+    model = PeriodRevenueSnapshot
+    readonly_fields = ['payment_method', 'payment_count', 'amount']
+    can_delete = False
+    extra = 0
+
+
+class PeriodExpenseSnapshotInline(admin.TabularInline):
+    """
+    Period expense snapshot inline admin.
+    """
+    model = PeriodExpenseSnapshot
+    readonly_fields = ['category', 'expense_count', 'amount']
+    can_delete = False
+    extra = 0
+
+
+@admin.register(FinancialPeriod)
+class FinancialPeriodAdmin(admin.ModelAdmin):
+    """
+    Financial period admin interface; periods are closed with the close_period command or API.
+    """
+    list_display = ['__str__', 'revenue_total', 'expense_total', 'net_income', 'receivables_balance', 'payables_balance', 'closed_at']
+    list_filter = ['year']
+    raw_id_fields = ['closed_by']
+    readonly_fields = [
+        'year', 'month', 'start_date', 'end_date', 'revenue_total', 'payment_count', 'expense_total',
+        'expense_count', 'net_income', 'receivables_balance', 'payables_balance', 'closed_at',
+    ]
+    inlines = [PeriodRevenueSnapshotInline, PeriodExpenseSnapshotInline]
@@ -0,0 +1,138 @@
+"""
+Receivable and payable aging for Car ERP System.
+"""
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from django.db.models import Min, Q, Sum
+from django.utils import timezone
+from vehicles.models import ScanWatermark
+from .models import Invoice, AccountPayable, ReceivableAging, PayableAging
+
+# Bucket field and the first and last day past due it covers (None is open-ended).
+BUCKETS = [
+    ('current', None, 0),
+    ('days_1_30', 1, 30),
+    ('days_31_60', 31, 60),
+    ('days_61_90', 61, 90),
+    ('days_over_90', 91, None),
+]
+
+# Ledger name: (source rows, outstanding amount field, aging table, counterparty field).
+# Receivables age the unpaid balance of issued invoices, which payments keep current.
+LEDGERS = {
+    'receivable': (Invoice.objects.exclude(status__in=['draft', 'cancelled']), 'balance_due', ReceivableAging, 'customer'),
+    'payable': (AccountPayable.objects.all(), 'current_amount', PayableAging, 'supplier'),
+}
+
+WATERMARK_NAME = 'aging_rollover'
+
+# After a gap longer than this every bucket may have shifted, so everything is re-aged.
+FULL_REFRESH_AFTER_DAYS = 90
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def bucket_filters(today):
+    """Condition on due_date for each bucket; an amount due today is current."""
+    filters = {}
+    for name, first, last in BUCKETS:
+        condition = Q()
+        if first is not None:
+            condition &= Q(due_date__lt=day_start(today - timedelta(days=first - 1)))
+        if last is not None:
+            condition &= Q(due_date__gte=day_start(today - timedelta(days=last)))
+        filters[name] = condition
+    return filters
+
+
+def refresh_on_commit(ledger, party_ids):
+    """Refresh the aging rows of these counterparties once the current transaction commits."""
+    party_ids = set(party_ids)
+    if party_ids:
+        transaction.on_commit(lambda: refresh_aging(ledger, party_ids))
+
+
+def refresh_aging(ledger, party_ids=None, today=None):
+    """
+    Recompute the aging rows of the given counterparties, or of all of them.
+
+    One grouped aggregate over the open ledger rows feeds an upsert;
+    counterparties left with nothing outstanding lose their row. Returns
+    the number of rows written.
+    """
+    source, amount, target, party = LEDGERS[ledger]
+    today = today or timezone.localdate()
+    rows = source.filter(**{f'{amount}__gt': 0})
+    scope = target.objects.all()
+    if party_ids is not None:
+        party_ids = set(party_ids)
+        rows = rows.filter(**{f'{party}__in': party_ids})
+        scope = scope.filter(**{f'{party}__in': party_ids})
+
+    buckets = {
+        name: Sum(amount, filter=condition, default=0)
+        for name, condition in bucket_filters(today).items()
+    }
+    aggregated = rows.order_by().values(party).annotate(
+        total=Sum(amount), oldest_due_date=Min('due_date'), **buckets
+    )
+    aging = [
+        target(**{f'{party}_id': values.pop(party)}, as_of=today, **values)
+        for values in aggregated
+    ]
+
+    started = timezone.now()
+    with transaction.atomic():
+        target.objects.bulk_create(
+            aging, batch_size=1000, update_conflicts=True, unique_fields=[party],
+            update_fields=[name for name, first, last in BUCKETS] + ['total', 'oldest_due_date', 'as_of', 'refreshed_at'],
+        )
+        scope.filter(refreshed_at__lt=started).delete()
+    return len(aging)
+
+
+def crossed_boundaries(ledger, since, today):
+    """Counterparties with an open amount that moved to an older bucket after `since`, up to `today`."""
+    source, amount, target, party = LEDGERS[ledger]
+    crossed = Q()
+    for name, first, last in BUCKETS:
+        if first is not None:
+            # Due on D, the amount enters this bucket on D + first.
+            crossed |= Q(
+                due_date__gte=day_start(since - timedelta(days=first - 1)),
+                due_date__lt=day_start(today - timedelta(days=first - 1)),
+            )
+    return set(
+        source.filter(crossed, **{f'{amount}__gt': 0}).values_list(f'{party}_id', flat=True).distinct()
+    )
+
+
+def roll_over(today=None, full=False):
+    """
+    Re-age for a new day.
+
+    Only counterparties with an amount that crossed a bucket boundary
+    since the last run are refreshed; the first run, a long gap or `full`
+    refreshes everything. Returns rows refreshed per ledger.
+    """
+    today = today or timezone.localdate()
+    refreshed = {}
+    with transaction.atomic():
+        watermark, created = ScanWatermark.objects.select_for_update().get_or_create(
+            name=WATERMARK_NAME, defaults={'scanned_through': today}
+        )
+        since = watermark.scanned_through
+        full = full or created or (today - since).days > FULL_REFRESH_AFTER_DAYS
+        for ledger in LEDGERS:
+            if full:
+                refreshed[ledger] = refresh_aging(ledger, today=today)
+            elif since < today:
+                refreshed[ledger] = refresh_aging(ledger, crossed_boundaries(ledger, since, today), today=today)
+            else:
+                refreshed[ledger] = 0
+        if today > since:
+            watermark.scanned_through = today
+            watermark.save(update_fields=['scanned_through', 'updated_at'])
+    return refreshed
@@ -0,0 +1,11 @@
+"""
+App configuration for accounting app.
+"""
+from django.apps import AppConfig
+
+
+class AccountingConfig(AppConfig):
+    name = 'accounting'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,260 @@
+"""
+Invoice and statement documents for Car ERP System.
+"""
+import hashlib
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from itertools import repeat
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from customers.models import Customer
+from . import pdf
+from .aging import day_start
+from .models import Invoice, Payment
+
+# Bump when a layout changes so cached files are rendered again.
+TEMPLATE_VERSION = 3
+
+STORAGE_PREFIX = 'documents'
+
+ISSUED_STATUSES = ['sent', 'paid', 'overdue']
+
+
+def money(value):
+    return f'{Decimal(value or 0):,.2f}'
+
+
+def day(value):
+    return timezone.localdate(value).isoformat() if value else ''
+
+
+def company_lines():
+    lines = [settings.COMPANY_NAME] + list(settings.COMPANY_ADDRESS)
+    contact = ' | '.join(value for value in [settings.COMPANY_PHONE, settings.COMPANY_EMAIL] if value)
+    if contact:
+        lines.append(contact)
+    if settings.COMPANY_TAX_ID:
+        lines.append(f'Tax ID: {settings.COMPANY_TAX_ID}')
+    return lines
+
+
+def customer_lines(customer):
+    lines = [customer.full_name]
+    if customer.company_name:
+        lines.append(customer.company_name)
+    lines.append(customer.address_line1)
+    if customer.address_line2:
+        lines.append(customer.address_line2)
+    lines.append(f'{customer.city}, {customer.state} {customer.postal_code}')
+    return lines
+
+
+def invoice_payload(invoice):
+    """Everything printed on an invoice, as strings; expects customer and items loaded."""
+    return {
+        'company': company_lines(),
+        'bill_to': customer_lines(invoice.customer),
+        'meta': {
+            'invoice_number': invoice.invoice_number,
+            'invoice_date': day(invoice.invoice_date),
+            'due_date': day(invoice.due_date),
+            'payment_terms': invoice.get_payment_terms_display(),
+        },
+        'rows': [
+            {
+                'description': item.description,
+                'quantity': f'{Decimal(item.quantity).normalize():f}',
+                'unit_price': money(item.unit_price),
+                'total': money(item.total_price),
+            }
+            for item in invoice.items.all()
+        ],
+        'totals': {
+            'subtotal': money(invoice.subtotal),
+            'discount_amount': money(invoice.discount_amount),
+            'tax_amount': money(invoice.tax_amount),
+            'total_amount': money(invoice.total_amount),
+            'paid_amount': money(invoice.paid_amount),
+            'balance_due': money(invoice.balance_due),
+        },
+        'notes': [line for line in (invoice.terms_conditions or '').splitlines() if line.strip()],
+    }
+
+
+def statement_payloads(start, end, customer_ids=None):
+    """
+    Yield (customer id, statement payload) for customers with a balance or activity.
+
+    The opening balances, the period's invoices and payments and the
+    customers are each read with one query, whatever the customer count.
+    """
+    start_at = day_start(start)
+    end_at = day_start(end + timedelta(days=1))
+    invoices = Invoice.objects.filter(status__in=ISSUED_STATUSES)
+    payments = Payment.objects.filter(status='completed').annotate(paid_on=Coalesce('processed_date', 'payment_date'))
+    if customer_ids is not None:
+        invoices = invoices.filter(customer_id__in=customer_ids)
+        payments = payments.filter(customer_id__in=customer_ids)
+
+    opening = defaultdict(Decimal)
+    for customer_id, total in invoices.filter(invoice_date__lt=start_at).order_by().values_list('customer_id').annotate(
+        total=Sum('total_amount')
+    ):
+        opening[customer_id] += total
+    for customer_id, total in payments.filter(paid_on__lt=start_at).order_by().values_list('customer_id').annotate(
+        total=Sum('amount')
+    ):
+        opening[customer_id] -= total
+
+    activity = defaultdict(list)
+    for customer_id, when, number, amount in invoices.filter(
+        invoice_date__gte=start_at, invoice_date__lt=end_at
+    ).values_list('customer_id', 'invoice_date', 'invoice_number', 'total_amount'):
+        activity[customer_id].append((when, f'Invoice {number}', amount, None))
+    for customer_id, when, number, invoice_number, amount in payments.filter(
+        paid_on__gte=start_at, paid_on__lt=end_at
+    ).values_list('customer_id', 'paid_on', 'payment_number', 'invoice__invoice_number', 'amount'):
+        activity[customer_id].append((when, f'Payment {number} - Invoice {invoice_number}', None, amount))
+
+    party_ids = {customer_id for customer_id, balance in opening.items() if balance} | set(activity)
+    company = company_lines()
+    period = f'{start.isoformat()} to {end.isoformat()}'
+    for customer in Customer.objects.filter(pk__in=party_ids).order_by('pk').iterator(chunk_size=2000):
+        balance = opening[customer.pk]
+        charges = payments_total = Decimal('0')
+        rows = []
+        for when, reference, charge, payment in sorted(activity[customer.pk], key=lambda line: line[0]):
+            balance += (charge or 0) - (payment or 0)
+            charges += charge or 0
+            payments_total += payment or 0
+            rows.append({
+                'date': day(when),
+                'reference': reference,
+                'charges': money(charge) if charge is not None else '',
+                'payments': money(payment) if payment is not None else '',
+                'balance': money(balance),
+            })
+        yield customer.pk, {
+            'company': company,
+            'bill_to': customer_lines(customer),
+            'meta': {
+                'customer_number': str(customer.pk),
+                'period': period,
+                'statement_date': end.isoformat(),
+            },
+            'rows': rows,
+            'totals': {
+                'opening_balance': money(opening[customer.pk]),
+                'charges': money(charges),
+                'payments': money(payments_total),
+                'closing_balance': money(balance),
+            },
+            'notes': [],
+        }
+
+
+def content_hash(name, payload):
+    """Hash of the layout version, the fonts and everything printed, naming the cached file."""
+    data = json.dumps([TEMPLATE_VERSION, pdf_fonts(), name, payload], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def storage_path(name, digest):
+    return f'{STORAGE_PREFIX}/{name}/{digest[:2]}/{digest}.pdf'
+
+
+def pdf_fonts():
+    return settings.PDF_FONT_REGULAR, settings.PDF_FONT_BOLD
+
+
+def get_or_render(name, payload, digest=None):
+    """PDF bytes for a payload, from the storage cache or rendered here and cached."""
+    path = storage_path(name, digest or content_hash(name, payload))
+    if default_storage.exists(path):
+        with default_storage.open(path, 'rb') as cached:
+            return cached.read()
+    content = pdf.render(name, payload, pdf_fonts())
+    default_storage.save(path, ContentFile(content))
+    return content
+
+
+def render_batch(name, payloads, workers=None):
+    """
+    Render and cache every payload that is not cached yet.
+
+    `payloads` yields (key, payload). Uncached documents are rendered in a
+    process pool of `workers` processes, each compiling the template once.
+    Returns {key: storage path} and counts of rendered and cached
+    documents with elapsed seconds.
+    """
+    workers = workers or settings.PDF_RENDER_WORKERS
+    started = time.monotonic()
+    paths = {}
+    missing = []
+    for key, payload in payloads:
+        path = storage_path(name, content_hash(name, payload))
+        paths[key] = path
+        if not default_storage.exists(path):
+            missing.append((path, payload))
+
+    documents = [payload for path, payload in missing]
+    # A few chunks per worker keeps the pool busy without a round trip per document.
+    chunksize = max(1, len(documents) // (workers * 4))
+    if workers > 1 and len(documents) > workers:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rendered = executor.map(pdf.render, repeat(name), documents, repeat(pdf_fonts()), chunksize=chunksize)
+            for (path, payload), content in zip(missing, rendered):
+                default_storage.save(path, ContentFile(content))
+    else:
+        for path, payload in missing:
+            default_storage.save(path, ContentFile(pdf.render(name, payload, pdf_fonts())))
+    return paths, {
+        'documents': len(paths),
+        'rendered': len(missing),
+        'cached': len(paths) - len(missing),
+        'elapsed': time.monotonic() - started,
+    }
+
+
+def render_invoices(queryset, workers=None):
+    """Render the PDFs of every invoice in `queryset`; see render_batch."""
+    invoices = queryset.select_related('customer').prefetch_related('items')
+    return render_batch('invoice', ((invoice.pk, invoice_payload(invoice)) for invoice in invoices), workers)
+
+
+def render_statements(start, end, customer_ids=None, workers=None):
+    """Render the period's statement of every customer with a balance or activity; see render_batch."""
+    return render_batch('statement', statement_payloads(start, end, customer_ids), workers)
+
+
+def report_payload(name, generated_at, data):
+    """Flatten report data into label/value rows for the report layout."""
+    rows = []
+
+    def flatten(prefix, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                flatten(f'{prefix} / {key}' if prefix else str(key), item)
+        elif isinstance(value, (list, tuple)):
+            for index, item in enumerate(value, start=1):
+                flatten(f'{prefix} #{index}', item)
+        else:
+            rows.append({'label': prefix.replace('_', ' '), 'value': '' if value is None else str(value)})
+
+    flatten('', data)
+    return {
+        'company': company_lines(),
+        'bill_to': [],
+        'meta': {'name': name, 'generated_at': generated_at.strftime('%Y-%m-%d %H:%M')},
+        'rows': rows,
+        'totals': {},
+        'notes': [],
+    }
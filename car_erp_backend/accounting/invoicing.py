@@ -0,0 +1,110 @@
+"""
+Job order invoicing for Car ERP System.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.utils import timezone
+from job_orders.models import JobOrder, JobOrderItem
+from . import stats
+from .models import Invoice, InvoiceItem, NumberSequence, monthly_prefix, round_money
+
+
+def invoice_item_from_job_item(item):
+    """Build an unsaved InvoiceItem mirroring a JobOrderItem."""
+    if item.item_type == 'labor' and item.hours_worked and item.hourly_rate:
+        quantity, unit_price = item.hours_worked, item.hourly_rate
+    else:
+        quantity, unit_price = item.quantity, item.unit_price
+    return InvoiceItem(
+        description=item.name,
+        quantity=quantity,
+        unit_price=unit_price,
+        total_price=item.total_price,
+        notes=item.description,
+    )
+
+
+def create_invoices_for_job_orders(job_ids, user, tax_rate=Decimal('0'), payment_terms='due_on_receipt'):
+    """
+    Create one invoice per delivered job order, copying its items.
+
+    Invoices and their items are written with two bulk inserts inside a
+    single transaction, invoice numbers are reserved in one allocation and
+    totals are computed in the same pass that builds the items.
+
+    Job orders are locked while they are checked and invoiced, so two
+    concurrent batches cannot both invoice the same job.
+
+    Returns a tuple of (created invoices, skipped job orders with reasons).
+    """
+    tax_rate = Decimal(tax_rate)
+    if not tax_rate.is_finite() or not 0 <= tax_rate <= 100:
+        raise ValueError('tax_rate must be between 0 and 100')
+    skipped = []
+    job_ids = list(dict.fromkeys(job_ids))
+    now = timezone.now()
+    due_date = now + timedelta(days=Invoice.PAYMENT_TERMS_DAYS.get(payment_terms, 0))
+
+    with transaction.atomic():
+        job_orders = {
+            job.id: job for job in JobOrder.objects.select_for_update().filter(pk__in=job_ids).order_by('pk').only(
+                'id', 'job_number', 'status', 'customer_id'
+            )
+        }
+        invoiced_ids = set(
+            Invoice.objects.filter(job_order_id__in=job_orders).exclude(status='cancelled').values_list('job_order_id', flat=True)
+        )
+
+        eligible = []
+        for job_id in job_ids:
+            job = job_orders.get(job_id)
+            if job is None:
+                skipped.append({'job_order': job_id, 'reason': 'Job order not found'})
+            elif job.status != 'delivered':
+                skipped.append({'job_order': job.id, 'reason': f'Job order is {job.status}, not delivered'})
+            elif job.id in invoiced_ids:
+                skipped.append({'job_order': job.id, 'reason': 'Job order is already invoiced'})
+            else:
+                eligible.append(job)
+
+        if not eligible:
+            return [], skipped
+
+        items_by_job = defaultdict(list)
+        for item in JobOrderItem.objects.filter(job_order_id__in=[job.id for job in eligible]).order_by('created_at'):
+            items_by_job[item.job_order_id].append(invoice_item_from_job_item(item))
+
+        numbers = NumberSequence.allocate(
+            monthly_prefix('INV'), count=len(eligible), model=Invoice, field='invoice_number'
+        )
+        invoices = []
+        for job, invoice_number in zip(eligible, numbers):
+            subtotal = sum((item.total_price for item in items_by_job[job.id]), Decimal('0'))
+            tax_amount = round_money(subtotal * tax_rate / 100)
+            total_amount = subtotal + tax_amount
+            invoices.append(Invoice(
+                invoice_number=invoice_number,
+                customer_id=job.customer_id,
+                job_order_id=job.id,
+                payment_terms=payment_terms,
+                due_date=due_date,
+                subtotal=subtotal,
+                tax_rate=tax_rate,
+                tax_amount=tax_amount,
+                total_amount=total_amount,
+                balance_due=total_amount,
+                created_by=user,
+            ))
+        Invoice.objects.bulk_create(invoices)
+
+        invoice_items = []
+        for invoice in invoices:
+            for item in items_by_job[invoice.job_order_id]:
+                item.invoice = invoice
+                invoice_items.append(item)
+        InvoiceItem.objects.bulk_create(invoice_items)
+        stats.invalidate()
+
+    return invoices, skipped
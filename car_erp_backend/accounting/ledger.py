@@ -0,0 +1,356 @@
+"""
+Double-entry general ledger for Car ERP System.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Invoice, Payment, Expense, SupplierPayment, LedgerAccount, JournalEntry, JournalLine
+
+CASH = '1000'
+RECEIVABLES = '1200'
+PAYABLES = '2000'
+SALES_TAX = '2100'
+RETAINED_EARNINGS = '3000'
+REVENUE = '4000'
+PURCHASES = '5000'
+
+# Expense category: account code.
+EXPENSE_ACCOUNTS = {
+    category: str(6000 + 10 * position)
+    for position, (category, label) in enumerate(Expense.CATEGORY_CHOICES, start=1)
+}
+
+# Code, name and type of every account the postings use.
+CHART = [
+    (CASH, 'Cash and Bank', 'asset'),
+    (RECEIVABLES, 'Accounts Receivable', 'asset'),
+    (PAYABLES, 'Accounts Payable', 'liability'),
+    (SALES_TAX, 'Sales Tax Payable', 'liability'),
+    (RETAINED_EARNINGS, 'Retained Earnings', 'equity'),
+    (REVENUE, 'Sales Revenue', 'revenue'),
+    (PURCHASES, 'Supplier Purchases', 'expense'),
+] + [
+    (EXPENSE_ACCOUNTS[category], f'{label} Expense', 'expense') for category, label in Expense.CATEGORY_CHOICES
+]
+
+ZERO = Decimal('0.00')
+
+CHUNK_SIZE = 2000
+
+
+def local_date(value):
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def invoice_postings(ids):
+    """Issued invoices: receivable against revenue and sales tax."""
+    rows = Invoice.objects.filter(pk__in=ids).exclude(status__in=['draft', 'cancelled']).values_list(
+        'id', 'invoice_number', 'invoice_date', 'tax_amount', 'total_amount'
+    )
+    return {
+        invoice_id: (local_date(invoice_date), f'Invoice {number}', {
+            RECEIVABLES: total_amount, REVENUE: -(total_amount - tax_amount), SALES_TAX: -tax_amount,
+        })
+        for invoice_id, number, invoice_date, tax_amount, total_amount in rows
+    }
+
+
+def payment_postings(ids):
+    """Completed customer payments: cash against receivable."""
+    rows = Payment.objects.filter(pk__in=ids, status='completed').values_list(
+        'id', 'payment_number', 'payment_date', 'processed_date', 'amount'
+    )
+    return {
+        payment_id: (local_date(processed_date or payment_date), f'Payment {number}', {
+            CASH: amount, RECEIVABLES: -amount,
+        })
+        for payment_id, number, payment_date, processed_date, amount in rows
+    }
+
+
+def expense_postings(ids):
+    """Approved expenses are owed until they are paid from cash."""
+    rows = Expense.objects.filter(pk__in=ids, status__in=['approved', 'paid']).values_list(
+        'id', 'expense_number', 'category', 'status', 'expense_date', 'approved_date', 'paid_date', 'amount'
+    )
+    return {
+        expense_id: (local_date(paid_date or approved_date or expense_date), f'Expense {number}', {
+            EXPENSE_ACCOUNTS.get(category, EXPENSE_ACCOUNTS['other']): amount,
+            CASH if expense_status == 'paid' else PAYABLES: -amount,
+        })
+        for expense_id, number, category, expense_status, expense_date, approved_date, paid_date, amount in rows
+    }
+
+
+def supplier_payment_postings(ids):
+    """Completed supplier payments: purchases against cash."""
+    rows = SupplierPayment.objects.filter(pk__in=ids, status='completed').values_list(
+        'id', 'payment_number', 'payment_date', 'processed_date', 'amount'
+    )
+    return {
+        payment_id: (local_date(processed_date or payment_date), f'Supplier payment {number}', {
+            PURCHASES: amount, CASH: -amount,
+        })
+        for payment_id, number, payment_date, processed_date, amount in rows
+    }
+
+
+# Source type: function returning {id: (date, description, {account code: debit minus credit})}.
+SOURCES = {
+    'invoice': invoice_postings,
+    'payment': payment_postings,
+    'expense': expense_postings,
+    'supplier_payment': supplier_payment_postings,
+}
+
+# Source type: (model, date the first posting is dated with, statuses that post).
+BACKFILL = {
+    'invoice': (Invoice, F('invoice_date'), ['sent', 'paid', 'overdue']),
+    'payment': (Payment, Coalesce('processed_date', 'payment_date'), ['completed']),
+    'expense': (Expense, Coalesce('paid_date', 'approved_date', 'expense_date'), ['approved', 'paid']),
+    'supplier_payment': (SupplierPayment, Coalesce('processed_date', 'payment_date'), ['completed']),
+}
+
+
+def ensure_chart():
+    """Create any account of CHART that does not exist yet."""
+    LedgerAccount.objects.bulk_create(
+        [LedgerAccount(code=code, name=name, account_type=account_type) for code, name, account_type in CHART],
+        ignore_conflicts=True,
+    )
+
+
+def posted_amounts(source_type, ids):
+    """Net amount already posted per account, for each source document."""
+    posted = defaultdict(dict)
+    rows = JournalLine.objects.filter(
+        entry__source_type=source_type, entry__source_id__in=ids
+    ).values_list('entry__source_id', 'account__code').annotate(net=Sum(F('debit') - F('credit')))
+    for source_id, code, net in rows:
+        posted[source_id][code] = net
+    return posted
+
+
+def pending_entries(source_type, ids, today):
+    """(date, source type, id, description, {code: amount}) for every document whose postings changed."""
+    targets = SOURCES[source_type](ids)
+    posted = posted_amounts(source_type, ids)
+    pending = []
+    for source_id in ids:
+        entry_date, description, target = targets.get(source_id, (today, None, {}))
+        current = posted.get(source_id, {})
+        delta = {
+            code: target.get(code, ZERO) - current.get(code, ZERO)
+            for code in set(target) | set(current)
+        }
+        delta = {code: amount for code, amount in delta.items() if amount}
+        if not delta:
+            continue
+        if current:
+            entry_date = today
+            description = f'Adjustment to {description}' if description else f'Reversal of {source_type.replace("_", " ")} #{source_id}'
+        pending.append((entry_date, source_type, source_id, description, delta))
+    return pending
+
+
+def stored_balance(account_id, day):
+    """Balance of an account after its last stored line dated on or before `day`."""
+    line = JournalLine.objects.filter(account_id=account_id, entry_date__lte=day).order_by(
+        '-entry_date', '-id'
+    ).values_list('balance_after', flat=True).first()
+    return line if line is not None else ZERO
+
+
+def post_documents(documents, today=None):
+    """
+    Bring the journal in line with the current state of source documents.
+
+    `documents` is an iterable of (source type, id). For each document the
+    postings it should have are compared with what is already posted and
+    only the difference is appended as a new entry, so posting is
+    idempotent and edits, cancellations and deletions become reversing
+    entries. A document's first entry is dated with the document, but
+    never later than `today`; later ones with `today`.
+
+    Each line's balance_after is the account balance in (entry_date, id)
+    order. A line dated before an account's latest entry starts from the
+    stored balance as of its date, and the account's later lines are
+    shifted by its amount, so the other entries keep their dates and
+    as-of balances stay a single lookup. The whole chart is locked while
+    posting. Returns the number of entries posted.
+    """
+    today = today or timezone.localdate()
+    by_type = defaultdict(set)
+    for source_type, source_id in documents:
+        by_type[source_type].add(source_id)
+    if not by_type:
+        return 0
+
+    with transaction.atomic():
+        accounts = {account.code: account for account in LedgerAccount.objects.select_for_update().order_by('pk')}
+        if any(code not in accounts for code, name, account_type in CHART):
+            ensure_chart()
+            accounts = {account.code: account for account in LedgerAccount.objects.select_for_update().order_by('pk')}
+        pending = []
+        for source_type, ids in by_type.items():
+            ids = sorted(ids)
+            for start in range(0, len(ids), CHUNK_SIZE):
+                pending.extend(pending_entries(source_type, ids[start:start + CHUNK_SIZE], today))
+        pending.sort(key=lambda item: item[0])
+
+        entries = []
+        lines = []
+        for entry_date, source_type, source_id, description, delta in pending:
+            entry_date = min(entry_date, today)
+            entry = JournalEntry(
+                entry_date=entry_date, source_type=source_type, source_id=source_id, description=description[:255]
+            )
+            entries.append(entry)
+            for code, amount in sorted(delta.items()):
+                lines.append(JournalLine(
+                    entry=entry,
+                    account_id=accounts[code].pk,
+                    entry_date=entry_date,
+                    debit=max(amount, ZERO),
+                    credit=max(-amount, ZERO),
+                ))
+
+        # Lines are in date order, and each one follows every stored line of its date.
+        by_account = defaultdict(list)
+        for line in lines:
+            by_account[line.account_id].append(line)
+        changed = []
+        for account in accounts.values():
+            account_lines = by_account.get(account.pk)
+            if not account_lines:
+                continue
+            running = ZERO
+            backdated = defaultdict(Decimal)
+            opening = {}
+            for line in account_lines:
+                amount = line.debit - line.credit
+                running += amount
+                if account.last_entry_date and line.entry_date < account.last_entry_date:
+                    if line.entry_date not in opening:
+                        opening[line.entry_date] = stored_balance(account.pk, line.entry_date)
+                    line.balance_after = opening[line.entry_date] + running
+                    backdated[line.entry_date] += amount
+                else:
+                    line.balance_after = account.balance + running
+            for day, amount in backdated.items():
+                JournalLine.objects.filter(account_id=account.pk, entry_date__gt=day).update(
+                    balance_after=F('balance_after') + amount
+                )
+            account.balance += running
+            account.last_entry_date = max(filter(None, [account.last_entry_date, account_lines[-1].entry_date]))
+            changed.append(account)
+
+        JournalEntry.objects.bulk_create(entries, batch_size=1000)
+        JournalLine.objects.bulk_create(lines, batch_size=1000)
+        LedgerAccount.objects.bulk_update(changed, ['balance', 'last_entry_date'])
+    return len(entries)
+
+
+def post_on_commit(source_type, ids):
+    """Post the given documents once the current transaction commits."""
+    documents = [(source_type, source_id) for source_id in ids]
+    transaction.on_commit(lambda: post_documents(documents))
+
+
+def backfill(chunk_size=5000):
+    """
+    Post every source document, oldest first.
+
+    Documents are posted in chunks in date order across all source types,
+    so few of them land before an account's latest entry and need its later
+    lines shifted. Already posted
+    documents produce no entries, so the backfill can be re-run. Returns
+    (documents, entries).
+    """
+    documents = []
+    for source_type, (model, posting_date, statuses) in BACKFILL.items():
+        rows = model.objects.filter(status__in=statuses).annotate(posting_date=posting_date).values_list('posting_date', 'id')
+        documents.extend((document_date, source_type, source_id) for document_date, source_id in rows.iterator(chunk_size=10000))
+    documents.sort()
+
+    posted = 0
+    for start in range(0, len(documents), chunk_size):
+        chunk = documents[start:start + chunk_size]
+        posted += post_documents((source_type, source_id) for document_date, source_type, source_id in chunk)
+    return len(documents), posted
+
+
+def balances_as_of(day):
+    """
+    Ledger accounts annotated with `closing`, the balance at the end of `day`.
+
+    Each balance is one index lookup for the account's last line up to that
+    date, so the cost grows with the number of accounts, not of postings.
+    """
+    last_line = JournalLine.objects.filter(account=OuterRef('pk'), entry_date__lte=day).order_by(
+        '-entry_date', '-id'
+    ).values('balance_after')[:1]
+    return LedgerAccount.objects.annotate(closing=Coalesce(
+        Subquery(last_line), Value(ZERO), output_field=models.DecimalField(max_digits=14, decimal_places=2)
+    ))
+
+
+def trial_balance(as_of):
+    """Debit and credit balance of every account with activity up to `as_of`."""
+    rows = []
+    total_debit = total_credit = ZERO
+    for account in balances_as_of(as_of).order_by('code'):
+        if not account.closing:
+            continue
+        debit = max(account.closing, ZERO)
+        credit = max(-account.closing, ZERO)
+        total_debit += debit
+        total_credit += credit
+        rows.append({
+            'code': account.code,
+            'name': account.name,
+            'account_type': account.account_type,
+            'debit': debit,
+            'credit': credit,
+        })
+    return {
+        'as_of': as_of,
+        'accounts': rows,
+        'total_debit': total_debit,
+        'total_credit': total_credit,
+    }
+
+
+def profit_and_loss(start, end):
+    """
+    Revenue, expenses and net income between `start` and `end` inclusive.
+
+    Each figure is the change in an account's running balance over the
+    period: two lookups per revenue and expense account.
+    """
+    opening = {
+        account.pk: account.closing
+        for account in balances_as_of(start - timedelta(days=1)).filter(account_type__in=['revenue', 'expense'])
+    }
+    sections = {'revenue': [], 'expense': []}
+    totals = {'revenue': ZERO, 'expense': ZERO}
+    for account in balances_as_of(end).filter(account_type__in=['revenue', 'expense']).order_by('code'):
+        change = account.closing - opening.get(account.pk, ZERO)
+        amount = -change if account.account_type == 'revenue' else change
+        if not amount:
+            continue
+        sections[account.account_type].append({'code': account.code, 'name': account.name, 'amount': amount})
+        totals[account.account_type] += amount
+    return {
+        'start': start,
+        'end': end,
+        'revenue': sections['revenue'],
+        'total_revenue': totals['revenue'],
+        'expenses': sections['expense'],
+        'total_expenses': totals['expense'],
+        'net_income': totals['revenue'] - totals['expense'],
+    }
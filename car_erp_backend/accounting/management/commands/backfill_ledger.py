@@ -0,0 +1,21 @@
+"""
+Management command to post existing invoices, payments and expenses to the general ledger.
+"""
+import time
+from django.core.management.base import BaseCommand
+from accounting.ledger import backfill
+
+
+class Command(BaseCommand):
+    help = 'Post every invoice, payment, expense and supplier payment not yet in the journal, oldest first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Documents posted per transaction')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        documents, entries = backfill(chunk_size=options['chunk_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {documents} document(s), posted {entries} journal entr{"y" if entries == 1 else "ies"} in {elapsed:.1f}s'
+        ))
@@ -0,0 +1,77 @@
+"""
+Management command to time the accounting statistics with and without the cache.
+"""
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from accounting.models import Invoice, Payment, Expense, AccountReceivable, AccountPayable
+from accounting.stats import build_accounting_stats, bump_version, get_accounting_stats
+
+
+def previous_accounting_stats():
+    """The statistics as the view used to build them, one query per figure; kept as the benchmark baseline."""
+    return {
+        'invoices': {
+            'total': Invoice.objects.count(),
+            'pending': Invoice.objects.filter(status='sent').count(),
+            'paid': Invoice.objects.filter(status='paid').count(),
+            'overdue': Invoice.objects.filter(status='overdue').count(),
+        },
+        'payments': {
+            'total_count': Payment.objects.count(),
+            'total_amount': Payment.objects.aggregate(total=Sum('amount'))['total'] or 0,
+        },
+        'receivables': AccountReceivable.objects.aggregate(total=Sum('current_amount'))['total'] or 0,
+        'payables': AccountPayable.objects.aggregate(total=Sum('current_amount'))['total'] or 0,
+        'expenses': {
+            'total': Expense.objects.count(),
+            'pending': Expense.objects.filter(status='pending').count(),
+            'approved': Expense.objects.filter(status='approved').count(),
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the accounting statistics as previously built (one query per figure), '
+        'freshly aggregated and served from the shared cache'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Timed calls per measurement')
+
+    def measure(self, label, function, iterations, before=None):
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(iterations):
+                if before:
+                    before()
+                started = time.perf_counter()
+                function()
+                timings.append(time.perf_counter() - started)
+        timings.sort()
+        self.stdout.write(
+            f'{label}: mean {1000 * sum(timings) / len(timings):.2f}ms, '
+            f'median {1000 * timings[len(timings) // 2]:.2f}ms, '
+            f'{len(queries.captured_queries) / iterations:.0f} queries per call'
+        )
+        return sum(timings) / len(timings)
+
+    def handle(self, *args, **options):
+        iterations = max(1, options['iterations'])
+        if previous_accounting_stats() != build_accounting_stats():
+            self.stdout.write(self.style.WARNING('Previous and current implementations disagree'))
+        # Hits and misses go through the configured default cache, shared by every worker process.
+        self.stdout.write(f"Cache backend: {settings.CACHES['default']['BACKEND']}")
+        previous = self.measure('Before: one query per figure', previous_accounting_stats, iterations)
+        uncached = self.measure('After: aggregated', build_accounting_stats, iterations)
+        self.measure('After: cache miss', get_accounting_stats, iterations, before=bump_version)
+        get_accounting_stats()
+        cached = self.measure('After: cache hit', get_accounting_stats, iterations)
+        self.stdout.write(self.style.SUCCESS(
+            f'Aggregating is {previous / uncached:.1f}x and a cache hit {previous / cached:.0f}x '
+            f'as fast as before ({iterations} calls each)'
+        ))
@@ -0,0 +1,33 @@
+"""
+Management command to close a finished month and freeze its totals.
+"""
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from accounting.periods import close_period, PeriodError
+
+
+class Command(BaseCommand):
+    help = 'Close a financial month into snapshot tables (default: the previous month)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Month to close as YYYY-MM')
+        parser.add_argument('--reclose', action='store_true', help='Recompute an already closed month')
+
+    def handle(self, *args, **options):
+        try:
+            if options['month']:
+                month = datetime.strptime(options['month'], '%Y-%m').date()
+            else:
+                month = timezone.localdate().replace(day=1) - timedelta(days=1)
+        except ValueError:
+            raise CommandError('--month must be in YYYY-MM format')
+
+        try:
+            period = close_period(month.year, month.month, reclose=options['reclose'])
+        except PeriodError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f'Closed {period}: revenue {period.revenue_total} from {period.payment_count} payment(s), '
+            f'expenses {period.expense_total} from {period.expense_count} expense(s), net {period.net_income}'
+        ))
@@ -0,0 +1,16 @@
+"""
+Management command to mark unpaid invoices past their due date as overdue.
+"""
+from django.core.management.base import BaseCommand
+from accounting.overdue import sweep_overdue_invoices
+
+
+class Command(BaseCommand):
+    help = 'Mark sent invoices past due with a balance as overdue and notify once per customer (run nightly)'
+
+    def handle(self, *args, **options):
+        run = sweep_overdue_invoices()
+        self.stdout.write(self.style.SUCCESS(
+            f'Marked {run.invoices_marked} invoice(s) overdue for {run.customers_affected} customer(s) '
+            f'({run.balance_marked} outstanding) in {run.duration:.2f}s'
+        ))
@@ -0,0 +1,45 @@
+"""
+Management command to import and reconcile a bank or card settlement statement.
+"""
+import os
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from accounting.reconciliation import reconcile_statement
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import a statement CSV (date, amount, description, reference, transaction_id) and match it to payments and invoices'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Statement CSV file with a header row')
+        parser.add_argument('--user', help='Username recorded on the statement and created payments')
+        parser.add_argument('--dry-run', action='store_true', help='Match and report without writing')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']} does not exist")
+
+        started = time.monotonic()
+        with open(options['path'], newline='', encoding='utf-8-sig') as lines:
+            summary = reconcile_statement(
+                lines, os.path.basename(options['path']), user=user, dry_run=options['dry_run']
+            )
+        elapsed = time.monotonic() - started
+
+        for error in summary['errors'][:20]:
+            self.stderr.write(f"Row {error['row']}: {error['error']}")
+        by_type = ', '.join(f'{match_type} {count}' for match_type, count in sorted(summary['by_match_type'].items()))
+        prefix = 'Dry run: would match' if options['dry_run'] else 'Matched'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {summary['matched']} of {summary['lines']} line(s) in {elapsed:.1f}s ({by_type or 'none'}); "
+            f"{summary['payments_created']} payment(s) recorded, {summary['unmatched_surplus']} left unmatched "
+            f"beyond invoice balances, {summary['duplicates_skipped']} already imported, "
+            f"{len(summary['errors'])} row(s) rejected"
+        ))
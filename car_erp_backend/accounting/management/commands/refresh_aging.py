@@ -0,0 +1,21 @@
+"""
+Management command to roll receivable and payable aging over to today.
+"""
+import time
+from django.core.management.base import BaseCommand
+from accounting.aging import roll_over
+
+
+class Command(BaseCommand):
+    help = 'Re-age counterparties whose balances crossed a bucket boundary since the last run (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild the aging of every customer and supplier')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        refreshed = roll_over(full=options['full'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed aging for {refreshed['receivable']} customer(s) and {refreshed['payable']} supplier(s) in {elapsed:.1f}s"
+        ))
@@ -0,0 +1,53 @@
+"""
+Management command to render invoice or month-end statement PDFs in bulk.
+"""
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from accounting.documents import render_invoices, render_statements
+from accounting.models import Invoice
+
+
+class Command(BaseCommand):
+    help = 'Render and cache statement PDFs for a month, or invoice PDFs, in a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['statements', 'invoices'])
+        parser.add_argument('--month', help='Statement month as YYYY-MM (default: previous month)')
+        parser.add_argument('--since', help='Only invoices issued on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--customer', type=int, action='append', help='Limit to this customer (repeatable)')
+        parser.add_argument(
+            '--workers', type=int, default=settings.PDF_RENDER_WORKERS, help='Render processes (1 renders in this process)'
+        )
+
+    def handle(self, *args, **options):
+        if options['kind'] == 'statements':
+            try:
+                if options['month']:
+                    start = datetime.strptime(options['month'], '%Y-%m').date()
+                else:
+                    start = (timezone.localdate().replace(day=1) - timedelta(days=1)).replace(day=1)
+            except ValueError:
+                raise CommandError('--month must be in YYYY-MM format')
+            end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+            paths, totals = render_statements(start, end, options['customer'], options['workers'])
+            label = f'statement(s) for {start:%Y-%m}'
+        else:
+            invoices = Invoice.objects.exclude(status='draft')
+            if options['customer']:
+                invoices = invoices.filter(customer_id__in=options['customer'])
+            if options['since']:
+                try:
+                    since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+                except ValueError:
+                    raise CommandError('--since must be in YYYY-MM-DD format')
+                invoices = invoices.filter(invoice_date__date__gte=since)
+            paths, totals = render_invoices(invoices, options['workers'])
+            label = 'invoice(s)'
+
+        rate = totals['rendered'] / totals['elapsed'] if totals['elapsed'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['documents']} {label}: rendered {totals['rendered']}, {totals['cached']} unchanged "
+            f"in {totals['elapsed']:.1f}s ({rate:.0f} PDFs/s)"
+        ))
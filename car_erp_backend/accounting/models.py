@@ -1,15 +1,85 @@
 """
 Accounting models for Car ERP System.
 """
-from django.db import models
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from customers.models import Customer
 from job_orders.models import JobOrder
 from inventory.models import PurchaseOrder, Supplier
 
 User = get_user_model()
 
+CENT = Decimal('0.01')
+
+
+def round_money(value):
+    """
+    Round an amount to cents with halves away from zero.
+
+    Every amount derived in Python goes through here; the database side
+    uses Round(), which rounds numeric halves the same way on PostgreSQL.
+    """
+    return Decimal(value).quantize(CENT, ROUND_HALF_UP)
+
+
+def monthly_prefix(code):
+    """Document number prefix for the current month, e.g. INV202401."""
+    from datetime import datetime
+    now = datetime.now()
+    return f"{code}{now.year}{now.month:02d}"
+
+
+class NumberSequence(models.Model):
+    """
+    Row-locked counter used to allocate sequential document numbers.
+    """
+    prefix = models.CharField(max_length=20, unique=True)
+    last_number = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'number_sequences'
+        verbose_name = 'Number Sequence'
+        verbose_name_plural = 'Number Sequences'
+        ordering = ['prefix']
+    
+    def __str__(self):
+        return f"{self.prefix} ({self.last_number})"
+    
+    @classmethod
+    def allocate(cls, prefix, count=1, model=None, field=None):
+        """
+        Reserve `count` consecutive numbers under `prefix`.
+        
+        The sequence row is locked for the duration of the allocation, so
+        concurrent callers never receive the same number. A new prefix is
+        seeded from the highest number already stored in `model.field`.
+        """
+        with transaction.atomic():
+            sequence = cls.objects.select_for_update().filter(prefix=prefix).first()
+            if sequence is None:
+                seed = 0
+                if model is not None:
+                    last_value = model.objects.filter(
+                        **{f'{field}__startswith': prefix}
+                    ).order_by(f'-{field}').values_list(field, flat=True).first()
+                    if last_value:
+                        seed = int(last_value[len(prefix):])
+                cls.objects.get_or_create(prefix=prefix, defaults={'last_number': seed})
+                sequence = cls.objects.select_for_update().get(prefix=prefix)
+            
+            first_number = sequence.last_number + 1
+            sequence.last_number += count
+            sequence.save(update_fields=['last_number', 'updated_at'])
+        
+        return [f"{prefix}{number:04d}" for number in range(first_number, first_number + count)]
+
 
 class Invoice(models.Model):
     """
@@ -31,10 +101,22 @@ class Invoice(models.Model):
         ('net_60', 'Net 60'),
     ]
     
+    PAYMENT_TERMS_DAYS = {
+        'due_on_receipt': 0,
+        'net_15': 15,
+        'net_30': 30,
+        'net_45': 45,
+        'net_60': 60,
+    }
+    
     # Invoice Information
     invoice_number = models.CharField(max_length=50, unique=True)
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='invoices')
     job_order = models.ForeignKey(JobOrder, on_delete=models.SET_NULL, null=True, blank=True, related_name='invoices')
+    archived_job_order = models.ForeignKey(
+        'job_orders.ArchivedJobOrder', on_delete=models.SET_NULL, null=True, blank=True, related_name='invoices',
+        help_text='Job order this invoice was raised for, once it has been archived'
+    )
     
     # Invoice Details
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
@@ -44,6 +126,7 @@ class Invoice(models.Model):
     invoice_date = models.DateTimeField(auto_now_add=True)
     due_date = models.DateTimeField(blank=True, null=True)
     paid_date = models.DateTimeField(blank=True, null=True)
+    overdue_since = models.DateTimeField(blank=True, null=True, help_text='When the overdue sweep marked the invoice')
     
     # Financial Information
     subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=0)
@@ -67,37 +150,96 @@ class Invoice(models.Model):
         verbose_name = 'Invoice'
         verbose_name_plural = 'Invoices'
         ordering = ['-invoice_date']
+        indexes = [
+            models.Index(fields=['status', 'due_date']),
+            models.Index(fields=['overdue_since']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['job_order'], condition=~models.Q(status='cancelled'), name='one_active_invoice_per_job_order'
+            ),
+        ]
     
     def __str__(self):
         return f"INV-{self.invoice_number} - {self.customer.full_name}"
     
     def save(self, *args, **kwargs):
-        """Generate invoice number if not provided."""
+        """
+        Generate invoice number if not provided and derive totals from the subtotal.
+        
+        On an existing invoice the subtotal and paid amount are re-read from
+        the locked row first: item and payment changes update them in place,
+        so the copies held by this instance may be stale and must not be
+        written back over them.
+        """
         if not self.invoice_number:
-            from datetime import datetime
-            now = datetime.now()
-            prefix = f"INV{now.year}{now.month:02d}"
-            last_invoice = Invoice.objects.filter(invoice_number__startswith=prefix).order_by('-invoice_number').first()
-            if last_invoice:
-                last_number = int(last_invoice.invoice_number[-4:])
-                new_number = last_number + 1
-            else:
-                new_number = 1
-            self.invoice_number = f"{prefix}{new_number:04d}"
+            self.invoice_number = NumberSequence.allocate(
+                monthly_prefix('INV'), model=Invoice, field='invoice_number'
+            )[0]
         
         # Calculate due date based on payment terms
         if not self.due_date and self.payment_terms:
             from datetime import timedelta
-            days = {
-                'due_on_receipt': 0,
-                'net_15': 15,
-                'net_30': 30,
-                'net_45': 45,
-                'net_60': 60,
-            }
-            self.due_date = self.invoice_date + timedelta(days=days.get(self.payment_terms, 0))
+            from django.utils import timezone
+            invoice_date = self.invoice_date or timezone.now()
+            self.due_date = invoice_date + timedelta(days=self.PAYMENT_TERMS_DAYS.get(self.payment_terms, 0))
         
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            if self.pk and not kwargs.get('force_insert'):
+                stored = Invoice.objects.select_for_update().filter(pk=self.pk).values('subtotal', 'paid_amount').first()
+                if stored:
+                    self.subtotal, self.paid_amount = stored['subtotal'], stored['paid_amount']
+            self.tax_amount = round_money(Decimal(self.subtotal) * Decimal(self.tax_rate) / 100)
+            self.total_amount = Decimal(self.subtotal) + self.tax_amount - Decimal(self.discount_amount)
+            self.balance_due = self.total_amount - Decimal(self.paid_amount)
+            super().save(*args, **kwargs)
+    
+    @staticmethod
+    def totals_from_subtotal(subtotal):
+        """Update kwargs deriving tax, total and balance from a subtotal expression."""
+        tax_amount = Round(subtotal * F('tax_rate') / 100, 2)
+        total_amount = subtotal + tax_amount - F('discount_amount')
+        return {
+            'subtotal': subtotal,
+            'tax_amount': tax_amount,
+            'total_amount': total_amount,
+            'balance_due': total_amount - F('paid_amount'),
+        }
+    
+    @classmethod
+    def adjust_subtotal(cls, invoice_id, delta):
+        """
+        Add `delta` to an invoice's subtotal and refresh its derived totals.
+        
+        A single UPDATE working from the stored values, so concurrent item
+        edits on the same invoice cannot overwrite each other.
+        """
+        if delta:
+            invoice = cls.objects.filter(pk=invoice_id)
+            invoice.update(**cls.totals_from_subtotal(F('subtotal') + delta), updated_at=timezone.now())
+            cls.refresh_customer_views(invoice)
+    
+    @classmethod
+    def recalculate_totals(cls, queryset):
+        """Re-sum the items of every invoice in `queryset` with two UPDATE statements."""
+        item_total = InvoiceItem.objects.filter(invoice=OuterRef('pk')).order_by().values('invoice').annotate(
+            total=Sum('total_price')
+        ).values('total')
+        queryset.update(subtotal=Coalesce(
+            Subquery(item_total), Value(Decimal('0')), output_field=models.DecimalField(max_digits=10, decimal_places=2)
+        ))
+        updated = queryset.update(**cls.totals_from_subtotal(F('subtotal')), updated_at=timezone.now())
+        cls.refresh_customer_views(queryset)
+        return updated
+    
+    @staticmethod
+    def refresh_customer_views(queryset):
+        """Invalidate the Customer 360 cache and re-age the invoices' customers; the UPDATEs above skip post_save."""
+        from customers.overview import invalidate_on_commit
+        from .aging import refresh_on_commit
+        customer_ids = list(queryset.order_by().values_list('customer_id', flat=True).distinct())
+        invalidate_on_commit(customer_ids)
+        refresh_on_commit('receivable', customer_ids)
 
 
 class InvoiceItem(models.Model):
@@ -128,9 +270,34 @@ class InvoiceItem(models.Model):
         return f"{self.invoice.invoice_number} - {self.description}"
     
     def save(self, *args, **kwargs):
-        """Calculate total price."""
-        self.total_price = self.quantity * self.unit_price
-        super().save(*args, **kwargs)
+        """Calculate total price and apply the change to the invoice totals."""
+        self.total_price = round_money(Decimal(self.quantity) * Decimal(self.unit_price))
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = InvoiceItem.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'invoice_id', 'total_price'
+                ).first()
+            super().save(*args, **kwargs)
+            
+            if previous is None:
+                Invoice.adjust_subtotal(self.invoice_id, self.total_price)
+            elif previous[0] != self.invoice_id:
+                Invoice.adjust_subtotal(previous[0], -previous[1])
+                Invoice.adjust_subtotal(self.invoice_id, self.total_price)
+            else:
+                Invoice.adjust_subtotal(self.invoice_id, self.total_price - previous[1])
+    
+    def delete(self, *args, **kwargs):
+        """Remove the item's amount from the invoice totals."""
+        with transaction.atomic():
+            total_price = InvoiceItem.objects.select_for_update().filter(pk=self.pk).values_list(
+                'total_price', flat=True
+            ).first()
+            result = super().delete(*args, **kwargs)
+            if total_price is not None:
+                Invoice.adjust_subtotal(self.invoice_id, -total_price)
+        return result
 
 
 class Payment(models.Model):
@@ -183,6 +350,9 @@ class Payment(models.Model):
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
         ordering = ['-payment_date']
+        indexes = [
+            models.Index(fields=['payment_date']),
+        ]
     
     def __str__(self):
         return f"PAY-{self.payment_number} - {self.customer.full_name} ({self.amount})"
@@ -190,19 +360,37 @@ class Payment(models.Model):
     def save(self, *args, **kwargs):
         """Generate payment number if not provided."""
         if not self.payment_number:
-            from datetime import datetime
-            now = datetime.now()
-            prefix = f"PAY{now.year}{now.month:02d}"
-            last_payment = Payment.objects.filter(payment_number__startswith=prefix).order_by('-payment_number').first()
-            if last_payment:
-                last_number = int(last_payment.payment_number[-4:])
-                new_number = last_number + 1
-            else:
-                new_number = 1
-            self.payment_number = f"{prefix}{new_number:04d}"
+            self.payment_number = NumberSequence.allocate(
+                monthly_prefix('PAY'), model=Payment, field='payment_number'
+            )[0]
         super().save(*args, **kwargs)
 
 
+class IdempotencyKey(models.Model):
+    """
+    Client-supplied key of a payment request and the response it produced.
+    
+    A retried request with the same key gets the stored response instead of
+    being applied again. Keys are scoped to the user who sent them, so two
+    clients that happen to pick the same key do not see each other's payments.
+    """
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64, help_text='SHA-256 of the request fields')
+    response_body = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='idempotency_keys')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'idempotency_keys'
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+        ordering = ['-created_at']
+        unique_together = ['user', 'key']
+    
+    def __str__(self):
+        return self.key
+
+
 class SupplierPayment(models.Model):
     """
     Supplier payment model.
@@ -323,6 +511,9 @@ class Expense(models.Model):
         verbose_name = 'Expense'
         verbose_name_plural = 'Expenses'
         ordering = ['-expense_date']
+        indexes = [
+            models.Index(fields=['expense_date']),
+        ]
     
     def __str__(self):
         return f"EXP-{self.expense_number} - {self.description} ({self.amount})"
@@ -367,6 +558,10 @@ class AccountReceivable(models.Model):
         verbose_name = 'Account Receivable'
         verbose_name_plural = 'Accounts Receivable'
         ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['customer', 'due_date']),
+            models.Index(fields=['due_date']),
+        ]
     
     def __str__(self):
         return f"{self.customer.full_name} - {self.invoice.invoice_number} ({self.current_amount})"
@@ -396,7 +591,342 @@ class AccountPayable(models.Model):
         verbose_name = 'Account Payable'
         verbose_name_plural = 'Accounts Payable'
         ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['supplier', 'due_date']),
+            models.Index(fields=['due_date']),
+        ]
     
     def __str__(self):
         return f"{self.supplier.name} - {self.purchase_order.po_number} ({self.current_amount})"
 
+
+class BankStatement(models.Model):
+    """
+    Imported bank or card settlement statement.
+    """
+    source_name = models.CharField(max_length=255, help_text='File the statement was imported from')
+    line_count = models.IntegerField(default=0)
+    matched_count = models.IntegerField(default=0)
+    
+    # System Fields
+    uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='bank_statements')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'bank_statements'
+        verbose_name = 'Bank Statement'
+        verbose_name_plural = 'Bank Statements'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.source_name} ({self.matched_count}/{self.line_count} matched)"
+
+
+class BankStatementLine(models.Model):
+    """
+    One transaction on a bank statement and the record it was matched to.
+    """
+    MATCH_TYPE_CHOICES = [
+        ('transaction_id', 'Payment Transaction ID'),
+        ('reference', 'Payment Reference'),
+        ('invoice_number', 'Invoice Number'),
+        ('amount', 'Exact Open Amount'),
+        ('fuzzy', 'Amount and Date Window'),
+    ]
+    
+    statement = models.ForeignKey(BankStatement, on_delete=models.CASCADE, related_name='lines')
+    line_number = models.IntegerField()
+    transaction_date = models.DateField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    description = models.CharField(max_length=255, blank=True, null=True)
+    reference = models.CharField(max_length=100, blank=True, null=True)
+    transaction_id = models.CharField(max_length=100, blank=True, null=True)
+    
+    # Match Result
+    match_type = models.CharField(max_length=20, choices=MATCH_TYPE_CHOICES, blank=True, null=True)
+    payment = models.ForeignKey(Payment, on_delete=models.SET_NULL, null=True, blank=True, related_name='statement_lines')
+    invoice = models.ForeignKey(Invoice, on_delete=models.SET_NULL, null=True, blank=True, related_name='statement_lines')
+    unmatched_amount = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0,
+        help_text='Part of a credit matched to an invoice that exceeded its outstanding balance'
+    )
+    matched_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'bank_statement_lines'
+        verbose_name = 'Bank Statement Line'
+        verbose_name_plural = 'Bank Statement Lines'
+        ordering = ['statement', 'line_number']
+        indexes = [
+            models.Index(fields=['statement', 'match_type']),
+            models.Index(fields=['transaction_date', 'amount']),
+        ]
+    
+    def __str__(self):
+        return f"{self.transaction_date} {self.amount} ({self.match_type or 'unmatched'})"
+
+
+class AgingBuckets(models.Model):
+    """
+    Outstanding balance of one counterparty split by days past due.
+    
+    Rows are derived from open invoice balances or the payable ledger and
+    refreshed per counterparty, so aging reports read one row per counterparty.
+    """
+    current = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    days_1_30 = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    days_31_60 = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    days_61_90 = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    days_over_90 = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    oldest_due_date = models.DateTimeField(blank=True, null=True)
+    as_of = models.DateField(help_text='Date the buckets were aged against')
+    refreshed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        abstract = True
+
+
+class ReceivableAging(AgingBuckets):
+    """
+    Accounts receivable aging for one customer.
+    """
+    customer = models.OneToOneField(Customer, on_delete=models.CASCADE, related_name='receivable_aging')
+    
+    class Meta:
+        db_table = 'receivable_aging'
+        verbose_name = 'Receivable Aging'
+        verbose_name_plural = 'Receivable Aging'
+        ordering = ['-total']
+        indexes = [
+            models.Index(fields=['-total']),
+            models.Index(fields=['-days_over_90']),
+        ]
+    
+    def __str__(self):
+        return f"{self.customer.full_name} ({self.total})"
+
+
+class PayableAging(AgingBuckets):
+    """
+    Accounts payable aging for one supplier.
+    """
+    supplier = models.OneToOneField(Supplier, on_delete=models.CASCADE, related_name='payable_aging')
+    
+    class Meta:
+        db_table = 'payable_aging'
+        verbose_name = 'Payable Aging'
+        verbose_name_plural = 'Payable Aging'
+        ordering = ['-total']
+        indexes = [
+            models.Index(fields=['-total']),
+            models.Index(fields=['-days_over_90']),
+        ]
+    
+    def __str__(self):
+        return f"{self.supplier.name} ({self.total})"
+
+
+class OverdueSweepRun(models.Model):
+    """
+    One run of the nightly sweep that marks unpaid invoices past due as overdue.
+    """
+    started_at = models.DateTimeField()
+    duration = models.FloatField(help_text='Seconds')
+    invoices_marked = models.PositiveIntegerField(default=0)
+    customers_affected = models.PositiveIntegerField(default=0)
+    balance_marked = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        db_table = 'overdue_sweep_runs'
+        verbose_name = 'Overdue Sweep Run'
+        verbose_name_plural = 'Overdue Sweep Runs'
+        ordering = ['-started_at']
+    
+    def __str__(self):
+        return f"{self.started_at:%Y-%m-%d %H:%M} - {self.invoices_marked} invoice(s)"
+
+
+class LedgerAccount(models.Model):
+    """
+    General ledger account with its running balance.
+    
+    `balance` is debits minus credits over every posting and is updated in
+    the same transaction as each journal line.
+    """
+    ACCOUNT_TYPE_CHOICES = [
+        ('asset', 'Asset'),
+        ('liability', 'Liability'),
+        ('equity', 'Equity'),
+        ('revenue', 'Revenue'),
+        ('expense', 'Expense'),
+    ]
+    
+    code = models.CharField(max_length=20, unique=True)
+    name = models.CharField(max_length=100)
+    account_type = models.CharField(max_length=20, choices=ACCOUNT_TYPE_CHOICES)
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    last_entry_date = models.DateField(blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    
+    class Meta:
+        db_table = 'ledger_accounts'
+        verbose_name = 'Ledger Account'
+        verbose_name_plural = 'Ledger Accounts'
+        ordering = ['code']
+    
+    def __str__(self):
+        return f"{self.code} {self.name}"
+
+
+class JournalEntry(models.Model):
+    """
+    Balanced set of postings generated from one source document.
+    
+    Entries are never edited or deleted: a change to the source document
+    is recorded as a further entry carrying the difference.
+    """
+    SOURCE_TYPE_CHOICES = [
+        ('invoice', 'Invoice'),
+        ('payment', 'Payment'),
+        ('expense', 'Expense'),
+        ('supplier_payment', 'Supplier Payment'),
+    ]
+    
+    entry_date = models.DateField()
+    source_type = models.CharField(max_length=20, choices=SOURCE_TYPE_CHOICES)
+    source_id = models.PositiveIntegerField()
+    description = models.CharField(max_length=255)
+    posted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'journal_entries'
+        verbose_name = 'Journal Entry'
+        verbose_name_plural = 'Journal Entries'
+        ordering = ['-entry_date', '-id']
+        indexes = [
+            models.Index(fields=['source_type', 'source_id']),
+            models.Index(fields=['entry_date']),
+        ]
+    
+    def __str__(self):
+        return f"JE-{self.pk} {self.entry_date} {self.description}"
+    
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError('Journal entries cannot be changed once posted')
+        super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        raise ValueError('Journal entries cannot be deleted')
+
+
+class JournalLine(models.Model):
+    """
+    Debit or credit to one account, with the account's balance after it.
+    
+    Lines of an account are posted in entry date order, so the balance on
+    any date is the balance_after of its last line up to that date.
+    """
+    entry = models.ForeignKey(JournalEntry, on_delete=models.PROTECT, related_name='lines')
+    account = models.ForeignKey(LedgerAccount, on_delete=models.PROTECT, related_name='lines')
+    entry_date = models.DateField()
+    debit = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    credit = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    balance_after = models.DecimalField(max_digits=14, decimal_places=2)
+    
+    class Meta:
+        db_table = 'journal_lines'
+        verbose_name = 'Journal Line'
+        verbose_name_plural = 'Journal Lines'
+        ordering = ['entry_date', 'id']
+        indexes = [
+            models.Index(fields=['account', 'entry_date', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.account.code} Dr {self.debit} Cr {self.credit}"
+    
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError('Journal lines cannot be changed once posted')
+        super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        raise ValueError('Journal lines cannot be deleted')
+
+
+class FinancialPeriod(models.Model):
+    """
+    Closed calendar month with its frozen totals.
+    
+    A month is open until it is closed; once closed its figures are read
+    from this row and its snapshots instead of the transaction tables.
+    """
+    year = models.PositiveIntegerField()
+    month = models.PositiveIntegerField()
+    start_date = models.DateField()
+    end_date = models.DateField()
+    
+    # Frozen Totals
+    revenue_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payment_count = models.PositiveIntegerField(default=0)
+    expense_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    expense_count = models.PositiveIntegerField(default=0)
+    net_income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    receivables_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text='Outstanding at the period end')
+    payables_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text='Outstanding at the period end')
+    
+    # System Fields
+    closed_at = models.DateTimeField(auto_now=True)
+    closed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='closed_periods')
+    
+    class Meta:
+        db_table = 'financial_periods'
+        verbose_name = 'Financial Period'
+        verbose_name_plural = 'Financial Periods'
+        ordering = ['-year', '-month']
+        unique_together = ['year', 'month']
+    
+    def __str__(self):
+        return f"{self.year}-{self.month:02d}"
+
+
+class PeriodRevenueSnapshot(models.Model):
+    """
+    Completed payments of a closed period for one payment method.
+    """
+    period = models.ForeignKey(FinancialPeriod, on_delete=models.CASCADE, related_name='revenue')
+    payment_method = models.CharField(max_length=20, choices=Payment.PAYMENT_METHOD_CHOICES)
+    payment_count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        db_table = 'period_revenue_snapshots'
+        verbose_name = 'Period Revenue Snapshot'
+        verbose_name_plural = 'Period Revenue Snapshots'
+        ordering = ['period', 'payment_method']
+        unique_together = ['period', 'payment_method']
+    
+    def __str__(self):
+        return f"{self.period} {self.payment_method}: {self.amount}"
+
+
+class PeriodExpenseSnapshot(models.Model):
+    """
+    Approved and paid expenses of a closed period for one category.
+    """
+    period = models.ForeignKey(FinancialPeriod, on_delete=models.CASCADE, related_name='expenses')
+    category = models.CharField(max_length=20, choices=Expense.CATEGORY_CHOICES)
+    expense_count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        db_table = 'period_expense_snapshots'
+        verbose_name = 'Period Expense Snapshot'
+        verbose_name_plural = 'Period Expense Snapshots'
+        ordering = ['period', 'category']
+        unique_together = ['period', 'category']
+    
+    def __str__(self):
+        return f"{self.period} {self.category}: {self.amount}"
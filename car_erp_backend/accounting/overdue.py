@@ -0,0 +1,62 @@
+"""
+Overdue invoice sweep for Car ERP System.
+"""
+import time
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from customers import overview
+from . import stats
+from .models import Invoice, OverdueSweepRun
+from .signals import invoices_overdue
+
+
+def sweep_overdue_invoices(now=None):
+    """
+    Mark every sent invoice past its due date with a balance left as overdue.
+
+    The invoices are flipped by one UPDATE that range-scans the
+    (status, due_date) index and stamps them with the same overdue_since,
+    which a grouped query then reads back per customer. After the commit
+    `invoices_overdue` is sent once per affected customer. Returns the
+    recorded OverdueSweepRun.
+    """
+    now = now or timezone.now()
+    started = time.monotonic()
+    with transaction.atomic():
+        marked = Invoice.objects.filter(status='sent', due_date__lt=now, balance_due__gt=0).update(
+            status='overdue', overdue_since=now, updated_at=now
+        )
+        per_customer = []
+        if marked:
+            stats.invalidate()
+            per_customer = list(
+                Invoice.objects.filter(status='overdue', overdue_since=now).order_by().values('customer_id').annotate(
+                    invoices=Count('id'), balance_due=Sum('balance_due')
+                )
+            )
+        run = OverdueSweepRun.objects.create(
+            started_at=now,
+            duration=time.monotonic() - started,
+            invoices_marked=marked,
+            customers_affected=len(per_customer),
+            balance_marked=sum(row['balance_due'] for row in per_customer),
+        )
+        if per_customer:
+            overview.invalidate_on_commit(row['customer_id'] for row in per_customer)
+            transaction.on_commit(lambda: notify_customers(run, per_customer))
+    return run
+
+
+def notify_customers(run, per_customer):
+    """
+    Send `invoices_overdue` for each customer with invoices marked by the run.
+
+    Receivers find the invoices themselves with
+    `overdue_since=run.started_at`.
+    """
+    for row in per_customer:
+        invoices_overdue.send(
+            Invoice, customer_id=row['customer_id'], invoice_count=row['invoices'],
+            balance_due=row['balance_due'], run=run,
+        )
@@ -0,0 +1,105 @@
+"""
+Idempotent payment ingestion for Car ERP System.
+"""
+import hashlib
+import json
+from decimal import Decimal, InvalidOperation
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+from customers import overview
+from .models import Invoice, Payment, IdempotencyKey, round_money
+
+
+class PaymentError(Exception):
+    """
+    Payment request that cannot be applied; carries the HTTP status to return.
+    """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def parse_amount(raw):
+    """Positive amount rounded to cents; raises PaymentError."""
+    try:
+        amount = round_money(Decimal(str(raw)))
+    except (InvalidOperation, ValueError):
+        raise PaymentError('Amount must be a number')
+    if not amount.is_finite() or amount <= 0:
+        raise PaymentError('Amount must be greater than zero')
+    return amount
+
+
+def request_fingerprint(invoice_id, amount, payment_method, transaction_id):
+    """Hash of the fields that define a payment request, to detect reused keys."""
+    payload = json.dumps([invoice_id, str(amount), payment_method, transaction_id or ''])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def apply_payment(invoice_id, amount, payment_method, user, transaction_id='', idempotency_key=None, render=None):
+    """
+    Record a completed payment against an invoice exactly once.
+
+    Everything happens in one transaction: the idempotency key is inserted
+    first, so a concurrent request from the same user with the same key
+    waits on the (user, key) unique index and then finds the stored result; the invoice row is locked and
+    its balance fields are updated with F-expressions in a single UPDATE.
+
+    `render(payment, invoice)` builds the response body that is stored
+    with the key. Returns (response body, replayed).
+    """
+    amount = parse_amount(amount)
+    if payment_method not in dict(Payment.PAYMENT_METHOD_CHOICES):
+        raise PaymentError('Invalid payment method')
+    fingerprint = request_fingerprint(invoice_id, amount, payment_method, transaction_id)
+
+    with transaction.atomic():
+        record = None
+        if idempotency_key:
+            record, created = IdempotencyKey.objects.get_or_create(
+                user=user, key=idempotency_key, defaults={'request_hash': fingerprint}
+            )
+            if not created:
+                if record.request_hash != fingerprint:
+                    raise PaymentError('Idempotency-Key was already used for a different request', status_code=422)
+                return record.response_body, True
+
+        invoice = Invoice.objects.select_for_update().filter(pk=invoice_id).first()
+        if invoice is None:
+            raise PaymentError('Invoice not found', status_code=404)
+        if invoice.status == 'cancelled':
+            raise PaymentError('Cannot take a payment on a cancelled invoice', status_code=409)
+
+        now = timezone.now()
+        payment = Payment.objects.create(
+            invoice=invoice,
+            customer_id=invoice.customer_id,
+            amount=amount,
+            payment_method=payment_method,
+            transaction_id=transaction_id,
+            status='completed',
+            processed_date=now,
+            created_by=user,
+            processed_by=user,
+        )
+
+        settled = Q(total_amount__lte=F('paid_amount') + amount)
+        Invoice.objects.filter(pk=invoice.pk).update(
+            paid_amount=F('paid_amount') + amount,
+            balance_due=F('total_amount') - F('paid_amount') - amount,
+            status=Case(When(settled, then=Value('paid')), default=F('status')),
+            paid_date=Case(When(settled, then=Value(now)), default=F('paid_date')),
+            updated_at=now,
+        )
+        overview.invalidate_on_commit([invoice.customer_id])
+        invoice.refresh_from_db()
+
+        body = render(payment, invoice) if render else {'payment': payment.pk, 'invoice': invoice.pk}
+        body = json.loads(json.dumps(body, cls=DjangoJSONEncoder))
+        if record is not None:
+            record.response_body = body
+            record.save(update_fields=['response_body'])
+    return body, False
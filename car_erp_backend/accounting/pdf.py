@@ -0,0 +1,268 @@
+"""
+PDF rendering for Car ERP System.
+
+Pure functions with no ORM access so they can run in worker processes.
+Documents are laid out from a payload of preformatted strings built by
+the caller and drawn with reportlab in an embedded TrueType font, so
+names and addresses in any script the font covers print as written.
+Only the glyphs used are embedded. The output is built in invariant
+mode: the same payload always renders to the same bytes.
+"""
+import os
+from functools import lru_cache
+from io import BytesIO
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 50
+
+REGULAR = 'regular'
+BOLD = 'bold'
+
+# Latin-only faces bundled with reportlab, used when a configured font file is missing.
+FALLBACK_FONTS = {REGULAR: 'Vera.ttf', BOLD: 'VeraBd.ttf'}
+
+
+@lru_cache(maxsize=None)
+def register_fonts(regular_path, bold_path):
+    """Register the regular and bold TrueType faces once per process; returns {style: font name}."""
+    names = {}
+    for style, path in ((REGULAR, regular_path), (BOLD, bold_path)):
+        if not path or not os.path.exists(path):
+            path = FALLBACK_FONTS[style]
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(TTFont(name, path))
+        names[style] = name
+    return names
+
+
+# Document layouts: meta is (label, key) printed top right, columns are
+# (heading, key, x, align) with x the left edge or, right aligned, the
+# right edge, and totals are (label, key) printed under the table.
+LAYOUTS = {
+    'invoice': {
+        'title': 'INVOICE',
+        'meta': [
+            ('Invoice No.', 'invoice_number'),
+            ('Invoice date', 'invoice_date'),
+            ('Due date', 'due_date'),
+            ('Terms', 'payment_terms'),
+        ],
+        'columns': [
+            ('Description', 'description', MARGIN, 'left'),
+            ('Qty', 'quantity', 370, 'right'),
+            ('Unit price', 'unit_price', 460, 'right'),
+            ('Amount', 'total', PAGE_WIDTH - MARGIN, 'right'),
+        ],
+        'totals': [
+            ('Subtotal', 'subtotal'),
+            ('Discount', 'discount_amount'),
+            ('Tax', 'tax_amount'),
+            ('Total', 'total_amount'),
+            ('Paid', 'paid_amount'),
+            ('Balance due', 'balance_due'),
+        ],
+    },
+    'statement': {
+        'title': 'STATEMENT',
+        'meta': [
+            ('Customer No.', 'customer_number'),
+            ('Period', 'period'),
+            ('Statement date', 'statement_date'),
+        ],
+        'columns': [
+            ('Date', 'date', MARGIN, 'left'),
+            ('Reference', 'reference', 120, 'left'),
+            ('Charges', 'charges', 400, 'right'),
+            ('Payments', 'payments', 480, 'right'),
+            ('Balance', 'balance', PAGE_WIDTH - MARGIN, 'right'),
+        ],
+        'totals': [
+            ('Opening balance', 'opening_balance'),
+            ('Charges', 'charges'),
+            ('Payments', 'payments'),
+            ('Closing balance', 'closing_balance'),
+        ],
+    },
+    'report': {
+        'title': 'REPORT',
+        'meta': [
+            ('Report', 'name'),
+            ('Generated', 'generated_at'),
+        ],
+        'columns': [
+            ('Item', 'label', MARGIN, 'left'),
+            ('Value', 'value', PAGE_WIDTH - MARGIN, 'right'),
+        ],
+        'totals': [],
+    },
+}
+
+ROW_HEIGHT = 15
+HEADER_TOP = PAGE_HEIGHT - MARGIN
+TABLE_TOP_FIRST = 560
+TABLE_TOP_NEXT = HEADER_TOP - 50
+TABLE_BOTTOM = MARGIN + 40
+
+
+class Template:
+    """
+    A layout compiled, for one pair of fonts, into the drawing operations that never change.
+
+    Column widths, the title, labels, headings and rules are resolved
+    once; only the payload values are measured and placed per document.
+    Operations are ('text', x, y, text, font, size) with x already
+    aligned, or ('rule', y, x1, x2, width).
+    """
+
+    def __init__(self, layout, fonts):
+        self.layout = layout
+        self.fonts = fonts
+        columns = layout['columns']
+        self.columns = []
+        for index, (heading, key, x, align) in enumerate(columns):
+            if align == 'left':
+                following = [
+                    next_x if next_align == 'left' else next_x - self.text_width(next_heading, BOLD, 9)
+                    for next_heading, next_key, next_x, next_align in columns[index + 1:]
+                ]
+                limit = (following[0] if following else PAGE_WIDTH - MARGIN) - x - 10
+            else:
+                limit = x - (columns[index - 1][2] if index else MARGIN) - 10
+            self.columns.append((key, x, align, limit))
+
+        title = [self.text(PAGE_WIDTH - MARGIN, HEADER_TOP - 14, layout['title'], BOLD, 20, 'right')]
+        self.first_page = title + [
+            self.text(380, HEADER_TOP - 40 - 13 * index, label, BOLD, 9)
+            for index, (label, key) in enumerate(layout['meta'])
+        ] + self.table_heading(TABLE_TOP_FIRST)
+        self.next_page = title + self.table_heading(TABLE_TOP_NEXT)
+
+    def text_width(self, text, font, size):
+        return pdfmetrics.stringWidth(text, self.fonts[font], size)
+
+    def text(self, x, y, text, font=REGULAR, size=10, align='left'):
+        if align == 'right':
+            x -= self.text_width(text, font, size)
+        return ('text', x, y, text, font, size)
+
+    @staticmethod
+    def rule(y, x1=MARGIN, x2=PAGE_WIDTH - MARGIN, width=0.5):
+        return ('rule', y, x1, x2, width)
+
+    def fit(self, text, font, size, width):
+        """Shorten text with an ellipsis until it fits `width` points."""
+        if self.text_width(text, font, size) <= width:
+            return text
+        while text and self.text_width(text + '...', font, size) > width:
+            text = text[:-1]
+        return text + '...'
+
+    def table_heading(self, top):
+        """Column headings at `top` with the rule under them."""
+        return [
+            self.text(x, top, heading, BOLD, 9, align) for heading, key, x, align in self.layout['columns']
+        ] + [self.rule(top - 5)]
+
+    def page_header(self, payload):
+        """Company, customer and meta values of the first page."""
+        operations = []
+        for index, line in enumerate(payload.get('company', [])):
+            operations.append(self.text(MARGIN, HEADER_TOP - 14 - 13 * index, line, BOLD if index == 0 else REGULAR, 14 if index == 0 else 9))
+        meta = payload.get('meta', {})
+        for index, (label, key) in enumerate(self.layout['meta']):
+            operations.append(self.text(PAGE_WIDTH - MARGIN, HEADER_TOP - 40 - 13 * index, meta.get(key, ''), REGULAR, 9, 'right'))
+        if payload.get('bill_to'):
+            operations.append(self.text(MARGIN, 650, 'Bill to', BOLD, 9))
+        for index, line in enumerate(payload.get('bill_to', [])):
+            operations.append(self.text(MARGIN, 636 - 12 * index, line, REGULAR, 9))
+        return operations
+
+    def row(self, y, values):
+        return [
+            self.text(x, y, self.fit(str(values.get(key, '')), REGULAR, 9, limit), REGULAR, 9, align)
+            for key, x, align, limit in self.columns
+        ]
+
+    def totals(self, y, totals):
+        operations = [self.rule(y + 10, x1=360)]
+        for label, key in self.layout['totals']:
+            bold = key in ('balance_due', 'closing_balance', 'total_amount')
+            operations.append(self.text(360, y, label, BOLD if bold else REGULAR, 9))
+            operations.append(self.text(PAGE_WIDTH - MARGIN, y, totals.get(key, ''), BOLD if bold else REGULAR, 9, 'right'))
+            y -= 13
+        return operations, y
+
+    def render(self, payload):
+        """Render a payload to PDF bytes, adding pages as the table grows."""
+        rows = payload.get('rows', [])
+        pages = []
+        current = self.first_page + self.page_header(payload)
+        y = TABLE_TOP_FIRST - 20
+        for values in rows:
+            if y < TABLE_BOTTOM:
+                pages.append(current)
+                current = list(self.next_page)
+                y = TABLE_TOP_NEXT - 20
+            current.extend(self.row(y, values))
+            y -= ROW_HEIGHT
+
+        totals_height = 13 * len(self.layout['totals']) + 20
+        if self.layout['totals'] and y - totals_height < TABLE_BOTTOM:
+            pages.append(current)
+            current = list(self.next_page)
+            y = TABLE_TOP_NEXT - 20
+        if self.layout['totals']:
+            operations, y = self.totals(y - 10, payload.get('totals', {}))
+            current.extend(operations)
+        for line in payload.get('notes', []):
+            y -= 13
+            if y < TABLE_BOTTOM:
+                pages.append(current)
+                current = list(self.next_page)
+                y = TABLE_TOP_NEXT - 20
+            current.append(self.text(MARGIN, y, self.fit(line, REGULAR, 8, PAGE_WIDTH - 2 * MARGIN), REGULAR, 8))
+        pages.append(current)
+
+        count = len(pages)
+        for number, operations in enumerate(pages, start=1):
+            operations.append(self.text(PAGE_WIDTH - MARGIN, MARGIN - 20, f'Page {number} of {count}', REGULAR, 8, 'right'))
+        return build_pdf(pages, self.fonts)
+
+
+@lru_cache(maxsize=None)
+def get_template(name, regular_font=None, bold_font=None):
+    """Compiled template for a layout and font pair, built once per process."""
+    return Template(LAYOUTS[name], register_fonts(regular_font, bold_font))
+
+
+def render(name, payload, fonts=(None, None)):
+    """
+    Render one document with the named layout; the entry point for worker processes.
+
+    `fonts` is the (regular, bold) pair of TrueType file paths.
+    """
+    return get_template(name, *fonts).render(payload)
+
+
+def build_pdf(pages, fonts):
+    """Draw the pages' operations into a PDF file."""
+    output = BytesIO()
+    document = canvas.Canvas(output, pagesize=(PAGE_WIDTH, PAGE_HEIGHT), invariant=1, pageCompression=1)
+    for operations in pages:
+        for operation in operations:
+            if operation[0] == 'text':
+                kind, x, y, text, font, size = operation
+                document.setFont(fonts[font], size)
+                document.drawString(x, y, text)
+            else:
+                kind, y, x1, x2, width = operation
+                document.setLineWidth(width)
+                document.line(x1, y, x2, y)
+        document.showPage()
+    document.save()
+    return output.getvalue()
@@ -0,0 +1,195 @@
+"""
+Monthly financial period close for Car ERP System.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from .aging import day_start
+from .models import (
+    Invoice, Payment, Expense, AccountPayable, SupplierPayment,
+    FinancialPeriod, PeriodRevenueSnapshot, PeriodExpenseSnapshot
+)
+
+EXPENSE_STATUSES = ['approved', 'paid']
+
+# Longest range the period summary covers in one request.
+MAX_SUMMARY_MONTHS = 36
+
+
+class PeriodError(Exception):
+    """
+    Period operation that cannot be carried out; carries the HTTP status to return.
+    """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def month_bounds(year, month):
+    """First and last day of a calendar month; raises PeriodError for an invalid month."""
+    try:
+        start = date(year, month, 1)
+    except (TypeError, ValueError):
+        raise PeriodError('Invalid year or month')
+    end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+
+def months_between(start, end):
+    """(year, month) for every month from `start` to `end` inclusive."""
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def receivables_as_of(end_at):
+    """Issued invoices dated before `end_at` less the completed payments on them received before it."""
+    invoices = Invoice.objects.filter(invoice_date__lt=end_at).exclude(status__in=['draft', 'cancelled'])
+    billed = invoices.aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+    paid = Payment.objects.filter(
+        status='completed', payment_date__lt=end_at, invoice__in=invoices
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+    return billed - paid
+
+
+def payables_as_of(end_at):
+    """Payables raised before `end_at` less the completed supplier payments on their purchase orders made before it."""
+    payables = AccountPayable.objects.filter(created_at__lt=end_at)
+    owed = payables.aggregate(total=Sum('original_amount'))['total'] or Decimal('0')
+    paid = SupplierPayment.objects.filter(
+        status='completed', payment_date__lt=end_at, purchase_order__in=payables.values('purchase_order')
+    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+    return owed - paid
+
+
+def live_totals(start, end):
+    """
+    Totals of one period from the transaction tables.
+
+    Revenue is completed payments by method and expenses are approved or
+    paid expenses by category, each dated within the period; receivables
+    and payables are the balances outstanding at the end of the period,
+    rebuilt from the documents dated before it.
+    """
+    start_at = day_start(start)
+    end_at = day_start(end + timedelta(days=1))
+    revenue = list(
+        Payment.objects.filter(status='completed', payment_date__gte=start_at, payment_date__lt=end_at)
+        .order_by('payment_method').values('payment_method')
+        .annotate(payment_count=Count('id'), amount=Sum('amount'))
+    )
+    expenses = list(
+        Expense.objects.filter(status__in=EXPENSE_STATUSES, expense_date__gte=start_at, expense_date__lt=end_at)
+        .order_by('category').values('category')
+        .annotate(expense_count=Count('id'), amount=Sum('amount'))
+    )
+
+    revenue_total = sum((row['amount'] for row in revenue), Decimal('0'))
+    expense_total = sum((row['amount'] for row in expenses), Decimal('0'))
+    return {
+        'year': start.year,
+        'month': start.month,
+        'start_date': start,
+        'end_date': end,
+        'closed': False,
+        'revenue_total': revenue_total,
+        'payment_count': sum(row['payment_count'] for row in revenue),
+        'expense_total': expense_total,
+        'expense_count': sum(row['expense_count'] for row in expenses),
+        'net_income': revenue_total - expense_total,
+        'receivables_balance': receivables_as_of(end_at),
+        'payables_balance': payables_as_of(end_at),
+        'revenue_by_method': revenue,
+        'expenses_by_category': expenses,
+    }
+
+
+def snapshot_totals(period):
+    """Totals of a closed period; expects its revenue and expense snapshots prefetched."""
+    return {
+        'year': period.year,
+        'month': period.month,
+        'start_date': period.start_date,
+        'end_date': period.end_date,
+        'closed': True,
+        'closed_at': period.closed_at,
+        'revenue_total': period.revenue_total,
+        'payment_count': period.payment_count,
+        'expense_total': period.expense_total,
+        'expense_count': period.expense_count,
+        'net_income': period.net_income,
+        'receivables_balance': period.receivables_balance,
+        'payables_balance': period.payables_balance,
+        'revenue_by_method': [
+            {'payment_method': row.payment_method, 'payment_count': row.payment_count, 'amount': row.amount}
+            for row in period.revenue.all()
+        ],
+        'expenses_by_category': [
+            {'category': row.category, 'expense_count': row.expense_count, 'amount': row.amount}
+            for row in period.expenses.all()
+        ],
+    }
+
+
+def close_period(year, month, user=None, reclose=False):
+    """
+    Freeze a finished month's totals into the snapshot tables.
+
+    The current month cannot be closed. Closing an already closed month
+    needs `reclose`, which replaces its snapshots with fresh totals.
+    Returns the FinancialPeriod.
+    """
+    start, end = month_bounds(year, month)
+    if end >= timezone.localdate():
+        raise PeriodError(f'{year}-{month:02d} has not ended yet', status_code=409)
+
+    with transaction.atomic():
+        period = FinancialPeriod.objects.select_for_update().filter(year=year, month=month).first()
+        if period is not None and not reclose:
+            raise PeriodError(f'{year}-{month:02d} is already closed', status_code=409)
+
+        totals = live_totals(start, end)
+        fields = {
+            name: totals[name] for name in [
+                'revenue_total', 'payment_count', 'expense_total', 'expense_count',
+                'net_income', 'receivables_balance', 'payables_balance',
+            ]
+        }
+        period, created = FinancialPeriod.objects.update_or_create(
+            year=year, month=month,
+            defaults={'start_date': start, 'end_date': end, 'closed_by': user, **fields},
+        )
+        if not created:
+            period.revenue.all().delete()
+            period.expenses.all().delete()
+        PeriodRevenueSnapshot.objects.bulk_create([
+            PeriodRevenueSnapshot(period=period, **row) for row in totals['revenue_by_method']
+        ])
+        PeriodExpenseSnapshot.objects.bulk_create([
+            PeriodExpenseSnapshot(period=period, **row) for row in totals['expenses_by_category']
+        ])
+    return period
+
+
+def period_summary(start, end):
+    """
+    Monthly totals for every month from `start` to `end`.
+
+    Closed months come from their snapshots, read for the whole range with
+    three queries; only months not closed yet are aggregated live.
+    """
+    closed = {
+        (period.year, period.month): period
+        for period in FinancialPeriod.objects.filter(
+            start_date__gte=start.replace(day=1), end_date__lte=month_bounds(end.year, end.month)[1]
+        ).prefetch_related('revenue', 'expenses')
+    }
+    months = []
+    for year, month in months_between(start, end):
+        period = closed.get((year, month))
+        months.append(snapshot_totals(period) if period else live_totals(*month_bounds(year, month)))
+    return months
@@ -0,0 +1,364 @@
+"""
+Bank statement reconciliation for Car ERP System.
+"""
+import csv
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from customers import overview
+from . import aging, stats
+from .ledger import post_on_commit
+from .models import (
+    Invoice, Payment, BankStatement, BankStatementLine, NumberSequence, monthly_prefix, round_money
+)
+
+DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%d.%m.%Y']
+
+# Most payments within the amount tolerance examined for one line in the fuzzy pass.
+FUZZY_MAX_CANDIDATES = 50
+
+# Invoices a statement credit can pay: issued to the customer and not yet settled.
+PAYABLE_STATUSES = ['sent', 'overdue']
+
+TOKEN_RE = re.compile(r'[A-Z0-9]+')
+
+
+def parse_date(raw):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f'date: "{raw}" is not a recognised date')
+
+
+def parse_amount(raw):
+    try:
+        return round_money(re.sub(r'[^0-9.\-]', '', raw))
+    except InvalidOperation:
+        raise ValueError(f'amount: "{raw}" is not a number')
+
+
+def parse_statement(lines):
+    """
+    Read statement CSV rows with date, amount, description, reference and transaction_id columns.
+
+    Returns (unsaved BankStatementLine objects, errors).
+    """
+    parsed = []
+    errors = []
+    for number, row in enumerate(csv.DictReader(lines), start=2):
+        row = {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+        try:
+            parsed.append(BankStatementLine(
+                line_number=number,
+                transaction_date=parse_date(row.get('date', '')),
+                amount=parse_amount(row.get('amount', '')),
+                description=row.get('description', '')[:255] or None,
+                reference=row.get('reference', '')[:100] or None,
+                transaction_id=row.get('transaction_id', '')[:100] or None,
+            ))
+        except ValueError as e:
+            errors.append({'row': number, 'error': str(e)})
+    return parsed, errors
+
+
+class OpenItems:
+    """
+    In-memory hash indexes of unreconciled payments and open invoices.
+
+    Payments are keyed by transaction id and reference number and kept
+    sorted by amount for the fuzzy pass; issued invoices are keyed by number
+    and by outstanding amount. Each record is matched at most once.
+    """
+
+    def __init__(self):
+        self.payments_by_transaction = {}
+        self.payments_by_reference = {}
+        self.payments_sorted = []
+        self.used_payments = set()
+
+        payments = Payment.objects.filter(
+            status__in=['pending', 'completed'], statement_lines__isnull=True
+        ).values_list('id', 'amount', 'transaction_id', 'reference_number', 'payment_date')
+        for payment_id, amount, transaction_id, reference, payment_date in payments.iterator(chunk_size=5000):
+            if transaction_id:
+                self.payments_by_transaction.setdefault(transaction_id, payment_id)
+            if reference:
+                self.payments_by_reference.setdefault(reference, payment_id)
+            self.payments_sorted.append((amount, timezone.localdate(payment_date), payment_id))
+        self.payments_sorted.sort()
+        self.payment_amounts = [amount for amount, payment_date, payment_id in self.payments_sorted]
+
+        self.invoices = {}
+        self.outstanding = {}
+        self.invoices_by_number = {}
+        self.invoices_by_amount = defaultdict(list)
+        self.used_invoices = set()
+        invoices = Invoice.objects.filter(status__in=PAYABLE_STATUSES).annotate(
+            outstanding=F('total_amount') - F('paid_amount')
+        ).filter(outstanding__gt=0).values_list('id', 'invoice_number', 'customer_id', 'outstanding')
+        for invoice_id, invoice_number, customer_id, outstanding in invoices.iterator(chunk_size=5000):
+            self.invoices[invoice_id] = customer_id
+            self.outstanding[invoice_id] = outstanding
+            self.invoices_by_number[invoice_number.upper()] = invoice_id
+            self.invoices_by_amount[outstanding].append(invoice_id)
+
+    def take_payment(self, payment_id):
+        if payment_id is None or payment_id in self.used_payments:
+            return None
+        self.used_payments.add(payment_id)
+        return payment_id
+
+    def exact_match(self, line):
+        """(match type, payment id, invoice id) for an exact hit, or None."""
+        payment_id = self.take_payment(self.payments_by_transaction.get(line.transaction_id))
+        if payment_id:
+            return 'transaction_id', payment_id, None
+        payment_id = self.take_payment(self.payments_by_reference.get(line.reference))
+        if payment_id:
+            return 'reference', payment_id, None
+
+        text = f'{line.reference or ""} {line.description or ""}'.upper()
+        for token in TOKEN_RE.findall(text):
+            invoice_id = self.invoices_by_number.get(token)
+            if invoice_id and invoice_id not in self.used_invoices:
+                self.used_invoices.add(invoice_id)
+                return 'invoice_number', None, invoice_id
+
+        candidates = [
+            invoice_id for invoice_id in self.invoices_by_amount.get(line.amount, [])
+            if invoice_id not in self.used_invoices
+        ]
+        if len(candidates) == 1:
+            self.used_invoices.add(candidates[0])
+            return 'amount', None, candidates[0]
+        return None
+
+    def fuzzy_match(self, line, tolerance, window_days):
+        """
+        Closest unused payment within the amount tolerance and date window.
+
+        Only the first FUZZY_MAX_CANDIDATES payments in the amount range are
+        examined, so a line costs a bisect plus a bounded scan.
+        """
+        best = None
+        position = bisect_left(self.payment_amounts, line.amount - tolerance)
+        examined = 0
+        for amount, payment_date, payment_id in self.payments_sorted[position:]:
+            if amount > line.amount + tolerance or examined >= FUZZY_MAX_CANDIDATES:
+                break
+            examined += 1
+            if payment_id in self.used_payments:
+                continue
+            days = abs((payment_date - line.transaction_date).days)
+            if days <= window_days:
+                score = (abs(amount - line.amount), days)
+                if best is None or score < best[0]:
+                    best = (score, payment_id)
+        if best is None:
+            return None
+        self.used_payments.add(best[1])
+        return 'fuzzy', best[1], None
+
+
+def content_key(line):
+    return line.transaction_date, line.amount, line.reference, line.description
+
+
+def already_imported(lines, chunk_size=5000):
+    """
+    Line numbers of these lines that an earlier import already holds.
+
+    Lines carrying a transaction id are recognised by it. The others are
+    compared on date, amount, reference and description; since a statement
+    can list the same transfer twice, only as many copies of a line as are
+    already stored count as seen.
+    """
+    transaction_ids = [line.transaction_id for line in lines if line.transaction_id]
+    seen_ids = set()
+    for start in range(0, len(transaction_ids), chunk_size):
+        seen_ids.update(BankStatementLine.objects.filter(
+            transaction_id__in=transaction_ids[start:start + chunk_size]
+        ).values_list('transaction_id', flat=True))
+    seen = {line.line_number for line in lines if line.transaction_id in seen_ids}
+
+    keyless = [line for line in lines if not line.transaction_id]
+    if keyless:
+        stored = Counter(BankStatementLine.objects.filter(
+            transaction_id__isnull=True,
+            transaction_date__range=(
+                min(line.transaction_date for line in keyless), max(line.transaction_date for line in keyless)
+            ),
+            amount__in={line.amount for line in keyless},
+        ).values_list('transaction_date', 'amount', 'reference', 'description').iterator(chunk_size=chunk_size))
+        for line in keyless:
+            key = content_key(line)
+            if stored[key] > 0:
+                stored[key] -= 1
+                seen.add(line.line_number)
+    return seen
+
+
+def match_lines(lines, tolerance=None, window_days=None):
+    """
+    Match statement lines in place: every exact hit first, then the fuzzy pass.
+
+    Only credits (positive amounts) are matched. A credit matched to an
+    invoice pays at most its outstanding balance; the rest is left as the
+    line's unmatched_amount. The fuzzy pass links lines to payments already
+    on record and never to invoices, so it cannot create money from an
+    approximate match.
+    """
+    if tolerance is None:
+        tolerance = Decimal(settings.RECONCILIATION_AMOUNT_TOLERANCE)
+    if window_days is None:
+        window_days = settings.RECONCILIATION_DATE_WINDOW_DAYS
+
+    items = OpenItems()
+    credits = [line for line in lines if line.amount > 0]
+    unmatched = []
+    for line in credits:
+        match = items.exact_match(line)
+        if match:
+            line.match_type, line.payment_id, line.invoice_id = match
+            if line.invoice_id:
+                line.unmatched_amount = max(line.amount - items.outstanding[line.invoice_id], 0)
+        else:
+            unmatched.append(line)
+    for line in unmatched:
+        match = items.fuzzy_match(line, tolerance, window_days)
+        if match:
+            line.match_type, line.payment_id, line.invoice_id = match
+    return items
+
+
+def apply_invoice_matches(lines, customers, user, now):
+    """
+    Record a bank transfer payment for every line matched straight to an invoice.
+
+    The invoices are locked first and each payment is capped at the balance
+    still outstanding, so an invoice is never overpaid: the surplus stays on
+    the line as its unmatched_amount, and a line whose invoice was settled or
+    cancelled meanwhile loses its match. Payment numbers are reserved in one
+    allocation, the payments are bulk inserted and the invoices are updated
+    in bulk.
+    """
+    invoice_lines = [line for line in lines if line.invoice_id and not line.payment_id]
+    if not invoice_lines:
+        return 0
+
+    invoices = Invoice.objects.select_for_update().filter(
+        pk__in={line.invoice_id for line in invoice_lines}, status__in=PAYABLE_STATUSES
+    ).only('id', 'total_amount', 'paid_amount')
+    invoices = {invoice.pk: invoice for invoice in invoices}
+    applied = []
+    for line in invoice_lines:
+        invoice = invoices.get(line.invoice_id)
+        amount = min(line.amount, invoice.total_amount - invoice.paid_amount) if invoice else 0
+        if amount <= 0:
+            line.match_type = line.invoice_id = None
+            line.unmatched_amount = 0
+            continue
+        invoice.paid_amount += amount
+        line.unmatched_amount = line.amount - amount
+        applied.append((line, amount))
+    if not applied:
+        return 0
+
+    numbers = NumberSequence.allocate(
+        monthly_prefix('PAY'), count=len(applied), model=Payment, field='payment_number'
+    )
+    payments = [
+        Payment(
+            payment_number=number,
+            invoice_id=line.invoice_id,
+            customer_id=customers[line.invoice_id],
+            amount=amount,
+            payment_method='bank_transfer',
+            status='completed',
+            transaction_id=line.transaction_id,
+            reference_number=line.reference,
+            processed_date=now,
+            notes=f'Reconciled from bank statement line {line.line_number}',
+            created_by=user,
+            processed_by=user,
+        )
+        for (line, amount), number in zip(applied, numbers)
+    ]
+    Payment.objects.bulk_create(payments, batch_size=1000)
+    post_on_commit('payment', [payment.pk for payment in payments])
+    stats.invalidate()
+    # The bulk insert and invoice UPDATEs below skip the post_save cache invalidation and aging refresh.
+    overview.invalidate_on_commit(customers[line.invoice_id] for line, _ in applied)
+    aging.refresh_on_commit('receivable', (customers[line.invoice_id] for line, _ in applied))
+    for (line, _), payment in zip(applied, payments):
+        line.payment = payment
+
+    paid = {line.invoice_id for line, _ in applied}
+    # Invoices paid off in full (the usual case) are closed with one UPDATE.
+    settled = {pk for pk in paid if invoices[pk].paid_amount == invoices[pk].total_amount}
+    Invoice.objects.filter(pk__in=settled).update(
+        paid_amount=F('total_amount'), balance_due=0, status='paid', paid_date=now, updated_at=now
+    )
+
+    partial = [invoices[pk] for pk in paid - settled]
+    for invoice in partial:
+        invoice.balance_due = invoice.total_amount - invoice.paid_amount
+        invoice.updated_at = now
+    Invoice.objects.bulk_update(partial, ['paid_amount', 'balance_due', 'updated_at'], batch_size=1000)
+    return len(payments)
+
+
+def reconcile_statement(lines, source_name, user=None, dry_run=False):
+    """
+    Import a statement file and match its lines to payments and invoices.
+
+    Lines imported before, by transaction id or by content, are skipped,
+    so loading the same file twice does not pay an invoice twice. Returns a summary
+    with counts per match type and the credit left unmatched beyond invoice
+    balances. With `dry_run` nothing is written.
+    """
+    parsed, errors = parse_statement(lines)
+    now = timezone.now()
+    with transaction.atomic():
+        seen = already_imported(parsed)
+        duplicates = len(parsed)
+        parsed = [line for line in parsed if line.line_number not in seen]
+        duplicates -= len(parsed)
+        items = match_lines(parsed)
+        payments_created = 0
+        if not dry_run:
+            payments_created = apply_invoice_matches(parsed, items.invoices, user, now)
+        matched = [line for line in parsed if line.match_type]
+        summary = {
+            'statement': None,
+            'lines': len(parsed),
+            'matched': len(matched),
+            'unmatched': len(parsed) - len(matched),
+            'unmatched_surplus': sum((line.unmatched_amount for line in matched), Decimal('0')),
+            'by_match_type': dict(Counter(line.match_type for line in matched)),
+            'duplicates_skipped': duplicates,
+            'payments_created': payments_created,
+            'errors': errors,
+            'dry_run': dry_run,
+        }
+        if dry_run:
+            return summary
+
+        statement = BankStatement.objects.create(
+            source_name=source_name, line_count=len(parsed), matched_count=len(matched), uploaded_by=user
+        )
+        summary['statement'] = statement.pk
+        for line in parsed:
+            line.statement = statement
+            if line.match_type:
+                line.matched_at = now
+        BankStatementLine.objects.bulk_create(parsed, batch_size=1000)
+    return summary
@@ -4,7 +4,9 @@ Accounting serializers for Car ERP System.
 from rest_framework import serializers
 from .models import (
     Invoice, InvoiceItem, Payment, SupplierPayment, Expense,
-    AccountReceivable, AccountPayable
+    AccountReceivable, AccountPayable, BankStatement, BankStatementLine,
+    ReceivableAging, PayableAging, LedgerAccount, JournalEntry, JournalLine,
+    FinancialPeriod, PeriodRevenueSnapshot, PeriodExpenseSnapshot
 )
 from customers.serializers import CustomerSerializer
 from job_orders.serializers import JobOrderSerializer
@@ -33,7 +35,18 @@ class InvoiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Invoice
         fields = '__all__'
-        read_only_fields = ['invoice_number', 'invoice_date', 'updated_at', 'balance_due']
+        read_only_fields = ['invoice_number', 'invoice_date', 'updated_at', 'subtotal', 'tax_amount', 'total_amount', 'balance_due', 'overdue_since']
+    
+    def validate(self, attrs):
+        job_order = attrs.get('job_order', getattr(self.instance, 'job_order', None))
+        invoice_status = attrs.get('status', getattr(self.instance, 'status', 'draft'))
+        if job_order and invoice_status != 'cancelled':
+            others = Invoice.objects.filter(job_order=job_order).exclude(status='cancelled')
+            if self.instance is not None:
+                others = others.exclude(pk=self.instance.pk)
+            if others.exists():
+                raise serializers.ValidationError({'job_order': 'This job order already has an active invoice'})
+        return attrs
     
     def get_customer_name(self, obj):
         return obj.customer.full_name
@@ -41,6 +54,8 @@ class InvoiceSerializer(serializers.ModelSerializer):
     def get_job_order_number(self, obj):
         if obj.job_order:
             return obj.job_order.job_number
+        if obj.archived_job_order:
+            return obj.archived_job_order.job_number
         return None
     
     def get_created_by_name(self, obj):
@@ -59,7 +74,7 @@ class InvoiceDetailSerializer(InvoiceSerializer):
     items = InvoiceItemSerializer(many=True, read_only=True)
     
     class Meta(InvoiceSerializer.Meta):
-        fields = InvoiceSerializer.Meta.fields + ['customer', 'job_order', 'created_by', 'items']
+        fields = '__all__'
 
 
 class PaymentSerializer(serializers.ModelSerializer):
@@ -103,7 +118,7 @@ class PaymentDetailSerializer(PaymentSerializer):
     processed_by = UserSerializer(read_only=True)
     
     class Meta(PaymentSerializer.Meta):
-        fields = PaymentSerializer.Meta.fields + ['customer', 'invoice', 'created_by', 'processed_by']
+        fields = '__all__'
 
 
 class SupplierPaymentSerializer(serializers.ModelSerializer):
@@ -149,7 +164,7 @@ class SupplierPaymentDetailSerializer(SupplierPaymentSerializer):
     processed_by = UserSerializer(read_only=True)
     
     class Meta(SupplierPaymentSerializer.Meta):
-        fields = SupplierPaymentSerializer.Meta.fields + ['supplier', 'purchase_order', 'created_by', 'processed_by']
+        fields = '__all__'
 
 
 class ExpenseSerializer(serializers.ModelSerializer):
@@ -183,7 +198,7 @@ class ExpenseDetailSerializer(ExpenseSerializer):
     approved_by = UserSerializer(read_only=True)
     
     class Meta(ExpenseSerializer.Meta):
-        fields = ExpenseSerializer.Meta.fields + ['created_by', 'approved_by']
+        fields = '__all__'
 
 
 class AccountReceivableSerializer(serializers.ModelSerializer):
@@ -222,3 +237,116 @@ class AccountPayableSerializer(serializers.ModelSerializer):
     
     def get_purchase_order_number(self, obj):
         return obj.purchase_order.po_number
+
+
+class BankStatementSerializer(serializers.ModelSerializer):
+    """
+    Bank statement serializer.
+    """
+    class Meta:
+        model = BankStatement
+        fields = '__all__'
+        read_only_fields = ['source_name', 'line_count', 'matched_count', 'uploaded_by', 'created_at']
+
+
+class BankStatementLineSerializer(serializers.ModelSerializer):
+    """
+    Bank statement line serializer.
+    """
+    payment_number = serializers.CharField(source='payment.payment_number', read_only=True, default=None)
+    invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True, default=None)
+    
+    class Meta:
+        model = BankStatementLine
+        fields = '__all__'
+
+
+class ReceivableAgingSerializer(serializers.ModelSerializer):
+    """
+    Receivable aging serializer.
+    """
+    customer_name = serializers.CharField(source='customer.full_name', read_only=True)
+    
+    class Meta:
+        model = ReceivableAging
+        fields = '__all__'
+
+
+class PayableAgingSerializer(serializers.ModelSerializer):
+    """
+    Payable aging serializer.
+    """
+    supplier_name = serializers.CharField(source='supplier.name', read_only=True)
+    
+    class Meta:
+        model = PayableAging
+        fields = '__all__'
+
+
+class LedgerAccountSerializer(serializers.ModelSerializer):
+    """
+    Ledger account serializer.
+    """
+    class Meta:
+        model = LedgerAccount
+        fields = '__all__'
+        read_only_fields = ['balance', 'last_entry_date']
+
+
+class JournalLineSerializer(serializers.ModelSerializer):
+    """
+    Journal line serializer.
+    """
+    account_code = serializers.CharField(source='account.code', read_only=True)
+    account_name = serializers.CharField(source='account.name', read_only=True)
+    
+    class Meta:
+        model = JournalLine
+        fields = ['id', 'account', 'account_code', 'account_name', 'debit', 'credit', 'balance_after']
+
+
+class JournalEntrySerializer(serializers.ModelSerializer):
+    """
+    Journal entry serializer with its lines.
+    """
+    lines = JournalLineSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = JournalEntry
+        fields = '__all__'
+
+
+class PeriodRevenueSnapshotSerializer(serializers.ModelSerializer):
+    """
+    Period revenue snapshot serializer.
+    """
+    class Meta:
+        model = PeriodRevenueSnapshot
+        fields = ['payment_method', 'payment_count', 'amount']
+
+
+class PeriodExpenseSnapshotSerializer(serializers.ModelSerializer):
+    """
+    Period expense snapshot serializer.
+    """
+    class Meta:
+        model = PeriodExpenseSnapshot
+        fields = ['category', 'expense_count', 'amount']
+
+
+class FinancialPeriodSerializer(serializers.ModelSerializer):
+    """
+    Closed financial period serializer with its snapshots.
+    """
+    revenue = PeriodRevenueSnapshotSerializer(many=True, read_only=True)
+    expenses = PeriodExpenseSnapshotSerializer(many=True, read_only=True)
+    closed_by_name = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = FinancialPeriod
+        fields = '__all__'
+    
+    def get_closed_by_name(self, obj):
+        if obj.closed_by:
+            return obj.closed_by.get_full_name()
+        return None
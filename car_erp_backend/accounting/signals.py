@@ -0,0 +1,74 @@
+"""
+Signal handlers for accounting app.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal
+from . import aging, stats
+from .ledger import post_on_commit
+
+# Sent once per customer after the overdue sweep commits, for dunning.
+# Receivers get customer_id, invoice_count, balance_due and the sweep run.
+invoices_overdue = Signal()
+
+# Models whose writes change a counterparty's aging, with the ledger and
+# the attribute holding the counterparty id.
+AGING_SOURCES = {
+    'accounting.Invoice': ('receivable', 'customer_id'),
+    'accounting.Payment': ('receivable', 'customer_id'),
+    'accounting.AccountPayable': ('payable', 'supplier_id'),
+    'accounting.SupplierPayment': ('payable', 'supplier_id'),
+}
+
+# Models whose writes change journal postings, with the source type and
+# the attribute holding the source document id.
+LEDGER_SOURCES = {
+    'accounting.Invoice': ('invoice', 'pk'),
+    'accounting.InvoiceItem': ('invoice', 'invoice_id'),
+    'accounting.Payment': ('payment', 'pk'),
+    'accounting.Expense': ('expense', 'pk'),
+    'accounting.SupplierPayment': ('supplier_payment', 'pk'),
+}
+
+# Models whose writes change the accounting dashboard statistics.
+STATS_SOURCES = [
+    'accounting.Invoice',
+    'accounting.Payment',
+    'accounting.Expense',
+    'accounting.AccountReceivable',
+    'accounting.AccountPayable',
+]
+
+
+def _aging_refresher(ledger, attribute):
+    def refresh_counterparty_aging(sender, instance, **kwargs):
+        party_id = getattr(instance, attribute)
+        transaction.on_commit(lambda: aging.refresh_aging(ledger, [party_id]))
+    return refresh_counterparty_aging
+
+
+for model, (ledger, attribute) in AGING_SOURCES.items():
+    handler = _aging_refresher(ledger, attribute)
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=f'aging_save_{model}')
+    post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f'aging_delete_{model}')
+
+
+def _ledger_poster(source_type, attribute):
+    def post_source_document(sender, instance, **kwargs):
+        post_on_commit(source_type, [getattr(instance, attribute)])
+    return post_source_document
+
+
+for model, (source_type, attribute) in LEDGER_SOURCES.items():
+    handler = _ledger_poster(source_type, attribute)
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=f'ledger_save_{model}')
+    post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f'ledger_delete_{model}')
+
+
+def invalidate_accounting_stats(sender, **kwargs):
+    stats.invalidate()
+
+
+for model in STATS_SOURCES:
+    post_save.connect(invalidate_accounting_stats, sender=model, dispatch_uid=f'stats_save_{model}')
+    post_delete.connect(invalidate_accounting_stats, sender=model, dispatch_uid=f'stats_delete_{model}')
@@ -0,0 +1,75 @@
+"""
+Accounting dashboard statistics for Car ERP System.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from .models import Invoice, Payment, Expense, AccountReceivable, AccountPayable
+
+# Lives in the shared default cache (Redis), so a bump from any process reaches every worker.
+VERSION_KEY = 'accounting_stats:version'
+
+
+def cache_key(version):
+    return f'accounting_stats:{version}'
+
+
+def bump_version():
+    """Move to a new cache version, leaving any cached statistics behind to expire."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, None)
+
+
+def invalidate():
+    """
+    Invalidate the cached statistics once the current transaction commits.
+
+    Bumping after the commit means a request that read the old rows while
+    the transaction was open cannot leave them cached under the new version.
+    """
+    transaction.on_commit(bump_version)
+
+
+def build_accounting_stats():
+    """Invoice, payment, receivable, payable and expense totals; one aggregate query per table."""
+    invoices = Invoice.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='sent')),
+        paid=Count('id', filter=Q(status='paid')),
+        overdue=Count('id', filter=Q(status='overdue')),
+    )
+    payments = Payment.objects.aggregate(total_count=Count('id'), total_amount=Sum('amount'))
+    receivables = AccountReceivable.objects.aggregate(total=Sum('current_amount'))['total']
+    payables = AccountPayable.objects.aggregate(total=Sum('current_amount'))['total']
+    expenses = Expense.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        approved=Count('id', filter=Q(status='approved')),
+    )
+    return {
+        'invoices': invoices,
+        'payments': {
+            'total_count': payments['total_count'],
+            'total_amount': payments['total_amount'] or 0,
+        },
+        'receivables': receivables or 0,
+        'payables': payables or 0,
+        'expenses': expenses,
+    }
+
+
+def get_accounting_stats():
+    """Cached accounting statistics for the current cache version."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    key = cache_key(version)
+    data = cache.get(key)
+    if data is None:
+        data = build_accounting_stats()
+        cache.set(key, data, settings.ACCOUNTING_STATS_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,153 @@
+"""
+Accounting tests for Car ERP System.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.utils import timezone
+from authentication.models import User
+from customers.models import Customer
+from .ledger import RECEIVABLES, balances_as_of, post_documents
+from .models import Invoice, Payment, IdempotencyKey, JournalEntry
+from .payments import apply_payment
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def run_concurrently(calls):
+    """
+    Run each zero-argument callable in its own thread, released together.
+
+    Returns one (result, exception) pair per call. Every thread closes its
+    own database connection before it exits.
+    """
+    barrier = threading.Barrier(len(calls))
+
+    def run(call):
+        try:
+            barrier.wait()
+            return call(), None
+        except Exception as e:
+            return None, e
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        return list(executor.map(run, calls))
+
+
+@skipUnlessDBFeature('has_select_for_update')
+@override_settings(CACHES=LOCAL_CACHE)
+class ConcurrentPaymentTests(TransactionTestCase):
+    """
+    Payments applied from parallel requests, each on its own connection.
+    """
+    workers = 8
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cashier', email='cashier@example.com', password='x', role='accountant'
+        )
+        customer = Customer.objects.create(
+            first_name='Ana', last_name='Silva', phone='5550100', address_line1='1 Main St',
+            city='Springfield', state='IL', postal_code='62701'
+        )
+        self.invoice = Invoice.objects.create(customer=customer, status='sent', subtotal=Decimal('1000.00'))
+
+    def test_replayed_key_creates_one_payment(self):
+        calls = [
+            lambda: apply_payment(self.invoice.pk, '25.00', 'cash', self.user, idempotency_key='retry-1')
+            for _ in range(self.workers)
+        ]
+        results = run_concurrently(calls)
+
+        self.assertEqual([error for _, error in results], [None] * self.workers)
+        self.assertEqual(sorted(replayed for (_, replayed), _ in results), [False] + [True] * (self.workers - 1))
+        self.assertEqual(len({str(body) for (body, _), _ in results}), 1)
+        self.assertEqual(Payment.objects.filter(invoice=self.invoice).count(), 1)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.paid_amount, Decimal('25.00'))
+        self.assertEqual(self.invoice.balance_due, Decimal('975.00'))
+
+    def test_distinct_keys_add_up(self):
+        calls = [
+            lambda n=n: apply_payment(self.invoice.pk, f'{n}.50', 'credit_card', self.user, idempotency_key=f'key-{n}')
+            for n in range(1, self.workers + 1)
+        ]
+        results = run_concurrently(calls)
+
+        self.assertEqual([error for _, error in results], [None] * self.workers)
+        expected = sum(Decimal(f'{n}.50') for n in range(1, self.workers + 1))
+        self.assertEqual(Payment.objects.filter(invoice=self.invoice).count(), self.workers)
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.paid_amount, expected)
+        self.assertEqual(self.invoice.balance_due, self.invoice.total_amount - expected)
+
+    def test_same_key_from_another_user_is_a_new_payment(self):
+        other = User.objects.create_user(
+            username='frontdesk', email='frontdesk@example.com', password='x', role='accountant'
+        )
+        apply_payment(self.invoice.pk, '10.00', 'cash', self.user, idempotency_key='shared')
+        _, replayed = apply_payment(self.invoice.pk, '10.00', 'cash', other, idempotency_key='shared')
+
+        self.assertFalse(replayed)
+        self.assertEqual(Payment.objects.filter(invoice=self.invoice).count(), 2)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class LedgerDatingTests(TestCase):
+    """
+    Entry dates and as-of balances when documents are posted out of date order.
+    """
+    today = date(2026, 3, 31)
+
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name='Ana', last_name='Silva', phone='5550100', address_line1='1 Main St',
+            city='Springfield', state='IL', postal_code='62701'
+        )
+
+    def invoice(self, day, subtotal):
+        invoice = Invoice.objects.create(customer=self.customer, status='sent', subtotal=Decimal(subtotal))
+        Invoice.objects.filter(pk=invoice.pk).update(
+            invoice_date=timezone.make_aware(datetime.combine(day, time(12)))
+        )
+        return invoice
+
+    def post(self, *invoices):
+        return post_documents([('invoice', invoice.pk) for invoice in invoices], today=self.today)
+
+    def receivables(self, day):
+        return balances_as_of(day).get(code=RECEIVABLES).closing
+
+    def entry_date(self, invoice):
+        return JournalEntry.objects.get(source_type='invoice', source_id=invoice.pk).entry_date
+
+    def test_backdated_document_keeps_later_entries_and_balances(self):
+        first = self.invoice(date(2026, 3, 10), '100.00')
+        last = self.invoice(date(2026, 3, 20), '200.00')
+        self.post(first, last)
+        backdated = self.invoice(date(2026, 3, 15), '40.00')
+        self.post(backdated)
+
+        self.assertEqual(self.entry_date(first), date(2026, 3, 10))
+        self.assertEqual(self.entry_date(last), date(2026, 3, 20))
+        self.assertEqual(self.entry_date(backdated), date(2026, 3, 15))
+        self.assertEqual(self.receivables(date(2026, 3, 14)), Decimal('100.00'))
+        self.assertEqual(self.receivables(date(2026, 3, 15)), Decimal('140.00'))
+        self.assertEqual(self.receivables(date(2026, 3, 20)), Decimal('340.00'))
+
+    def test_future_dated_document_is_posted_today_without_moving_others(self):
+        future = self.invoice(self.today + timedelta(days=30), '500.00')
+        self.post(future)
+        earlier = self.invoice(date(2026, 3, 5), '60.00')
+        self.post(earlier)
+
+        self.assertEqual(self.entry_date(future), self.today)
+        self.assertEqual(self.entry_date(earlier), date(2026, 3, 5))
+        self.assertEqual(self.receivables(date(2026, 3, 5)), Decimal('60.00'))
+        self.assertEqual(self.receivables(self.today), Decimal('560.00'))
@@ -9,6 +9,8 @@ urlpatterns = [
     path('invoices/', views.InvoiceListView.as_view(), name='invoice_list'),
     path('invoices/<int:pk>/', views.InvoiceDetailView.as_view(), name='invoice_detail'),
     path('invoices/<int:invoice_id>/process-payment/', views.process_payment, name='process_payment'),
+    path('invoices/<int:pk>/items/bulk/', views.bulk_edit_invoice_items, name='bulk_edit_invoice_items'),
+    path('invoices/<int:pk>/pdf/', views.invoice_pdf, name='invoice_pdf'),
     
     # Invoice Item endpoints
     path('invoice-items/', views.InvoiceItemListView.as_view(), name='invoice_item_list'),
@@ -28,9 +30,30 @@ urlpatterns = [
     
     # Account Receivable endpoints
     path('receivables/', views.AccountReceivableListView.as_view(), name='account_receivable_list'),
+    path('receivables/aging/', views.ReceivableAgingListView.as_view(), name='receivable_aging_list'),
     
     # Account Payable endpoints
     path('payables/', views.AccountPayableListView.as_view(), name='account_payable_list'),
+    path('payables/aging/', views.PayableAgingListView.as_view(), name='payable_aging_list'),
+    
+    # Bank reconciliation endpoints
+    path('bank-statements/', views.BankStatementListView.as_view(), name='bank_statement_list'),
+    path('bank-statements/import/', views.import_bank_statement, name='import_bank_statement'),
+    path('bank-statements/<int:pk>/lines/', views.BankStatementLineListView.as_view(), name='bank_statement_line_list'),
+    
+    # Customer statement endpoints
+    path('statements/<int:customer_id>/pdf/', views.customer_statement_pdf, name='customer_statement_pdf'),
+    
+    # General ledger endpoints
+    path('ledger/accounts/', views.LedgerAccountListView.as_view(), name='ledger_account_list'),
+    path('ledger/entries/', views.JournalEntryListView.as_view(), name='journal_entry_list'),
+    path('ledger/trial-balance/', views.ledger_trial_balance, name='ledger_trial_balance'),
+    path('ledger/profit-and-loss/', views.ledger_profit_and_loss, name='ledger_profit_and_loss'),
+    
+    # Financial period endpoints
+    path('periods/', views.FinancialPeriodListView.as_view(), name='financial_period_list'),
+    path('periods/close/', views.close_financial_period, name='close_financial_period'),
+    path('periods/summary/', views.financial_period_summary, name='financial_period_summary'),
     
     # Statistics endpoints
     path('stats/', views.accounting_stats, name='accounting_stats'),
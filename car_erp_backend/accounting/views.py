@@ -1,20 +1,35 @@
 """
 Accounting views for Car ERP System.
 """
+import codecs
+from datetime import datetime, timedelta
 from rest_framework import generics, permissions, filters, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Sum, Count
+from django.db import transaction
+from django.http import HttpResponse
+from django.db.models import Q
+from django.utils import timezone
 from .models import (
-    Invoice, InvoiceItem, Payment, SupplierPayment, Expense,
-    AccountReceivable, AccountPayable
+    round_money, Invoice, InvoiceItem, Payment, SupplierPayment, Expense,
+    AccountReceivable, AccountPayable, BankStatement, BankStatementLine,
+    ReceivableAging, PayableAging, LedgerAccount, JournalEntry, FinancialPeriod
 )
+from .documents import invoice_payload, statement_payloads, content_hash, get_or_render
+from .ledger import post_on_commit, trial_balance, profit_and_loss
+from .payments import apply_payment, PaymentError
+from .periods import close_period, period_summary, PeriodError, MAX_SUMMARY_MONTHS
+from .reconciliation import reconcile_statement
+from .stats import get_accounting_stats
 from .serializers import (
     InvoiceSerializer, InvoiceDetailSerializer, InvoiceItemSerializer,
     PaymentSerializer, PaymentDetailSerializer, SupplierPaymentSerializer,
     SupplierPaymentDetailSerializer, ExpenseSerializer, ExpenseDetailSerializer,
-    AccountReceivableSerializer, AccountPayableSerializer
+    AccountReceivableSerializer, AccountPayableSerializer,
+    BankStatementSerializer, BankStatementLineSerializer,
+    ReceivableAgingSerializer, PayableAgingSerializer,
+    LedgerAccountSerializer, JournalEntrySerializer, FinancialPeriodSerializer
 )
 from authentication.models import User
 
@@ -102,6 +117,80 @@ class InvoiceItemDetailView(generics.RetrieveUpdateDestroyAPIView):
         return InvoiceItem.objects.none()
 
 
+def is_item_id(value):
+    """True for a JSON integer id (booleans excluded)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_edit_invoice_items(request, pk):
+    """
+    Create, update and delete several items of one invoice at once.
+    
+    Body: `create` (list of items), `update` (list of items with `id`) and
+    `delete` (list of item ids). The changes are written with bulk queries
+    and the invoice totals are recomputed once at the end.
+    """
+    user = request.user
+    if not user.can_access_accounting():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    creates = request.data.get('create', [])
+    updates = request.data.get('update', [])
+    deletes = request.data.get('delete', [])
+    if not all(isinstance(value, list) for value in (creates, updates, deletes)):
+        return Response({'error': 'create, update and delete must be lists'}, status=status.HTTP_400_BAD_REQUEST)
+    if not all(isinstance(item, dict) and is_item_id(item.get('id')) for item in updates):
+        return Response({'error': 'Every update needs an integer id'}, status=status.HTTP_400_BAD_REQUEST)
+    if not all(is_item_id(item_id) for item_id in deletes):
+        return Response({'error': 'delete must be a list of integer ids'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    with transaction.atomic():
+        invoice = Invoice.objects.select_for_update().filter(pk=pk).first()
+        if invoice is None:
+            return Response({'error': 'Invoice not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        create_serializer = InvoiceItemSerializer(data=[{**item, 'invoice': invoice.pk} for item in creates], many=True)
+        create_serializer.is_valid(raise_exception=True)
+        new_items = [InvoiceItem(**data) for data in create_serializer.validated_data]
+        
+        existing = InvoiceItem.objects.in_bulk([item['id'] for item in updates])
+        changed = []
+        errors = {}
+        for item in updates:
+            instance = existing.get(item['id'])
+            if instance is None or instance.invoice_id != invoice.pk:
+                errors[str(item['id'])] = ['Item not found on this invoice']
+                continue
+            serializer = InvoiceItemSerializer(instance, data={**item, 'invoice': invoice.pk}, partial=True)
+            if not serializer.is_valid():
+                errors[str(instance.pk)] = serializer.errors
+                continue
+            for field, value in serializer.validated_data.items():
+                setattr(instance, field, value)
+            changed.append(instance)
+        if errors:
+            return Response({'update': errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        for item in new_items + changed:
+            item.total_price = round_money(item.quantity * item.unit_price)
+        InvoiceItem.objects.bulk_create(new_items)
+        InvoiceItem.objects.bulk_update(changed, ['description', 'quantity', 'unit_price', 'total_price', 'notes'])
+        deleted, _ = InvoiceItem.objects.filter(invoice=invoice, pk__in=deletes).delete()
+        Invoice.recalculate_totals(Invoice.objects.filter(pk=invoice.pk))
+        post_on_commit('invoice', [invoice.pk])
+    
+    invoice.refresh_from_db()
+    return Response({
+        'invoice': InvoiceSerializer(invoice).data,
+        'items': InvoiceItemSerializer(invoice.items.all(), many=True).data,
+        'created': len(new_items),
+        'updated': len(changed),
+        'deleted': deleted,
+    })
+
+
 class PaymentListView(generics.ListCreateAPIView):
     """
     List all payments or create a new payment.
@@ -289,67 +378,361 @@ class AccountPayableListView(generics.ListAPIView):
         return AccountPayable.objects.none()
 
 
+class ReceivableAgingListView(generics.ListAPIView):
+    """
+    Receivable aging per customer, largest balance first.
+    """
+    serializer_class = ReceivableAgingSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['customer']
+    ordering_fields = ['total', 'days_over_90', 'oldest_due_date']
+    ordering = ['-total']
+    
+    def get_queryset(self):
+        """Filter aging rows based on user permissions."""
+        user = self.request.user
+        if user.can_access_accounting():
+            return ReceivableAging.objects.select_related('customer')
+        return ReceivableAging.objects.none()
+
+
+class PayableAgingListView(generics.ListAPIView):
+    """
+    Payable aging per supplier, largest balance first.
+    """
+    serializer_class = PayableAgingSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['supplier']
+    ordering_fields = ['total', 'days_over_90', 'oldest_due_date']
+    ordering = ['-total']
+    
+    def get_queryset(self):
+        """Filter aging rows based on user permissions."""
+        user = self.request.user
+        if user.can_access_accounting():
+            return PayableAging.objects.select_related('supplier')
+        return PayableAging.objects.none()
+
+
+class BankStatementListView(generics.ListAPIView):
+    """
+    List imported bank statements.
+    """
+    queryset = BankStatement.objects.all()
+    serializer_class = BankStatementSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        """Filter statements based on user permissions."""
+        user = self.request.user
+        if user.can_access_accounting():
+            return BankStatement.objects.all()
+        return BankStatement.objects.none()
+
+
+class BankStatementLineListView(generics.ListAPIView):
+    """
+    Lines of one bank statement with their matches.
+    
+    `unmatched=true` limits the list to lines still to be reconciled by hand:
+    those without a match and those with an unmatched surplus.
+    """
+    serializer_class = BankStatementLineSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['match_type']
+    
+    def get_queryset(self):
+        """Filter lines based on user permissions."""
+        user = self.request.user
+        if not user.can_access_accounting():
+            return BankStatementLine.objects.none()
+        lines = BankStatementLine.objects.filter(statement_id=self.kwargs['pk']).select_related('payment', 'invoice')
+        if self.request.query_params.get('unmatched') == 'true':
+            lines = lines.filter(Q(match_type__isnull=True) | Q(unmatched_amount__gt=0))
+        return lines
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def import_bank_statement(request):
+    """
+    Import a statement CSV (multipart `file`) and reconcile it.
+    
+    Columns: date, amount, description, reference, transaction_id. Pass
+    `dry_run=true` to see the matches without recording anything.
+    """
+    user = request.user
+    if not user.can_access_accounting():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'A CSV file is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        summary = reconcile_statement(
+            codecs.iterdecode(upload, 'utf-8-sig'), upload.name, user=user,
+            dry_run=str(request.data.get('dry_run', '')).lower() == 'true',
+        )
+    except UnicodeDecodeError:
+        return Response({'error': 'File must be UTF-8 encoded CSV'}, status=status.HTTP_400_BAD_REQUEST)
+    response_status = status.HTTP_200_OK if summary['dry_run'] else status.HTTP_201_CREATED
+    return Response(summary, status=response_status)
+
+
+class LedgerAccountListView(generics.ListAPIView):
+    """
+    Chart of accounts with current running balances.
+    """
+    serializer_class = LedgerAccountSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['account_type', 'is_active']
+    
+    def get_queryset(self):
+        """Filter accounts based on user permissions."""
+        user = self.request.user
+        if user.can_access_accounting():
+            return LedgerAccount.objects.all()
+        return LedgerAccount.objects.none()
+
+
+class JournalEntryListView(generics.ListAPIView):
+    """
+    Journal entries with their lines, newest first.
+    """
+    serializer_class = JournalEntrySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['source_type', 'source_id', 'entry_date']
+    ordering_fields = ['entry_date', 'posted_at']
+    ordering = ['-entry_date', '-id']
+    
+    def get_queryset(self):
+        """Filter entries based on user permissions."""
+        user = self.request.user
+        if user.can_access_accounting():
+            return JournalEntry.objects.prefetch_related('lines__account')
+        return JournalEntry.objects.none()
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
-def accounting_stats(request):
+def ledger_trial_balance(request):
     """
-    Get accounting statistics.
+    Trial balance from the general ledger as of `as_of` (default today).
     """
     user = request.user
     if not user.can_access_accounting():
         return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
     
-    # Invoice statistics
-    total_invoices = Invoice.objects.count()
-    pending_invoices = Invoice.objects.filter(status='sent').count()
-    paid_invoices = Invoice.objects.filter(status='paid').count()
-    overdue_invoices = Invoice.objects.filter(status='overdue').count()
+    try:
+        as_of = request.GET.get('as_of')
+        as_of = datetime.strptime(as_of, '%Y-%m-%d').date() if as_of else timezone.localdate()
+    except ValueError:
+        return Response({'error': 'Dates must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Payment statistics
-    total_payments = Payment.objects.count()
-    total_payment_amount = Payment.objects.aggregate(total=Sum('amount'))['total'] or 0
+    return Response(trial_balance(as_of))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def ledger_profit_and_loss(request):
+    """
+    Profit and loss from the general ledger between `start_date` and `end_date`.
     
-    # Receivables and Payables
-    total_receivables = AccountReceivable.objects.aggregate(total=Sum('current_amount'))['total'] or 0
-    total_payables = AccountPayable.objects.aggregate(total=Sum('current_amount'))['total'] or 0
+    Defaults to the current month to date.
+    """
+    user = request.user
+    if not user.can_access_accounting():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
     
-    # Expense statistics
-    total_expenses = Expense.objects.count()
-    pending_expenses = Expense.objects.filter(status='pending').count()
-    approved_expenses = Expense.objects.filter(status='approved').count()
+    try:
+        end_date = request.GET.get('end_date')
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else timezone.localdate()
+        start_date = request.GET.get('start_date')
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else end_date.replace(day=1)
+    except ValueError:
+        return Response({'error': 'Dates must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+    if start_date > end_date:
+        return Response({'error': 'start_date must not be after end_date'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(profit_and_loss(start_date, end_date))
+
+
+def pdf_response(name, payload, filename, request):
+    """
+    PDF download keyed by the document's content hash.
     
-    return Response({
-        'invoices': {
-            'total': total_invoices,
-            'pending': pending_invoices,
-            'paid': paid_invoices,
-            'overdue': overdue_invoices,
-        },
-        'payments': {
-            'total_count': total_payments,
-            'total_amount': total_payment_amount,
-        },
-        'receivables': total_receivables,
-        'payables': total_payables,
-        'expenses': {
-            'total': total_expenses,
-            'pending': pending_expenses,
-            'approved': approved_expenses,
-        }
-    })
+    The hash is the ETag, so a client holding the current version gets a
+    304 and an unchanged document is read from the storage cache instead
+    of being rendered again.
+    """
+    digest = content_hash(name, payload)
+    etag = f'"{digest}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = HttpResponse(get_or_render(name, payload, digest), content_type='application/pdf')
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+    response['ETag'] = etag
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def invoice_pdf(request, pk):
+    """
+    Download an invoice as PDF.
+    """
+    user = request.user
+    if not user.can_access_accounting():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    invoice = Invoice.objects.select_related('customer').prefetch_related('items').filter(pk=pk).first()
+    if invoice is None:
+        return Response({'error': 'Invoice not found'}, status=status.HTTP_404_NOT_FOUND)
+    return pdf_response('invoice', invoice_payload(invoice), f'{invoice.invoice_number}.pdf', request)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def customer_statement_pdf(request, customer_id):
+    """
+    Download a customer's statement for `start_date` to `end_date` as PDF.
+    
+    Defaults to the previous calendar month.
+    """
+    user = request.user
+    if not user.can_access_accounting():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        end_date = request.GET.get('end_date')
+        end_date = (
+            datetime.strptime(end_date, '%Y-%m-%d').date() if end_date
+            else timezone.localdate().replace(day=1) - timedelta(days=1)
+        )
+        start_date = request.GET.get('start_date')
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else end_date.replace(day=1)
+    except ValueError:
+        return Response({'error': 'Dates must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+    if start_date > end_date:
+        return Response({'error': 'start_date must not be after end_date'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    statement = next(iter(statement_payloads(start_date, end_date, [customer_id])), None)
+    if statement is None:
+        return Response({'error': 'No balance or activity for this customer in the period'}, status=status.HTTP_404_NOT_FOUND)
+    return pdf_response('statement', statement[1], f'statement-{customer_id}-{end_date.isoformat()}.pdf', request)
+
+
+class FinancialPeriodListView(generics.ListAPIView):
+    """
+    Closed financial periods with their frozen totals, newest first.
+    """
+    serializer_class = FinancialPeriodSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['year']
+    
+    def get_queryset(self):
+        """Filter periods based on user permissions."""
+        user = self.request.user
+        if user.can_access_accounting():
+            return FinancialPeriod.objects.select_related('closed_by').prefetch_related('revenue', 'expenses')
+        return FinancialPeriod.objects.none()
 
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
-def process_payment(request, invoice_id):
+def close_financial_period(request):
     """
-    Process a payment for an invoice.
+    Close a finished month (`year`, `month`), freezing its totals.
+    
+    Pass `reclose=true` to recompute the snapshots of a closed month.
     """
+    user = request.user
+    if not user.can_access_accounting():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
     try:
-        invoice = Invoice.objects.get(pk=invoice_id)
-    except Invoice.DoesNotExist:
-        return Response({'error': 'Invoice not found'}, status=status.HTTP_404_NOT_FOUND)
+        year = int(request.data.get('year'))
+        month = int(request.data.get('month'))
+    except (TypeError, ValueError):
+        return Response({'error': 'Year and month are required'}, status=status.HTTP_400_BAD_REQUEST)
+    reclose = str(request.data.get('reclose', '')).lower() == 'true'
+    
+    try:
+        period = close_period(year, month, user=user, reclose=reclose)
+    except PeriodError as e:
+        return Response({'error': str(e)}, status=e.status_code)
+    return Response(FinancialPeriodSerializer(period).data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def financial_period_summary(request):
+    """
+    Monthly revenue, expenses and balances from `start` to `end` (YYYY-MM).
     
+    Closed months are read from their snapshots; only months not closed
+    yet are computed from the transaction tables. Defaults to the last
+    twelve months; at most MAX_SUMMARY_MONTHS months per request.
+    """
+    user = request.user
+    if not user.can_access_accounting():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        end = request.GET.get('end')
+        end = datetime.strptime(end, '%Y-%m').date() if end else timezone.localdate().replace(day=1)
+        start = request.GET.get('start')
+        if start:
+            start = datetime.strptime(start, '%Y-%m').date()
+        else:
+            months = end.year * 12 + end.month - 12
+            start = end.replace(year=months // 12, month=months % 12 + 1)
+    except ValueError:
+        return Response({'error': 'Months must be in YYYY-MM format'}, status=status.HTTP_400_BAD_REQUEST)
+    if start > end:
+        return Response({'error': 'start must not be after end'}, status=status.HTTP_400_BAD_REQUEST)
+    if (end.year - start.year) * 12 + end.month - start.month >= MAX_SUMMARY_MONTHS:
+        return Response(
+            {'error': f'The range can cover at most {MAX_SUMMARY_MONTHS} months'}, status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    return Response({'months': period_summary(start, end)})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def accounting_stats(request):
+    """
+    Get accounting statistics.
+    
+    Cached until the next write to an invoice, payment, expense, receivable
+    or payable.
+    """
+    user = request.user
+    if not user.can_access_accounting():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    return Response(get_accounting_stats())
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def process_payment(request, invoice_id):
+    """
+    Process a payment for an invoice.
+    
+    Send an `Idempotency-Key` header to make retries safe: a repeated
+    request with the same key returns the original response without
+    recording the payment again.
+    """
     user = request.user
     if not user.can_access_accounting():
         return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
@@ -361,30 +744,21 @@ def process_payment(request, invoice_id):
     if not amount or not payment_method:
         return Response({'error': 'Amount and payment method are required'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Create payment
-    payment = Payment.objects.create(
-        invoice=invoice,
-        customer=invoice.customer,
-        amount=amount,
-        payment_method=payment_method,
-        transaction_id=transaction_id,
-        status='completed',
-        created_by=user,
-        processed_by=user
-    )
-    
-    # Update invoice
-    invoice.paid_amount += amount
-    invoice.balance_due = invoice.total_amount - invoice.paid_amount
-    
-    if invoice.balance_due <= 0:
-        invoice.status = 'paid'
-        invoice.paid_date = payment.payment_date
-    
-    invoice.save()
-    
-    return Response({
-        'message': 'Payment processed successfully',
-        'payment': PaymentSerializer(payment).data,
-        'invoice': InvoiceSerializer(invoice).data
-    })
+    try:
+        body, replayed = apply_payment(
+            invoice_id, amount, payment_method, user,
+            transaction_id=transaction_id,
+            idempotency_key=request.headers.get('Idempotency-Key'),
+            render=lambda payment, invoice: {
+                'message': 'Payment processed successfully',
+                'payment': PaymentSerializer(payment).data,
+                'invoice': InvoiceSerializer(invoice).data,
+            },
+        )
+    except PaymentError as e:
+        return Response({'error': str(e)}, status=e.status_code)
+    
+    response = Response(body)
+    if replayed:
+        response['Idempotent-Replayed'] = 'true'
+    return response
@@ -5,7 +5,7 @@ Django settings for car_erp_backend project.
 import os
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -26,6 +26,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -91,6 +92,14 @@ DATABASES = {
     }
 }
 
+# Cache (shared through Redis so invalidations from any worker or management command reach every process)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.redis.RedisCache'),
+        'LOCATION': config('CACHE_LOCATION', default='') or config('REDIS_URL', default='redis://localhost:6379/0'),
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -193,8 +202,14 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 
 # File Upload Settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = config('MAX_UPLOAD_SIZE', default=10485760, cast=int)  # 10MB
-DATA_UPLOAD_MAX_MEMORY_SIZE = FILE_UPLOAD_MAX_MEMORY_SIZE
+MAX_UPLOAD_SIZE = config('MAX_UPLOAD_SIZE', default=10485760, cast=int)  # 10MB
+# Multipart files above this size are spooled to a temp file instead of memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = config('FILE_UPLOAD_MAX_MEMORY_SIZE', default=2621440, cast=int)  # 2.5MB
+DATA_UPLOAD_MAX_MEMORY_SIZE = MAX_UPLOAD_SIZE
+
+# Resumable chunked uploads (job order photos)
+CHUNKED_UPLOAD_TEMP_DIR = config('CHUNKED_UPLOAD_TEMP_DIR', default=str(BASE_DIR / 'upload_tmp'))
+CHUNKED_UPLOAD_MAX_SIZE = config('CHUNKED_UPLOAD_MAX_SIZE', default=52428800, cast=int)  # 50MB
 
 # Celery Configuration (for background tasks)
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
@@ -209,6 +224,70 @@ TWILIO_ACCOUNT_SID = config('TWILIO_ACCOUNT_SID', default='')
 TWILIO_AUTH_TOKEN = config('TWILIO_AUTH_TOKEN', default='')
 TWILIO_PHONE_NUMBER = config('TWILIO_PHONE_NUMBER', default='')
 
+# Customer 360 view cache lifetime (seconds); entries are also invalidated on related writes
+CUSTOMER_360_CACHE_TIMEOUT = config('CUSTOMER_360_CACHE_TIMEOUT', default=300, cast=int)
+
+# Customer search (country code applied to phone numbers stored without one)
+DEFAULT_PHONE_COUNTRY_CODE = config('DEFAULT_PHONE_COUNTRY_CODE', default='1')
+
+# Customer CSV import (validation processes per upload, rejected rows returned by the API)
+CSV_IMPORT_WORKERS = config('CSV_IMPORT_WORKERS', default=2, cast=int)
+CSV_IMPORT_ERROR_LIMIT = config('CSV_IMPORT_ERROR_LIMIT', default=500, cast=int)
+
+# Appointment availability (shop hours in local time, weekdays 0=Monday)
+SHOP_OPENING_TIME = config('SHOP_OPENING_TIME', default='08:00')
+SHOP_CLOSING_TIME = config('SHOP_CLOSING_TIME', default='18:00')
+SHOP_WORKING_DAYS = config('SHOP_WORKING_DAYS', default='0,1,2,3,4,5', cast=Csv(int))
+APPOINTMENT_STAFF_ROLES = config('APPOINTMENT_STAFF_ROLES', default='technician', cast=Csv())
+
+# Duplicate customer detection (minimum pair score queued for review, 0-1)
+CUSTOMER_DEDUP_MIN_SCORE = config('CUSTOMER_DEDUP_MIN_SCORE', default=0.6, cast=float)
+
+# Service reminders (interval between services and how far ahead reminders are queued)
+SERVICE_INTERVAL_MILES = config('SERVICE_INTERVAL_MILES', default=5000, cast=int)
+SERVICE_INTERVAL_DAYS = config('SERVICE_INTERVAL_DAYS', default=180, cast=int)
+SERVICE_REMINDER_LOOKAHEAD_DAYS = config('SERVICE_REMINDER_LOOKAHEAD_DAYS', default=14, cast=int)
+
+# Insurance and document expiry notices (days ahead of the expiry date)
+EXPIRY_NOTICE_DAYS = config('EXPIRY_NOTICE_DAYS', default=30, cast=int)
+
+# Outbound email/SMS queue (backends are dotted paths; rates are messages per second, 0 = unlimited)
+OUTBOUND_EMAIL_BACKEND = config('OUTBOUND_EMAIL_BACKEND', default='customers.outbound.EmailBackend')
+OUTBOUND_SMS_BACKEND = config('OUTBOUND_SMS_BACKEND', default='customers.outbound.TwilioBackend')
+OUTBOUND_EMAIL_RATE = config('OUTBOUND_EMAIL_RATE', default=10.0, cast=float)
+OUTBOUND_SMS_RATE = config('OUTBOUND_SMS_RATE', default=1.0, cast=float)
+OUTBOUND_BATCH_SIZE = config('OUTBOUND_BATCH_SIZE', default=100, cast=int)
+OUTBOUND_MAX_ATTEMPTS = config('OUTBOUND_MAX_ATTEMPTS', default=5, cast=int)
+OUTBOUND_RETRY_BASE_SECONDS = config('OUTBOUND_RETRY_BASE_SECONDS', default=60, cast=int)
+
+# Bank statement reconciliation (fuzzy pass: amount tolerance and days either side of the payment date)
+RECONCILIATION_AMOUNT_TOLERANCE = config('RECONCILIATION_AMOUNT_TOLERANCE', default='1.00')
+RECONCILIATION_DATE_WINDOW_DAYS = config('RECONCILIATION_DATE_WINDOW_DAYS', default=3, cast=int)
+
+# Invoice and statement PDFs (company header; address lines separated by ';'; render processes for batch runs)
+COMPANY_NAME = config('COMPANY_NAME', default='Car ERP Workshop')
+COMPANY_ADDRESS = config('COMPANY_ADDRESS', default='', cast=Csv(delimiter=';'))
+COMPANY_PHONE = config('COMPANY_PHONE', default='')
+COMPANY_EMAIL = config('COMPANY_EMAIL', default='')
+COMPANY_TAX_ID = config('COMPANY_TAX_ID', default='')
+PDF_RENDER_WORKERS = config('PDF_RENDER_WORKERS', default=4, cast=int)
+# TrueType faces embedded in PDFs; they must cover every script used in customer data
+# (reportlab's Latin-only Vera is used when a file is missing)
+PDF_FONT_REGULAR = config('PDF_FONT_REGULAR', default='/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+PDF_FONT_BOLD = config('PDF_FONT_BOLD', default='/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf')
+
+# Accounting dashboard statistics cache lifetime (seconds); accounting writes also invalidate it
+ACCOUNTING_STATS_CACHE_TIMEOUT = config('ACCOUNTING_STATS_CACHE_TIMEOUT', default=300, cast=int)
+
+# Technician dispatching
+DISPATCH_DEFAULT_JOB_HOURS = config('DISPATCH_DEFAULT_JOB_HOURS', default=2.0, cast=float)
+# Days of logged time the per-service-type estimates are averaged over, and how long they are cached (seconds)
+DISPATCH_ESTIMATE_HISTORY_DAYS = config('DISPATCH_ESTIMATE_HISTORY_DAYS', default=180, cast=int)
+DISPATCH_ESTIMATE_CACHE_TIMEOUT = config('DISPATCH_ESTIMATE_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Job order archival (closed jobs older than this move to the archive table)
+JOB_ORDER_ARCHIVE_MONTHS = config('JOB_ORDER_ARCHIVE_MONTHS', default=12, cast=int)
+
 # Admin Account for Initial Setup
 ADMIN_EMAIL = config('ADMIN_EMAIL', default='admin@carerp.com')
 ADMIN_PASSWORD = config('ADMIN_PASSWORD', default='admin123')
@@ -2,7 +2,7 @@
 Admin configuration for customers app.
 """
 from django.contrib import admin
-from .models import Customer, CustomerDocument, CustomerCommunication, Appointment
+from .models import Customer, CustomerDocument, CustomerCommunication, Appointment, DuplicateCandidate, OutboundMessage
 
 
 @admin.register(Customer)
@@ -14,6 +14,7 @@ class CustomerAdmin(admin.ModelAdmin):
     list_filter = ['is_active', 'city', 'state', 'created_at']
     search_fields = ['first_name', 'last_name', 'email', 'phone', 'company_name']
     list_editable = ['is_active']
+    raw_id_fields = ['merged_into']
     readonly_fields = ['created_at', 'updated_at']
     fieldsets = (
         ('Personal Information', {
@@ -26,7 +27,7 @@ class CustomerAdmin(admin.ModelAdmin):
             'fields': ('company_name', 'tax_id')
         }),
         ('Additional Information', {
-            'fields': ('notes', 'preferred_contact_method', 'is_active')
+            'fields': ('notes', 'preferred_contact_method', 'is_active', 'merged_into')
         }),
         ('System Information', {
             'fields': ('created_by', 'created_at', 'updated_at'),
@@ -52,11 +53,11 @@ class CustomerCommunicationAdmin(admin.ModelAdmin):
     """
     Customer Communication admin interface.
     """
-    list_display = ['customer', 'communication_type', 'direction', 'subject', 'communication_date', 'created_by']
-    list_filter = ['communication_type', 'direction', 'communication_date']
+    list_display = ['customer', 'communication_type', 'direction', 'subject', 'delivery_status', 'communication_date', 'created_by']
+    list_filter = ['communication_type', 'direction', 'delivery_status', 'communication_date']
     search_fields = ['customer__first_name', 'customer__last_name', 'subject', 'message']
     raw_id_fields = ['customer', 'created_by']
-    readonly_fields = ['communication_date']
+    readonly_fields = ['communication_date', 'delivery_status', 'delivered_at']
 
 
 @admin.register(Appointment)
@@ -71,3 +72,26 @@ class AppointmentAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'appointment_date'
 
+
+@admin.register(DuplicateCandidate)
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    """
+    Duplicate candidate admin interface.
+    """
+    list_display = ['customer', 'duplicate', 'score', 'reasons', 'status', 'reviewed_by', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['customer__first_name', 'customer__last_name', 'duplicate__first_name', 'duplicate__last_name']
+    raw_id_fields = ['customer', 'duplicate', 'reviewed_by']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    """
+    Outbound message admin interface.
+    """
+    list_display = ['recipient', 'channel', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    list_filter = ['channel', 'status', 'created_at']
+    search_fields = ['recipient', 'subject', 'provider_message_id']
+    raw_id_fields = ['communication']
+    readonly_fields = ['provider_message_id', 'sent_at', 'created_at', 'updated_at']
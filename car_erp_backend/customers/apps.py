@@ -0,0 +1,13 @@
+"""
+App configuration for customers app.
+"""
+from django.apps import AppConfig
+from django.db.models.signals import pre_migrate
+
+
+class CustomersConfig(AppConfig):
+    name = 'customers'
+
+    def ready(self):
+        from . import signals
+        pre_migrate.connect(signals.create_search_extensions, sender=self)
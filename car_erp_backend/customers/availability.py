@@ -0,0 +1,150 @@
+"""
+Appointment availability for Car ERP System.
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import serializers
+from .models import Appointment
+
+User = get_user_model()
+
+# Appointments in these statuses occupy their assignee's time.
+ACTIVE_STATUSES = ['scheduled', 'confirmed', 'in_progress']
+
+# Longest appointment considered when looking back for overlaps.
+MAX_APPOINTMENT_MINUTES = 24 * 60
+
+
+def appointment_end(start, duration_minutes):
+    return start + timedelta(minutes=duration_minutes)
+
+
+class IntervalIndex:
+    """
+    Merged, sorted busy intervals for one assignee.
+
+    Overlapping bookings are merged on build so the start and end arrays are
+    both sorted, and a conflict check is a single bisect.
+    """
+
+    def __init__(self, intervals):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def overlaps(self, start, end):
+        """True when [start, end) intersects a busy interval."""
+        position = bisect_right(self.starts, start) - 1
+        if position >= 0 and self.ends[position] > start:
+            return True
+        return position + 1 < len(self.starts) and self.starts[position + 1] < end
+
+    def free_windows(self, start, end, min_minutes):
+        """Gaps of at least `min_minutes` between busy intervals inside [start, end)."""
+        windows = []
+        cursor = start
+        position = max(bisect_right(self.starts, start) - 1, 0)
+        for busy_start, busy_end in zip(self.starts[position:], self.ends[position:]):
+            if busy_start >= end:
+                break
+            if busy_start > cursor:
+                windows.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+        if cursor < end:
+            windows.append((cursor, end))
+        minimum = timedelta(minutes=min_minutes)
+        return [(window_start, window_end) for window_start, window_end in windows if window_end - window_start >= minimum]
+
+
+def busy_intervals(assignee_ids, start, end, exclude_id=None):
+    """Active appointment intervals per assignee overlapping [start, end), from one query."""
+    rows = Appointment.objects.filter(
+        assigned_to__in=assignee_ids,
+        status__in=ACTIVE_STATUSES,
+        appointment_date__lt=end,
+        appointment_date__gte=start - timedelta(minutes=MAX_APPOINTMENT_MINUTES),
+    )
+    if exclude_id:
+        rows = rows.exclude(pk=exclude_id)
+
+    intervals = defaultdict(list)
+    for assignee_id, appointment_date, duration in rows.values_list('assigned_to', 'appointment_date', 'duration_minutes'):
+        appointment_finish = appointment_end(appointment_date, duration)
+        if appointment_finish > start:
+            intervals[assignee_id].append((appointment_date, appointment_finish))
+    return intervals
+
+
+def shop_hours(day):
+    """Opening and closing datetimes for a day, or None when the shop is closed."""
+    if day.weekday() not in settings.SHOP_WORKING_DAYS:
+        return None
+    opening = datetime.combine(day, datetime.strptime(settings.SHOP_OPENING_TIME, '%H:%M').time())
+    closing = datetime.combine(day, datetime.strptime(settings.SHOP_CLOSING_TIME, '%H:%M').time())
+    return timezone.make_aware(opening), timezone.make_aware(closing)
+
+
+def staff_availability(start_date, days, duration_minutes, assignee_ids=None):
+    """
+    Free windows per staff member over `days` days from `start_date`.
+
+    One query loads every booking in the window; each assignee's bookings
+    become an IntervalIndex that is walked once per working day.
+    """
+    staff = User.objects.filter(is_active=True)
+    if assignee_ids:
+        staff = staff.filter(pk__in=assignee_ids)
+    else:
+        staff = staff.filter(role__in=settings.APPOINTMENT_STAFF_ROLES)
+    staff = list(staff.order_by('first_name', 'last_name').values('id', 'first_name', 'last_name'))
+
+    hours = [shop_hours(start_date + timedelta(days=offset)) for offset in range(days)]
+    hours = [day_hours for day_hours in hours if day_hours]
+    if not hours:
+        return []
+
+    intervals = busy_intervals([member['id'] for member in staff], hours[0][0], hours[-1][1])
+    now = timezone.now()
+    availability = []
+    for member in staff:
+        index = IntervalIndex(intervals.get(member['id'], []))
+        free = []
+        for opening, closing in hours:
+            opening = max(opening, now)
+            free.extend(
+                {'start': window_start, 'end': window_end}
+                for window_start, window_end in index.free_windows(opening, closing, duration_minutes)
+            )
+        availability.append({
+            'user': member['id'],
+            'name': f"{member['first_name']} {member['last_name']}".strip(),
+            'free': free,
+        })
+    return availability
+
+
+def ensure_available(assignee, start, duration_minutes, status='scheduled', exclude_id=None):
+    """
+    Reject a booking that overlaps another active appointment of the assignee.
+
+    Locks the assignee's user row first, so two concurrent bookings for the
+    same person are checked one after the other. Call inside a transaction.
+    """
+    if assignee is None or status not in ACTIVE_STATUSES:
+        return
+    User.objects.select_for_update().filter(pk=assignee.pk).first()
+    end = appointment_end(start, duration_minutes)
+    index = IntervalIndex(busy_intervals([assignee.pk], start, end, exclude_id=exclude_id)[assignee.pk])
+    if index.overlaps(start, end):
+        raise serializers.ValidationError({
+            'appointment_date': f'{assignee.get_full_name()} already has an appointment overlapping this time.'
+        })
@@ -0,0 +1,181 @@
+"""
+Bulk CSV import of customers and vehicles for Car ERP System.
+"""
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from django.conf import settings
+from django.db import models, transaction
+from vehicles.models import Vehicle
+from vehicles.vin import normalize_plate
+from . import overview
+from .csv_rows import validate_chunk
+from .models import Customer
+
+CUSTOMER_IMPORT_FIELDS = [
+    'first_name', 'last_name', 'email', 'phone', 'alternate_phone', 'gender', 'date_of_birth',
+    'address_line1', 'address_line2', 'city', 'state', 'postal_code', 'country',
+    'company_name', 'tax_id', 'notes', 'preferred_contact_method',
+]
+VEHICLE_IMPORT_FIELDS = [
+    'make', 'model', 'year', 'vin', 'license_plate', 'color', 'engine_size', 'fuel_type',
+    'transmission', 'mileage', 'engine_number', 'registration_date', 'insurance_expiry', 'notes',
+]
+UPPERCASE_FIELDS = {'license_plate'}
+
+# Chunk size for `__in` lookups against existing rows.
+LOOKUP_CHUNK_SIZE = 5000
+
+
+def field_schema(model, names):
+    """Picklable validation spec for the importable fields of a model."""
+    schema = {}
+    for name in names:
+        field = model._meta.get_field(name)
+        spec = {'required': not field.blank and not field.has_default(), 'type': 'str'}
+        if isinstance(field, models.IntegerField):
+            spec['type'] = 'int'
+        elif isinstance(field, models.DateField):
+            spec['type'] = 'date'
+        elif isinstance(field, models.EmailField):
+            spec['type'] = 'email'
+        elif name == 'vin':
+            spec['type'] = 'vin'
+        if field.max_length:
+            spec['max_length'] = field.max_length
+        if field.choices:
+            spec['choices'] = [value for value, label in field.choices]
+        if name in UPPERCASE_FIELDS:
+            spec['upper'] = True
+        schema[name] = spec
+    return schema
+
+
+def read_chunks(lines, chunk_size):
+    """Stream (row number, row) chunks from CSV text lines."""
+    chunk = []
+    for number, row in enumerate(csv.DictReader(lines), start=2):
+        chunk.append((number, row))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_rows(lines, workers, chunk_size):
+    """Validate every row, fanning chunks out to a process pool when workers > 1."""
+    schema = {
+        'customer': field_schema(Customer, CUSTOMER_IMPORT_FIELDS),
+        'vehicle': field_schema(Vehicle, VEHICLE_IMPORT_FIELDS),
+    }
+    country_code = settings.DEFAULT_PHONE_COUNTRY_CODE
+    chunks = read_chunks(lines, chunk_size)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for results in executor.map(validate_chunk, chunks, repeat(schema), repeat(country_code)):
+                yield from results
+    else:
+        for chunk in chunks:
+            yield from validate_chunk(chunk, schema, country_code)
+
+
+def existing_values(queryset, field, values):
+    """Map each of `values` already stored in `field` to its row id."""
+    found = {}
+    values = list(values)
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        rows = queryset.filter(**{f'{field}__in': values[start:start + LOOKUP_CHUNK_SIZE]}).order_by('id')
+        for pk, value in rows.values_list('id', field):
+            found.setdefault(value, pk)
+    return found
+
+
+def import_customers_csv(lines, user=None, workers=1, chunk_size=2000, batch_size=1000, dry_run=False):
+    """
+    Import customers and their vehicles from CSV text lines.
+
+    Each row holds customer columns and, optionally, `vehicle_`-prefixed
+    vehicle columns. Rows sharing a `customer_ref` (or, without one, a
+    normalized phone number) belong to one customer, and customers whose
+    phone is already on file are reused instead of duplicated.
+
+    Rows are validated in parallel, customer links are resolved in memory
+    and everything is written with chunked bulk inserts in one transaction.
+    Invalid rows are skipped and reported with their row number.
+    """
+    errors = []
+    valid = []
+    total = 0
+    for number, customer_ref, customer_data, vehicle_data, row_errors in validate_rows(lines, workers, chunk_size):
+        total += 1
+        if row_errors:
+            errors.append({'row': number, 'errors': row_errors})
+        else:
+            valid.append((number, customer_ref, customer_data, vehicle_data))
+
+    vehicle_rows = [vehicle for _, _, _, vehicle in valid if vehicle]
+    existing_customers = existing_values(
+        Customer.objects.filter(merged_into__isnull=True), 'phone_normalized',
+        {customer['phone_normalized'] for _, _, customer, _ in valid}
+    )
+    taken_vins = set(existing_values(Vehicle.objects.all(), 'vin', {vehicle['vin'] for vehicle in vehicle_rows}))
+    taken_plates = set(existing_values(
+        Vehicle.objects.all(), 'plate_normalized', {normalize_plate(vehicle['license_plate']) for vehicle in vehicle_rows}
+    ))
+
+    customers_by_ref = {}
+    new_customers = []
+    matched_ids = set()
+    vehicles = []
+    for number, customer_ref, customer_data, vehicle_data in valid:
+        if vehicle_data:
+            if vehicle_data['vin'] in taken_vins:
+                errors.append({'row': number, 'errors': [f"vehicle_vin: {vehicle_data['vin']} already exists"]})
+                continue
+            if normalize_plate(vehicle_data['license_plate']) in taken_plates:
+                errors.append({'row': number, 'errors': [f"vehicle_license_plate: {vehicle_data['license_plate']} already exists"]})
+                continue
+
+        customer = customers_by_ref.get(customer_ref)
+        if customer is None:
+            phone = customer_data.pop('phone_normalized')
+            if phone in existing_customers:
+                customer = existing_customers[phone]
+                matched_ids.add(customer)
+            else:
+                customer = Customer(created_by=user, **customer_data)
+                customer.normalize_search_fields()
+                new_customers.append(customer)
+            customers_by_ref[customer_ref] = customer
+
+        if vehicle_data:
+            taken_vins.add(vehicle_data['vin'])
+            taken_plates.add(normalize_plate(vehicle_data['license_plate']))
+            vehicle = Vehicle(created_by=user, **vehicle_data)
+            vehicle.normalize_identifiers()
+            vehicles.append((vehicle, customer))
+
+    if not dry_run:
+        with transaction.atomic():
+            Customer.objects.bulk_create(new_customers, batch_size=batch_size)
+            for vehicle, customer in vehicles:
+                vehicle.customer_id = customer if isinstance(customer, int) else customer.pk
+            Vehicle.objects.bulk_create([vehicle for vehicle, _ in vehicles], batch_size=batch_size)
+
+            # Bulk inserts skip the signals that refresh cached overviews.
+            def invalidate_overviews():
+                for customer_id in matched_ids:
+                    overview.invalidate(customer_id)
+            transaction.on_commit(invalidate_overviews)
+
+    errors.sort(key=lambda error: error['row'])
+    return {
+        'rows': total,
+        'customers_created': len(new_customers),
+        'customers_matched': len(matched_ids),
+        'vehicles_created': len(vehicles),
+        'error_count': len(errors),
+        'errors': errors,
+        'dry_run': dry_run,
+    }
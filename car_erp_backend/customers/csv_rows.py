@@ -0,0 +1,90 @@
+"""
+CSV row validation for Car ERP System.
+
+Pure functions with no ORM access so they can run in worker processes.
+The field schema is built from the models by the caller and passed in.
+"""
+import re
+from datetime import datetime
+from vehicles.vin import VIN_RE, normalize_vin
+from .search import normalize_phone
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Vehicle columns carry this prefix in the combined customer/vehicle file.
+VEHICLE_PREFIX = 'vehicle_'
+
+# Optional column grouping rows that belong to the same customer.
+CUSTOMER_REF_COLUMN = 'customer_ref'
+
+
+def clean_value(name, raw, spec):
+    """Convert one raw CSV string according to its field spec; raises ValueError."""
+    if spec['type'] == 'int':
+        try:
+            return int(raw.replace(',', ''))
+        except ValueError:
+            raise ValueError(f'{name}: "{raw}" is not a whole number')
+    if spec['type'] == 'date':
+        try:
+            return datetime.strptime(raw, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError(f'{name}: "{raw}" is not a YYYY-MM-DD date')
+    if spec['type'] == 'email' and not EMAIL_RE.match(raw):
+        raise ValueError(f'{name}: "{raw}" is not a valid email address')
+    if spec['type'] == 'vin':
+        raw = normalize_vin(raw)
+        if not VIN_RE.match(raw):
+            raise ValueError(f'{name}: "{raw}" is not a 17-character VIN')
+    if spec.get('upper'):
+        raw = raw.upper()
+    if spec.get('max_length') and len(raw) > spec['max_length']:
+        raise ValueError(f"{name}: longer than {spec['max_length']} characters")
+    if spec.get('choices') and raw not in spec['choices']:
+        raise ValueError(f"{name}: must be one of {', '.join(spec['choices'])}")
+    return raw
+
+
+def clean_fields(row, schema, prefix, errors):
+    """Validate the columns for one model; returns the cleaned field values."""
+    data = {}
+    for name, spec in schema.items():
+        raw = (row.get(prefix + name) or '').strip()
+        if not raw:
+            if spec['required']:
+                errors.append(f'{prefix}{name}: this field is required')
+            continue
+        try:
+            data[name] = clean_value(prefix + name, raw, spec)
+        except ValueError as e:
+            errors.append(str(e))
+    return data
+
+
+def validate_row(row, schema, country_code):
+    """
+    Validate one CSV row.
+
+    Returns (customer_ref, customer data, vehicle data or None, errors).
+    """
+    errors = []
+    customer = clean_fields(row, schema['customer'], '', errors)
+    if customer.get('phone'):
+        customer['phone_normalized'] = normalize_phone(customer['phone'], country_code)
+        if not customer['phone_normalized']:
+            errors.append('phone: contains no digits')
+
+    vehicle = None
+    if any((row.get(VEHICLE_PREFIX + name) or '').strip() for name in schema['vehicle']):
+        vehicle = clean_fields(row, schema['vehicle'], VEHICLE_PREFIX, errors)
+
+    customer_ref = (row.get(CUSTOMER_REF_COLUMN) or '').strip() or customer.get('phone_normalized')
+    return customer_ref, customer, vehicle, errors
+
+
+def validate_chunk(numbered_rows, schema, country_code):
+    """Validate a list of (row number, row dict) pairs; runs in a worker process."""
+    return [
+        (number, *validate_row(row, schema, country_code))
+        for number, row in numbered_rows
+    ]
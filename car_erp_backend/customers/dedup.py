@@ -0,0 +1,189 @@
+"""
+Duplicate customer detection and merging for Car ERP System.
+"""
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from . import overview
+from .models import Customer, DuplicateCandidate
+
+# Score weights; the name comparison carries half the score.
+NAME_WEIGHT = 0.5
+PHONE_WEIGHT = 0.25
+EMAIL_WEIGHT = 0.15
+POSTAL_WEIGHT = 0.1
+
+# Models holding a `customer` foreign key that a merge re-points.
+CUSTOMER_RELATIONS = [
+    'vehicles.Vehicle',
+    'job_orders.JobOrder',
+    'job_orders.ArchivedJobOrder',
+    'accounting.Invoice',
+    'accounting.Payment',
+    'accounting.AccountReceivable',
+    'vehicles.ServiceReminder',
+    'vehicles.ExpiryNotification',
+    'customers.CustomerDocument',
+    'customers.CustomerCommunication',
+    'customers.Appointment',
+]
+
+# Contact fields copied onto the surviving record when it has none.
+MERGE_FILL_FIELDS = ['email', 'alternate_phone', 'company_name', 'tax_id', 'date_of_birth', 'gender']
+
+
+class MergeError(Exception):
+    """
+    Merge that cannot be carried out; carries the HTTP status to return.
+    """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def blocking_keys(row):
+    """Keys under which a customer is compared with others."""
+    phones = {row['phone_normalized'], row['alternate_phone_normalized']} - {''}
+    for phone in phones:
+        yield f"phone:{phone}"
+    if row['email']:
+        yield f"email:{row['email'].strip().lower()}"
+    if row['name_normalized'] and row['postal_code']:
+        yield f"name:{row['name_normalized']}|{row['postal_code'].replace(' ', '').upper()}"
+
+
+def score_pair(a, b):
+    """Weighted similarity of two customer rows between 0 and 1."""
+    score = NAME_WEIGHT * SequenceMatcher(None, a['name_normalized'], b['name_normalized']).ratio()
+    phones_a = {a['phone_normalized'], a['alternate_phone_normalized']} - {''}
+    phones_b = {b['phone_normalized'], b['alternate_phone_normalized']} - {''}
+    if phones_a & phones_b:
+        score += PHONE_WEIGHT
+    if a['email'] and b['email'] and a['email'].strip().lower() == b['email'].strip().lower():
+        score += EMAIL_WEIGHT
+    if a['postal_code'].replace(' ', '').upper() == b['postal_code'].replace(' ', '').upper():
+        score += POSTAL_WEIGHT
+    return round(score, 4)
+
+
+def find_duplicate_candidates(min_score, max_block_size=50):
+    """
+    Score customer pairs that share a blocking key.
+
+    Customers are bucketed by phone, email and name + postal code, and only
+    pairs inside a bucket are compared, so the work grows with bucket sizes
+    rather than with the square of the customer count. Buckets larger than
+    `max_block_size` (a shared company phone, say) are skipped.
+
+    Returns a tuple of (unsaved DuplicateCandidate list, comparisons made).
+    """
+    rows = {}
+    blocks = defaultdict(list)
+    customers = Customer.objects.filter(is_active=True, merged_into__isnull=True).values(
+        'id', 'name_normalized', 'phone_normalized', 'alternate_phone_normalized', 'email', 'postal_code'
+    )
+    for row in customers.iterator(chunk_size=2000):
+        rows[row['id']] = row
+        for key in blocking_keys(row):
+            blocks[key].append(row['id'])
+
+    reasons = defaultdict(list)
+    for key, ids in blocks.items():
+        if 1 < len(ids) <= max_block_size:
+            for pair in combinations(sorted(ids), 2):
+                reasons[pair].append(key.split(':', 1)[0])
+
+    candidates = []
+    for (customer_id, duplicate_id), keys in reasons.items():
+        score = score_pair(rows[customer_id], rows[duplicate_id])
+        if score >= min_score:
+            candidates.append(DuplicateCandidate(
+                customer_id=customer_id,
+                duplicate_id=duplicate_id,
+                score=score,
+                reasons=sorted(set(keys)),
+            ))
+    return candidates, len(reasons)
+
+
+def save_duplicate_candidates(candidates):
+    """Queue candidates for review, refreshing the score of pairs already queued."""
+    DuplicateCandidate.objects.bulk_create(
+        candidates,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['customer', 'duplicate'],
+        update_fields=['score', 'reasons', 'updated_at'],
+    )
+
+
+def merge_customers(survivor_id, duplicate_id, user=None, candidate_id=None):
+    """
+    Fold a duplicate customer into the surviving record.
+
+    Every related table is re-pointed with one UPDATE, blank contact
+    fields on the survivor are filled from the duplicate, and the duplicate
+    is deactivated with `merged_into` set. Pending review candidates that
+    involve the duplicate are closed. Returns the number of re-pointed rows
+    per model.
+
+    When `candidate_id` is given the candidate is locked first and must
+    still be pending, so two reviewers cannot merge the same pair twice.
+    """
+    with transaction.atomic():
+        if candidate_id is not None:
+            candidate = DuplicateCandidate.objects.select_for_update().filter(pk=candidate_id).first()
+            if candidate is None:
+                raise MergeError('Duplicate candidate not found', 404)
+            if candidate.status != 'pending':
+                raise MergeError(f'Candidate is already {candidate.status}', 409)
+
+        customers = {
+            customer.pk: customer
+            for customer in Customer.objects.select_for_update().filter(pk__in=[survivor_id, duplicate_id])
+        }
+        if len(customers) != 2:
+            raise MergeError('Customer not found', 404)
+        survivor, duplicate = customers[survivor_id], customers[duplicate_id]
+        if survivor.merged_into_id or duplicate.merged_into_id:
+            raise MergeError('Customer has already been merged', 409)
+
+        moved = {}
+        for label in CUSTOMER_RELATIONS:
+            model = apps.get_model(label)
+            moved[label] = model.objects.filter(customer_id=duplicate_id).update(customer_id=survivor_id)
+        Customer.objects.filter(merged_into_id=duplicate_id).update(merged_into_id=survivor_id)
+
+        for field in MERGE_FILL_FIELDS:
+            if not getattr(survivor, field) and getattr(duplicate, field):
+                setattr(survivor, field, getattr(duplicate, field))
+        if duplicate.notes:
+            survivor.notes = '\n'.join(part for part in [survivor.notes, duplicate.notes] if part)
+        survivor.save()
+
+        duplicate.is_active = False
+        duplicate.merged_into = survivor
+        duplicate.save(update_fields=['is_active', 'merged_into', 'updated_at'])
+
+        pair = Q(customer_id=survivor_id, duplicate_id=duplicate_id) | Q(customer_id=duplicate_id, duplicate_id=survivor_id)
+        now = timezone.now()
+        DuplicateCandidate.objects.filter(pair).update(
+            status='merged', reviewed_by=user, reviewed_at=now, updated_at=now
+        )
+        DuplicateCandidate.objects.filter(
+            Q(customer_id=duplicate_id) | Q(duplicate_id=duplicate_id), status='pending'
+        ).update(status='dismissed', reviewed_by=user, reviewed_at=now, updated_at=now)
+
+        # The bulk UPDATEs above bypass the post_save cache invalidation and aging refresh.
+        def refresh_customer_views():
+            from accounting.aging import refresh_aging
+            overview.invalidate(survivor_id)
+            overview.invalidate(duplicate_id)
+            refresh_aging('receivable', [survivor_id, duplicate_id])
+        transaction.on_commit(refresh_customer_views)
+    return moved
@@ -0,0 +1,27 @@
+"""
+Management command to queue likely duplicate customers for review.
+"""
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from customers.dedup import find_duplicate_candidates, save_duplicate_candidates
+
+
+class Command(BaseCommand):
+    help = 'Find customer records that look like duplicates and add them to the review queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-score', type=float, default=settings.CUSTOMER_DEDUP_MIN_SCORE,
+            help='Minimum similarity score (0-1) for a pair to be queued'
+        )
+        parser.add_argument('--max-block-size', type=int, default=50, help='Skip blocking keys shared by more customers than this')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        candidates, comparisons = find_duplicate_candidates(options['min_score'], options['max_block_size'])
+        save_duplicate_candidates(candidates)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Compared {comparisons} pair(s), queued {len(candidates)} candidate(s) in {elapsed:.1f}s'
+        ))
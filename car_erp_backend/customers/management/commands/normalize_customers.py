@@ -0,0 +1,33 @@
+"""
+Management command to backfill the normalized customer search columns.
+"""
+from django.core.management.base import BaseCommand
+from customers.models import Customer
+
+SEARCH_FIELDS = ['phone_normalized', 'alternate_phone_normalized', 'name_normalized']
+
+
+class Command(BaseCommand):
+    help = 'Recompute normalized phone and name columns used by customer search'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Customers updated per query')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        batch = []
+        total = 0
+        customers = Customer.objects.only('id', 'first_name', 'last_name', 'phone', 'alternate_phone', *SEARCH_FIELDS)
+        for customer in customers.order_by('id').iterator(chunk_size=batch_size):
+            current = [getattr(customer, field) for field in SEARCH_FIELDS]
+            customer.normalize_search_fields()
+            if current != [getattr(customer, field) for field in SEARCH_FIELDS]:
+                batch.append(customer)
+            if len(batch) >= batch_size:
+                Customer.objects.bulk_update(batch, SEARCH_FIELDS)
+                total += len(batch)
+                batch = []
+        if batch:
+            Customer.objects.bulk_update(batch, SEARCH_FIELDS)
+            total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'Normalized {total} customer(s)'))
@@ -0,0 +1,33 @@
+"""
+Management command to send queued customer emails and SMS.
+"""
+from django.core.management.base import BaseCommand
+from customers.outbound import CHANNELS, get_backend, send_queued_messages
+
+
+class Command(BaseCommand):
+    help = 'Send due messages from the outbound queue in rate-limited batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--channel', choices=CHANNELS, help='Only send this channel (default: all)')
+        parser.add_argument('--batch-size', type=int, help='Messages claimed per batch (default: OUTBOUND_BATCH_SIZE)')
+        parser.add_argument('--limit', type=int, help='Stop after this many messages per channel')
+        parser.add_argument(
+            '--backend',
+            help='Dotted path of a backend used for every channel, e.g. customers.outbound.LocmemBackend to measure throughput offline'
+        )
+
+    def handle(self, *args, **options):
+        for channel in [options['channel']] if options['channel'] else CHANNELS:
+            totals = send_queued_messages(
+                channel,
+                backend=get_backend(channel, options['backend']),
+                batch_size=options['batch_size'],
+                limit=options['limit'],
+            )
+            processed = totals['sent'] + totals['retrying'] + totals['failed']
+            rate = processed / totals['elapsed'] if totals['elapsed'] else 0
+            self.stdout.write(self.style.SUCCESS(
+                f"{channel}: sent {totals['sent']}, retrying {totals['retrying']}, failed {totals['failed']} "
+                f"in {totals['elapsed']:.2f}s ({rate:.0f} messages/s)"
+            ))
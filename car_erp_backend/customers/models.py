@@ -2,7 +2,9 @@
 Customer models for Car ERP System.
 """
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
 
 User = get_user_model()
 
@@ -24,6 +26,11 @@ class Customer(models.Model):
     phone = models.CharField(max_length=20)
     alternate_phone = models.CharField(max_length=20, blank=True, null=True)
     
+    # Search Columns (maintained in save)
+    phone_normalized = models.CharField(max_length=20, blank=True, default='', db_index=True, editable=False)
+    alternate_phone_normalized = models.CharField(max_length=20, blank=True, default='', db_index=True, editable=False)
+    name_normalized = models.CharField(max_length=201, blank=True, default='', editable=False)
+    
     # Personal Information
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES, blank=True, null=True)
     date_of_birth = models.DateField(blank=True, null=True)
@@ -48,6 +55,10 @@ class Customer(models.Model):
         default='phone'
     )
     is_active = models.BooleanField(default=True)
+    merged_into = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='merged_customers',
+        help_text='Customer record this duplicate was merged into'
+    )
     
     # System Fields
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_customers')
@@ -59,10 +70,28 @@ class Customer(models.Model):
         verbose_name = 'Customer'
         verbose_name_plural = 'Customers'
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['name_normalized'], name='customer_name_trgm', opclasses=['gin_trgm_ops']),
+            # Trigram indexes also serve the LIKE '%digits' suffix searches on phone numbers.
+            GinIndex(fields=['phone_normalized'], name='customer_phone_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['alternate_phone_normalized'], name='customer_alt_phone_trgm', opclasses=['gin_trgm_ops']),
+            models.Index(Lower('email'), name='customer_email_lower'),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
     
+    def save(self, *args, **kwargs):
+        """Refresh the normalized search columns."""
+        self.normalize_search_fields()
+        super().save(*args, **kwargs)
+    
+    def normalize_search_fields(self):
+        from .search import normalize_phone, normalize_name
+        self.phone_normalized = normalize_phone(self.phone)
+        self.alternate_phone_normalized = normalize_phone(self.alternate_phone)
+        self.name_normalized = normalize_name(self.first_name, self.last_name)
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -117,6 +146,12 @@ class CustomerCommunication(models.Model):
         ('other', 'Other'),
     ]
     
+    DELIVERY_STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='communications')
     communication_type = models.CharField(max_length=10, choices=COMMUNICATION_TYPES)
     subject = models.CharField(max_length=200, blank=True, null=True)
@@ -129,6 +164,10 @@ class CustomerCommunication(models.Model):
     communication_date = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     
+    # Delivery (set for messages sent through the outbound queue)
+    delivery_status = models.CharField(max_length=10, choices=DELIVERY_STATUS_CHOICES, blank=True, null=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+    
     class Meta:
         db_table = 'customer_communications'
         verbose_name = 'Customer Communication'
@@ -171,7 +210,97 @@ class Appointment(models.Model):
         verbose_name = 'Appointment'
         verbose_name_plural = 'Appointments'
         ordering = ['appointment_date']
+        indexes = [
+            models.Index(fields=['assigned_to', 'appointment_date']),
+        ]
     
     def __str__(self):
         return f"{self.customer.full_name} - {self.appointment_date.strftime('%Y-%m-%d %H:%M')}"
 
+
+class DuplicateCandidate(models.Model):
+    """
+    Pair of customer records that look like the same person, awaiting review.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending Review'),
+        ('merged', 'Merged'),
+        ('dismissed', 'Dismissed'),
+    ]
+    
+    # The lower id is stored as `customer` so each pair is recorded once.
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='duplicate_candidates')
+    duplicate = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='duplicate_of_candidates')
+    score = models.FloatField()
+    reasons = models.JSONField(default=list, help_text='Blocking keys the two records share')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    
+    reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviewed_duplicates')
+    reviewed_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'customer_duplicate_candidates'
+        verbose_name = 'Duplicate Candidate'
+        verbose_name_plural = 'Duplicate Candidates'
+        ordering = ['-score']
+        unique_together = ['customer', 'duplicate']
+        indexes = [
+            models.Index(fields=['status', '-score']),
+        ]
+    
+    def __str__(self):
+        return f"{self.customer} ~ {self.duplicate} ({self.score:.2f})"
+
+
+class OutboundMessage(models.Model):
+    """
+    Email or SMS waiting in the outbound queue.
+    
+    Each message is logged as a CustomerCommunication when queued; the
+    sender updates its delivery status once the message is sent or gives up.
+    """
+    CHANNEL_CHOICES = [
+        ('email', 'Email'),
+        ('sms', 'SMS'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    communication = models.OneToOneField(CustomerCommunication, on_delete=models.CASCADE, related_name='outbound_message')
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    recipient = models.CharField(max_length=254)
+    subject = models.CharField(max_length=200, blank=True, null=True)
+    body = models.TextField()
+    
+    # Delivery State
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(
+        help_text='When a queued message is due, or when a claim on a sending message expires'
+    )
+    last_error = models.TextField(blank=True, null=True)
+    provider_message_id = models.CharField(max_length=100, blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    # System Fields
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'customer_outbound_messages'
+        verbose_name = 'Outbound Message'
+        verbose_name_plural = 'Outbound Messages'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['channel', 'status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_channel_display()} to {self.recipient} ({self.status})"
@@ -0,0 +1,258 @@
+"""
+Outbound email and SMS queue for Car ERP System.
+"""
+import base64
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import CustomerCommunication, OutboundMessage
+
+CHANNELS = ['email', 'sms']
+
+# A claimed message that is not recorded within this time is picked up again.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Longest wait between two attempts at the same message.
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+
+class LocmemBackend:
+    """
+    Local stand-in that keeps messages in memory instead of sending them.
+
+    Used to benchmark the queue offline; `outbox` collects every message
+    sent by any instance, like Django's locmem email backend.
+    """
+    outbox = []
+
+    def send_messages(self, messages):
+        for message in messages:
+            self.outbox.append((message.channel, message.recipient, message.subject, message.body))
+        return [(True, f'locmem-{message.pk}') for message in messages]
+
+
+class EmailBackend:
+    """
+    Send email through Django's configured EMAIL_BACKEND over one connection per batch.
+    """
+
+    def send_messages(self, messages):
+        results = []
+        connection = get_connection(fail_silently=False)
+        connection.open()
+        try:
+            for message in messages:
+                email = EmailMessage(message.subject or '', message.body, to=[message.recipient], connection=connection)
+                try:
+                    email.send()
+                    results.append((True, None))
+                except Exception as e:
+                    results.append((False, str(e)))
+        finally:
+            connection.close()
+        return results
+
+
+class TwilioBackend:
+    """
+    Send SMS through the Twilio REST API with the TWILIO_* settings.
+    """
+    api_url = 'https://api.twilio.com/2010-04-01/Accounts/{sid}/Messages.json'
+    timeout = 10
+
+    def __init__(self):
+        credentials = f'{settings.TWILIO_ACCOUNT_SID}:{settings.TWILIO_AUTH_TOKEN}'
+        self.authorization = 'Basic ' + base64.b64encode(credentials.encode()).decode()
+        self.url = self.api_url.format(sid=settings.TWILIO_ACCOUNT_SID)
+
+    def send_messages(self, messages):
+        return [self.send(message) for message in messages]
+
+    def send(self, message):
+        data = urllib.parse.urlencode({
+            'To': message.recipient,
+            'From': settings.TWILIO_PHONE_NUMBER,
+            'Body': message.body,
+        }).encode()
+        request = urllib.request.Request(self.url, data=data, headers={'Authorization': self.authorization})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return True, json.load(response).get('sid')
+        except urllib.error.HTTPError as e:
+            return False, f'HTTP {e.code}: {e.read().decode(errors="replace")[:500]}'
+        except (urllib.error.URLError, OSError) as e:
+            return False, str(e)
+
+
+class RateLimiter:
+    """
+    Pace sends to at most `rate` messages per second (0 means unlimited).
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_slot = time.monotonic()
+
+    def wait(self, count):
+        """Block until `count` more messages may go out."""
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self.next_slot > now:
+            time.sleep(self.next_slot - now)
+        self.next_slot = max(self.next_slot, now) + count * self.interval
+
+
+def get_backend(channel, path=None):
+    """Instantiate the configured backend for a channel, or the one at `path`."""
+    if path is None:
+        path = settings.OUTBOUND_EMAIL_BACKEND if channel == 'email' else settings.OUTBOUND_SMS_BACKEND
+    return import_string(path)()
+
+
+def channel_rate(channel):
+    return settings.OUTBOUND_EMAIL_RATE if channel == 'email' else settings.OUTBOUND_SMS_RATE
+
+
+def queue_message(customer, channel, body, subject=None, recipient=None, user=None, send_at=None):
+    """
+    Log a communication for the customer and queue it for sending.
+
+    The recipient defaults to the customer's email or normalized phone
+    number; raises ValueError when the customer has none.
+    """
+    if channel not in CHANNELS:
+        raise ValueError(f'Unknown channel: {channel}')
+    if recipient is None:
+        recipient = customer.email if channel == 'email' else (customer.phone_normalized or customer.phone)
+    if not recipient:
+        raise ValueError(f'Customer has no {"email address" if channel == "email" else "phone number"}')
+
+    with transaction.atomic():
+        communication = CustomerCommunication.objects.create(
+            customer=customer,
+            communication_type=channel,
+            subject=subject,
+            message=body,
+            direction='outbound',
+            created_by=user,
+            delivery_status='queued',
+        )
+        return OutboundMessage.objects.create(
+            communication=communication,
+            channel=channel,
+            recipient=recipient,
+            subject=subject,
+            body=body,
+            next_attempt_at=send_at or timezone.now(),
+        )
+
+
+def claim_batch(channel, batch_size):
+    """
+    Mark up to `batch_size` due messages as sending and return them.
+
+    Rows locked by another sender are skipped, so several senders can
+    drain the same queue without sending a message twice.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundMessage.objects.select_for_update(skip_locked=True)
+            .filter(channel=channel, status__in=['queued', 'sending'], next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        OutboundMessage.objects.filter(pk__in=ids).update(
+            status='sending', next_attempt_at=now + CLAIM_TIMEOUT, updated_at=now
+        )
+    return list(OutboundMessage.objects.filter(pk__in=ids).order_by('next_attempt_at', 'id'))
+
+
+def retry_delay(attempts):
+    """Exponential backoff from OUTBOUND_RETRY_BASE_SECONDS, capped at MAX_RETRY_DELAY."""
+    return min(timedelta(seconds=settings.OUTBOUND_RETRY_BASE_SECONDS * 2 ** (attempts - 1)), MAX_RETRY_DELAY)
+
+
+def record_results(messages, results):
+    """
+    Store the outcome of one batch on the messages and their communications.
+
+    Failed messages are rescheduled with backoff until OUTBOUND_MAX_ATTEMPTS
+    is reached. Returns (sent, retrying, failed) counts.
+    """
+    now = timezone.now()
+    communications = []
+    counts = {'sent': 0, 'queued': 0, 'failed': 0}
+    for message, (ok, detail) in zip(messages, results):
+        message.attempts += 1
+        message.updated_at = now
+        if ok:
+            message.status = 'sent'
+            message.sent_at = now
+            message.provider_message_id = detail
+            message.last_error = None
+        elif message.attempts >= settings.OUTBOUND_MAX_ATTEMPTS:
+            message.status = 'failed'
+            message.last_error = detail
+        else:
+            message.status = 'queued'
+            message.next_attempt_at = now + retry_delay(message.attempts)
+            message.last_error = detail
+        counts[message.status] += 1
+        if message.status != 'queued':
+            communications.append(CustomerCommunication(
+                pk=message.communication_id,
+                delivery_status=message.status,
+                delivered_at=message.sent_at,
+            ))
+
+    with transaction.atomic():
+        OutboundMessage.objects.bulk_update(messages, [
+            'status', 'attempts', 'next_attempt_at', 'last_error', 'provider_message_id', 'sent_at', 'updated_at',
+        ])
+        CustomerCommunication.objects.bulk_update(communications, ['delivery_status', 'delivered_at'])
+    return counts['sent'], counts['queued'], counts['failed']
+
+
+def send_queued_messages(channel, backend=None, batch_size=None, limit=None):
+    """
+    Drain the due messages of one channel in batches.
+
+    Batches are no larger than the channel's per-second rate, and the rate
+    limiter spaces them so the provider limit is never exceeded. Returns a
+    dict of sent, retrying and failed counts plus elapsed seconds.
+    """
+    backend = backend or get_backend(channel)
+    rate = channel_rate(channel)
+    batch_size = batch_size or settings.OUTBOUND_BATCH_SIZE
+    if rate:
+        batch_size = max(1, min(batch_size, int(rate)))
+    limiter = RateLimiter(rate)
+
+    totals = {'sent': 0, 'retrying': 0, 'failed': 0}
+    started = time.monotonic()
+    while limit is None or sum(totals.values()) < limit:
+        size = batch_size if limit is None else min(batch_size, limit - sum(totals.values()))
+        messages = claim_batch(channel, size)
+        if not messages:
+            break
+        limiter.wait(len(messages))
+        try:
+            results = backend.send_messages(messages)
+        except Exception as e:
+            results = [(False, str(e))] * len(messages)
+        sent, retrying, failed = record_results(messages, results)
+        totals['sent'] += sent
+        totals['retrying'] += retrying
+        totals['failed'] += failed
+    totals['elapsed'] = time.monotonic() - started
+    return totals
@@ -0,0 +1,129 @@
+"""
+Customer 360 overview for Car ERP System.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum, Count
+from django.urls import reverse
+from django.utils import timezone
+from job_orders.models import JobOrder
+from vehicles.models import Vehicle
+from accounting.models import Invoice, Payment
+from .models import Customer, CustomerCommunication, Appointment
+from .serializers import CustomerSerializer
+
+CLOSED_JOB_STATUSES = ['delivered', 'cancelled']
+RECENT_ACTIVITY_LIMIT = 10
+# Rows per page of the vehicle and open job order sections; the first page is embedded in the overview.
+SECTION_PAGE_SIZE = settings.REST_FRAMEWORK['PAGE_SIZE']
+
+
+def cache_key(customer_id):
+    return f"customer360:{customer_id}"
+
+
+def invalidate(customer_id):
+    """Drop the cached overview for a customer."""
+    if customer_id:
+        cache.delete(cache_key(customer_id))
+
+
+def invalidate_on_commit(customer_ids):
+    """
+    Drop the cached overviews of `customer_ids` once the current transaction commits.
+
+    Invalidating before the commit would let a concurrent read cache the
+    rows as they were before the write.
+    """
+    keys = [cache_key(customer_id) for customer_id in set(customer_ids) if customer_id]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def customer_vehicles(customer_id):
+    """Active vehicles of a customer, for the overview's vehicle section."""
+    return Vehicle.objects.filter(customer_id=customer_id, is_active=True).order_by('id').values(
+        'id', 'year', 'make', 'model', 'license_plate', 'vin', 'mileage'
+    )
+
+
+def customer_open_jobs(customer_id):
+    """Job orders of a customer that are not closed yet, newest first."""
+    return JobOrder.objects.filter(customer_id=customer_id).exclude(
+        status__in=CLOSED_JOB_STATUSES
+    ).order_by('-received_date', '-id').values(
+        'id', 'job_number', 'status', 'priority', 'service_type', 'received_date',
+        'estimated_completion', 'vehicle_id', 'vehicle__license_plate',
+        'assigned_technician__first_name', 'assigned_technician__last_name'
+    )
+
+
+def first_page(queryset, url_name, customer_id):
+    """Count, first page and a link to the second page of an overview section."""
+    rows = list(queryset[:SECTION_PAGE_SIZE])
+    count = len(rows) if len(rows) < SECTION_PAGE_SIZE else queryset.count()
+    return {
+        'count': count,
+        'next': f"{reverse(url_name, args=[customer_id])}?page=2" if count > SECTION_PAGE_SIZE else None,
+        'results': rows,
+    }
+
+
+def build_customer_360(customer):
+    """
+    Profile, vehicles, open jobs, balance and recent activity for a customer.
+
+    Issues a fixed number of queries regardless of how much history the
+    customer has: every related list is a bounded `values()` query. Vehicles
+    and open job orders carry their count and the first page, with a link
+    to the next page of the section's own endpoint.
+    """
+    vehicles = first_page(customer_vehicles(customer.pk), 'customer_360_vehicles', customer.pk)
+    open_jobs = first_page(customer_open_jobs(customer.pk), 'customer_360_open_jobs', customer.pk)
+
+    balance = Invoice.objects.filter(customer=customer, balance_due__gt=0).exclude(
+        status__in=['draft', 'cancelled']
+    ).aggregate(balance_due=Sum('balance_due'), open_invoices=Count('id'))
+
+    recent_payments = list(Payment.objects.filter(customer=customer).order_by('-payment_date').values(
+        'id', 'payment_number', 'amount', 'payment_method', 'status', 'payment_date', 'invoice__invoice_number'
+    )[:RECENT_ACTIVITY_LIMIT])
+
+    recent_communications = list(CustomerCommunication.objects.filter(customer=customer).order_by(
+        '-communication_date'
+    ).values(
+        'id', 'communication_type', 'direction', 'subject', 'communication_date'
+    )[:RECENT_ACTIVITY_LIMIT])
+
+    upcoming_appointments = list(Appointment.objects.filter(
+        customer=customer, appointment_date__gte=timezone.now()
+    ).exclude(status__in=['cancelled', 'completed', 'no_show']).order_by('appointment_date').values(
+        'id', 'appointment_date', 'duration_minutes', 'service_type', 'status', 'assigned_to'
+    )[:RECENT_ACTIVITY_LIMIT])
+
+    return {
+        'profile': CustomerSerializer(customer).data,
+        'vehicles': vehicles,
+        'open_job_orders': open_jobs,
+        'balance': {
+            'balance_due': balance['balance_due'] or 0,
+            'open_invoices': balance['open_invoices'],
+        },
+        'recent_payments': recent_payments,
+        'recent_communications': recent_communications,
+        'upcoming_appointments': upcoming_appointments,
+    }
+
+
+def get_customer_360(customer_id):
+    """Cached Customer 360 payload, or None if the customer does not exist."""
+    key = cache_key(customer_id)
+    data = cache.get(key)
+    if data is None:
+        customer = Customer.objects.select_related('created_by').filter(pk=customer_id).first()
+        if customer is None:
+            return None
+        data = build_customer_360(customer)
+        cache.set(key, data, settings.CUSTOMER_360_CACHE_TIMEOUT)
+    return data
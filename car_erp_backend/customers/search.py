@@ -0,0 +1,96 @@
+"""
+Customer search helpers for Car ERP System.
+"""
+import re
+import unicodedata
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+# Minimum trigram similarity for a fuzzy name match; the default of
+# pg_trgm.similarity_threshold, which the indexed `%` operator applies.
+NAME_SIMILARITY_THRESHOLD = 0.3
+
+
+def normalize_phone(raw, country_code=None):
+    """
+    E.164 form of a phone number, e.g. "(555) 1234" -> "+15551234".
+    
+    Numbers without an international prefix get `country_code` (defaults to
+    settings.DEFAULT_PHONE_COUNTRY_CODE) after dropping a leading trunk 0.
+    Returns an empty string when there are no digits.
+    """
+    if not raw:
+        return ''
+    raw = raw.strip()
+    digits = re.sub(r'\D', '', raw)
+    if not digits:
+        return ''
+    if raw.startswith('+'):
+        return f"+{digits}"
+    if digits.startswith('00'):
+        return f"+{digits[2:]}"
+    country_code = country_code or settings.DEFAULT_PHONE_COUNTRY_CODE
+    if len(digits) > 10 and digits.startswith(country_code):
+        return f"+{digits}"
+    return f"+{country_code}{digits.lstrip('0')}"
+
+
+def normalize_name(*parts):
+    """Lowercase, accent-free, single-spaced form of a name."""
+    text = ' '.join(part for part in parts if part)
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.lower().split())
+
+
+def looks_like_phone(term):
+    """True when a search term is mostly digits, e.g. "555-1234"."""
+    digits = re.sub(r'\D', '', term)
+    return len(digits) >= 4 and len(digits) >= len(term.replace(' ', '')) - 4
+
+
+def phone_lookup(raw):
+    """Q matching customers whose primary or alternate phone equals `raw` once normalized."""
+    phone = normalize_phone(raw)
+    return Q(phone_normalized=phone) | Q(alternate_phone_normalized=phone)
+
+
+def email_matches(queryset, term):
+    """Ids of customers whose email equals `term` ignoring case, looked up on the LOWER(email) index."""
+    return list(
+        queryset.annotate(email_lower=Lower('email')).filter(email_lower=term.lower()).values_list('pk', flat=True)
+    )
+
+
+def search_customers(queryset, term):
+    """
+    Filter and rank customers for a free-text search term.
+    
+    Phone-like terms match the normalized phone columns, exactly or by
+    suffix through their trigram indexes. Other terms match the normalized
+    name with the trigram `%` operator on PostgreSQL, so misspellings still
+    find the customer and the GIN index is used; similarity is computed
+    only to rank the matches. An exact email match is looked up separately
+    on its own index and added by id.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+
+    if looks_like_phone(term):
+        digits = re.sub(r'\D', '', term)
+        return queryset.filter(
+            phone_lookup(term) | Q(phone_normalized__endswith=digits) | Q(alternate_phone_normalized__endswith=digits)
+        )
+
+    name = normalize_name(term)
+    matches = Q(name_normalized__contains=name) | Q(pk__in=email_matches(queryset, term))
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+        return queryset.filter(Q(name_normalized__trigram_similar=name) | matches).annotate(
+            similarity=TrigramSimilarity('name_normalized', name)
+        ).order_by('-similarity', 'last_name', 'first_name')
+
+    return queryset.filter(matches)
@@ -2,7 +2,7 @@
 Customer serializers for Car ERP System.
 """
 from rest_framework import serializers
-from .models import Customer, CustomerDocument, CustomerCommunication, Appointment
+from .models import Customer, CustomerDocument, CustomerCommunication, Appointment, DuplicateCandidate, OutboundMessage
 from authentication.serializers import UserSerializer
 
 
@@ -56,7 +56,7 @@ class CustomerCommunicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomerCommunication
         fields = '__all__'
-        read_only_fields = ['communication_date']
+        read_only_fields = ['communication_date', 'delivery_status', 'delivered_at']
     
     def get_customer_name(self, obj):
         return obj.customer.full_name
@@ -94,6 +94,48 @@ class AppointmentSerializer(serializers.ModelSerializer):
         return None
 
 
+class DuplicateCandidateSerializer(serializers.ModelSerializer):
+    """
+    Duplicate candidate serializer.
+    """
+    customer_name = serializers.CharField(source='customer.full_name', read_only=True)
+    customer_phone = serializers.CharField(source='customer.phone', read_only=True)
+    duplicate_name = serializers.CharField(source='duplicate.full_name', read_only=True)
+    duplicate_phone = serializers.CharField(source='duplicate.phone', read_only=True)
+    
+    class Meta:
+        model = DuplicateCandidate
+        fields = '__all__'
+        read_only_fields = ['customer', 'duplicate', 'score', 'reasons', 'status', 'reviewed_by', 'reviewed_at', 'created_at', 'updated_at']
+
+
+class OutboundMessageSerializer(serializers.ModelSerializer):
+    """
+    Outbound queue message serializer.
+    """
+    customer = serializers.IntegerField(source='communication.customer_id', read_only=True)
+    
+    class Meta:
+        model = OutboundMessage
+        fields = '__all__'
+        read_only_fields = [
+            'communication', 'status', 'attempts', 'next_attempt_at', 'last_error',
+            'provider_message_id', 'sent_at', 'created_at', 'updated_at',
+        ]
+
+
+class SendMessageSerializer(serializers.Serializer):
+    """
+    Request body for queueing an email or SMS to a customer.
+    """
+    customer = serializers.PrimaryKeyRelatedField(queryset=Customer.objects.all())
+    channel = serializers.ChoiceField(choices=OutboundMessage.CHANNEL_CHOICES)
+    subject = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    body = serializers.CharField()
+    recipient = serializers.CharField(max_length=254, required=False)
+    send_at = serializers.DateTimeField(required=False)
+
+
 class CustomerDetailSerializer(CustomerSerializer):
     """
     Detailed customer serializer with related data.
@@ -103,5 +145,5 @@ class CustomerDetailSerializer(CustomerSerializer):
     appointments = AppointmentSerializer(many=True, read_only=True)
     
     class Meta(CustomerSerializer.Meta):
-        fields = CustomerSerializer.Meta.fields + ['documents', 'communications', 'appointments']
+        fields = '__all__'
 
@@ -0,0 +1,54 @@
+"""
+Signal handlers for customers app.
+"""
+from django.db import connections
+from django.db.models.signals import pre_save, post_save, post_delete
+from . import overview
+
+# Models whose writes change a customer's 360 overview, keyed by the
+# attribute holding the customer id.
+CUSTOMER_360_SOURCES = {
+    'customers.Customer': 'pk',
+    'customers.CustomerCommunication': 'customer_id',
+    'customers.Appointment': 'customer_id',
+    'vehicles.Vehicle': 'customer_id',
+    'job_orders.JobOrder': 'customer_id',
+    'accounting.Invoice': 'customer_id',
+    'accounting.Payment': 'customer_id',
+}
+
+
+def _previous_customer(attribute):
+    def remember_previous_customer(sender, instance, update_fields=None, **kwargs):
+        """Keep the stored customer id, so moving a record also refreshes the customer it left."""
+        instance._customer_360_previous = None
+        if instance.pk is None or (update_fields is not None and not {'customer', 'customer_id'} & set(update_fields)):
+            return
+        instance._customer_360_previous = (
+            sender._base_manager.filter(pk=instance.pk).values_list(attribute, flat=True).first()
+        )
+    return remember_previous_customer
+
+
+def _invalidator(attribute):
+    def invalidate_customer_360(sender, instance, **kwargs):
+        overview.invalidate_on_commit([getattr(instance, attribute), getattr(instance, '_customer_360_previous', None)])
+    return invalidate_customer_360
+
+
+for model, attribute in CUSTOMER_360_SOURCES.items():
+    handler = _invalidator(attribute)
+    if attribute != 'pk':
+        pre_save.connect(
+            _previous_customer(attribute), sender=model, weak=False, dispatch_uid=f'customer360_pre_save_{model}'
+        )
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=f'customer360_save_{model}')
+    post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f'customer360_delete_{model}')
+
+
+def create_search_extensions(sender, using, **kwargs):
+    """Enable pg_trgm before migrations create the trigram name index."""
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
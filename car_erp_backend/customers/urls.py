@@ -8,8 +8,18 @@ urlpatterns = [
     # Customer endpoints
     path('', views.CustomerListView.as_view(), name='customer_list'),
     path('<int:pk>/', views.CustomerDetailView.as_view(), name='customer_detail'),
+    path('<int:pk>/360/', views.customer_360, name='customer_360'),
+    path('<int:pk>/360/vehicles/', views.customer_360_vehicles, name='customer_360_vehicles'),
+    path('<int:pk>/360/open-jobs/', views.customer_360_open_jobs, name='customer_360_open_jobs'),
+    path('caller-id/', views.customer_caller_id, name='customer_caller_id'),
+    path('import/', views.import_customers, name='customer_import'),
     path('stats/', views.customer_stats, name='customer_stats'),
     
+    # Duplicate review endpoints
+    path('duplicates/', views.DuplicateCandidateListView.as_view(), name='duplicate_candidate_list'),
+    path('duplicates/<int:pk>/merge/', views.merge_duplicate_candidate, name='merge_duplicate_candidate'),
+    path('duplicates/<int:pk>/dismiss/', views.dismiss_duplicate_candidate, name='dismiss_duplicate_candidate'),
+    
     # Customer document endpoints
     path('documents/', views.CustomerDocumentListView.as_view(), name='customer_document_list'),
     path('documents/<int:pk>/', views.CustomerDocumentDetailView.as_view(), name='customer_document_detail'),
@@ -17,9 +27,12 @@ urlpatterns = [
     # Customer communication endpoints
     path('communications/', views.CustomerCommunicationListView.as_view(), name='customer_communication_list'),
     path('communications/<int:pk>/', views.CustomerCommunicationDetailView.as_view(), name='customer_communication_detail'),
+    path('communications/send/', views.send_communication, name='send_communication'),
+    path('communications/outbound/', views.OutboundMessageListView.as_view(), name='outbound_message_list'),
     
     # Appointment endpoints
     path('appointments/', views.AppointmentListView.as_view(), name='appointment_list'),
+    path('appointments/availability/', views.appointment_availability, name='appointment_availability'),
     path('appointments/<int:pk>/', views.AppointmentDetailView.as_view(), name='appointment_detail'),
 ]
 
@@ -1,22 +1,40 @@
 """
 Customer views for Car ERP System.
 """
+import codecs
+import csv
 from rest_framework import generics, permissions, filters, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
-from .models import Customer, CustomerDocument, CustomerCommunication, Appointment
+from django.db.models import Q, Prefetch
+from datetime import datetime
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import Customer, CustomerDocument, CustomerCommunication, Appointment, DuplicateCandidate, OutboundMessage
+from .availability import ensure_available, staff_availability
+from .csv_import import import_customers_csv
+from .dedup import MergeError, merge_customers
+from .outbound import queue_message
+from .overview import get_customer_360, customer_vehicles, customer_open_jobs
+from .search import search_customers, phone_lookup
 from .serializers import (
     CustomerSerializer, CustomerDetailSerializer, CustomerDocumentSerializer,
-    CustomerCommunicationSerializer, AppointmentSerializer
+    CustomerCommunicationSerializer, AppointmentSerializer, DuplicateCandidateSerializer,
+    OutboundMessageSerializer, SendMessageSerializer
 )
 from authentication.models import User
+from vehicles.models import Vehicle
 
 
 class CustomerListView(generics.ListCreateAPIView):
     """
     List all customers or create a new customer.
+    
+    `q` runs a fuzzy search: phone numbers in any format match the normalized
+    phone columns and names are ranked by trigram similarity.
     """
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
@@ -30,9 +48,21 @@ class CustomerListView(generics.ListCreateAPIView):
     def get_queryset(self):
         """Filter customers based on user permissions."""
         user = self.request.user
-        if user.can_access_crm():
-            return Customer.objects.all()
-        return Customer.objects.none()
+        if not user.can_access_crm():
+            return Customer.objects.none()
+        queryset = Customer.objects.all()
+        term = self.request.query_params.get('q')
+        if term:
+            queryset = search_customers(queryset, term)
+        return queryset
+    
+    def filter_queryset(self, queryset):
+        if self.request.query_params.get('q') and 'ordering' not in self.request.query_params:
+            # Keep the relevance ranking from search_customers.
+            for backend in (DjangoFilterBackend, filters.SearchFilter):
+                queryset = backend().filter_queryset(self.request, queryset, self)
+            return queryset
+        return super().filter_queryset(queryset)
     
     def perform_create(self, serializer):
         """Set the created_by field."""
@@ -54,9 +84,16 @@ class CustomerDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         """Filter customers based on user permissions."""
         user = self.request.user
-        if user.can_access_crm():
-            return Customer.objects.all()
-        return Customer.objects.none()
+        if not user.can_access_crm():
+            return Customer.objects.none()
+        if self.request.method == 'GET':
+            # Nested serializers read each row's customer and user names.
+            return Customer.objects.select_related('created_by').prefetch_related(
+                Prefetch('documents', queryset=CustomerDocument.objects.select_related('uploaded_by')),
+                Prefetch('communications', queryset=CustomerCommunication.objects.select_related('created_by')),
+                Prefetch('appointments', queryset=Appointment.objects.select_related('created_by', 'assigned_to')),
+            )
+        return Customer.objects.all()
 
 
 class CustomerDocumentListView(generics.ListCreateAPIView):
@@ -105,7 +142,7 @@ class CustomerCommunicationListView(generics.ListCreateAPIView):
     serializer_class = CustomerCommunicationSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['customer', 'communication_type', 'direction']
+    filterset_fields = ['customer', 'communication_type', 'direction', 'delivery_status']
     ordering_fields = ['communication_date']
     ordering = ['-communication_date']
     
@@ -137,6 +174,54 @@ class CustomerCommunicationDetailView(generics.RetrieveUpdateDestroyAPIView):
         return CustomerCommunication.objects.none()
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def send_communication(request):
+    """
+    Queue an email or SMS to a customer.
+    
+    The message is logged as an outbound communication straight away and
+    delivered by the send_outbound_messages command.
+    """
+    user = request.user
+    if not user.can_access_crm():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    serializer = SendMessageSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    try:
+        message = queue_message(
+            data['customer'], data['channel'], data['body'],
+            subject=data.get('subject') or None,
+            recipient=data.get('recipient'),
+            user=user,
+            send_at=data.get('send_at'),
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(OutboundMessageSerializer(message).data, status=status.HTTP_202_ACCEPTED)
+
+
+class OutboundMessageListView(generics.ListAPIView):
+    """
+    Messages in the outbound queue with their delivery state.
+    """
+    serializer_class = OutboundMessageSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['channel', 'status', 'communication__customer']
+    ordering_fields = ['created_at', 'next_attempt_at', 'sent_at']
+    ordering = ['-created_at']
+    
+    def get_queryset(self):
+        """Filter messages based on user permissions."""
+        user = self.request.user
+        if user.can_access_crm():
+            return OutboundMessage.objects.all()
+        return OutboundMessage.objects.none()
+
+
 class AppointmentListView(generics.ListCreateAPIView):
     """
     List all appointments or create a new appointment.
@@ -157,8 +242,14 @@ class AppointmentListView(generics.ListCreateAPIView):
         return Appointment.objects.none()
     
     def perform_create(self, serializer):
-        """Set the created_by field."""
-        serializer.save(created_by=self.request.user)
+        """Reject overlapping bookings and set the created_by field."""
+        data = serializer.validated_data
+        with transaction.atomic():
+            ensure_available(
+                data.get('assigned_to'), data['appointment_date'],
+                data.get('duration_minutes', 60), data.get('status', 'scheduled')
+            )
+            serializer.save(created_by=self.request.user)
 
 
 class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -175,6 +266,247 @@ class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
         if user.can_access_crm():
             return Appointment.objects.all()
         return Appointment.objects.none()
+    
+    def perform_update(self, serializer):
+        """Reject changes that make the booking overlap another one."""
+        instance = serializer.instance
+        data = serializer.validated_data
+        with transaction.atomic():
+            ensure_available(
+                data.get('assigned_to', instance.assigned_to),
+                data.get('appointment_date', instance.appointment_date),
+                data.get('duration_minutes', instance.duration_minutes),
+                data.get('status', instance.status),
+                exclude_id=instance.pk,
+            )
+            serializer.save()
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def appointment_availability(request):
+    """
+    Get free appointment windows per staff member.
+    
+    Query parameters: `start` (YYYY-MM-DD, default today), `days` (default 7),
+    `duration` in minutes (default 60) and a comma-separated `assigned_to`.
+    """
+    user = request.user
+    if not user.can_access_crm():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        start = request.query_params.get('start')
+        start_date = datetime.strptime(start, '%Y-%m-%d').date() if start else timezone.localdate()
+        days = int(request.query_params.get('days', 7))
+        duration = int(request.query_params.get('duration', 60))
+        assignee_ids = [int(pk) for pk in request.query_params.get('assigned_to', '').split(',') if pk]
+    except ValueError:
+        return Response({'error': 'Invalid start, days, duration or assigned_to'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= days <= 31 or duration <= 0:
+        return Response({'error': 'days must be 1-31 and duration positive'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'start': start_date,
+        'days': days,
+        'duration_minutes': duration,
+        'staff': staff_availability(start_date, days, duration, assignee_ids),
+    })
+
+
+class DuplicateCandidateListView(generics.ListAPIView):
+    """
+    Review queue of possible duplicate customers, highest score first.
+    """
+    serializer_class = DuplicateCandidateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['status', 'customer', 'duplicate']
+    ordering_fields = ['score', 'created_at']
+    ordering = ['-score']
+    
+    def get_queryset(self):
+        """Filter candidates based on user permissions."""
+        user = self.request.user
+        if user.can_access_crm():
+            return DuplicateCandidate.objects.select_related('customer', 'duplicate')
+        return DuplicateCandidate.objects.none()
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def merge_duplicate_candidate(request, pk):
+    """
+    Merge a duplicate candidate pair.
+    
+    The candidate's `customer` survives unless `keep` names the other one.
+    """
+    user = request.user
+    if not user.can_access_crm():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        candidate = DuplicateCandidate.objects.get(pk=pk)
+    except DuplicateCandidate.DoesNotExist:
+        return Response({'error': 'Duplicate candidate not found'}, status=status.HTTP_404_NOT_FOUND)
+    if candidate.status != 'pending':
+        return Response({'error': f'Candidate is already {candidate.status}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    survivor_id, duplicate_id = candidate.customer_id, candidate.duplicate_id
+    keep = request.data.get('keep')
+    if keep is not None and str(keep) == str(duplicate_id):
+        survivor_id, duplicate_id = duplicate_id, survivor_id
+    elif keep is not None and str(keep) != str(survivor_id):
+        return Response({'error': 'keep must be one of the two customers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        moved = merge_customers(survivor_id, duplicate_id, user=user, candidate_id=candidate.pk)
+    except MergeError as error:
+        return Response({'error': str(error)}, status=error.status_code)
+    return Response({
+        'customer': survivor_id,
+        'merged_customer': duplicate_id,
+        'moved': moved,
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def dismiss_duplicate_candidate(request, pk):
+    """
+    Mark a duplicate candidate pair as distinct customers.
+    """
+    user = request.user
+    if not user.can_access_crm():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    updated = DuplicateCandidate.objects.filter(pk=pk, status='pending').update(
+        status='dismissed', reviewed_by=user, reviewed_at=timezone.now(), updated_at=timezone.now()
+    )
+    if not updated:
+        return Response({'error': 'Pending duplicate candidate not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'message': 'Duplicate candidate dismissed'})
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def import_customers(request):
+    """
+    Bulk import customers and vehicles from an uploaded CSV file.
+    
+    Set `dry_run` to validate the file without writing anything.
+    """
+    user = request.user
+    if not user.can_access_crm():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    try:
+        result = import_customers_csv(
+            codecs.iterdecode(upload, 'utf-8-sig'), user=user,
+            workers=settings.CSV_IMPORT_WORKERS, dry_run=dry_run
+        )
+    except (UnicodeDecodeError, csv.Error) as e:
+        return Response({'error': f'Could not read CSV file: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    result['errors'] = result['errors'][:settings.CSV_IMPORT_ERROR_LIMIT]
+    return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def customer_360(request, pk):
+    """
+    Get a customer's profile, vehicles, open jobs, balance and recent activity.
+    """
+    user = request.user
+    if not user.can_access_crm():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    data = get_customer_360(pk)
+    if data is None:
+        return Response({'error': 'Customer not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(data)
+
+
+def _customer_360_section(request, pk, queryset):
+    """One page of a Customer 360 section; the overview embeds page 1."""
+    if not request.user.can_access_crm():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    if not Customer.objects.filter(pk=pk).exists():
+        return Response({'error': 'Customer not found'}, status=status.HTTP_404_NOT_FOUND)
+    paginator = PageNumberPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    return paginator.get_paginated_response(list(page))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def customer_360_vehicles(request, pk):
+    """
+    Page through a customer's active vehicles.
+    """
+    return _customer_360_section(request, pk, customer_vehicles(pk))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def customer_360_open_jobs(request, pk):
+    """
+    Page through a customer's open job orders, newest first.
+    """
+    return _customer_360_section(request, pk, customer_open_jobs(pk))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def customer_caller_id(request):
+    """
+    Look up customers and their vehicles by an incoming phone number.
+    """
+    user = request.user
+    if not user.can_access_crm():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    phone = request.query_params.get('phone', '')
+    if not any(char.isdigit() for char in phone):
+        return Response({'error': 'phone is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    customers = Customer.objects.filter(phone_lookup(phone)).only(
+        'id', 'first_name', 'last_name', 'company_name', 'phone', 'alternate_phone', 'email', 'is_active'
+    ).prefetch_related(
+        Prefetch('vehicles', queryset=Vehicle.objects.filter(is_active=True).only(
+            'id', 'customer', 'make', 'model', 'year', 'license_plate', 'vin'
+        ))
+    )
+    
+    return Response([
+        {
+            'id': customer.id,
+            'full_name': customer.full_name,
+            'company_name': customer.company_name,
+            'phone': customer.phone,
+            'alternate_phone': customer.alternate_phone,
+            'email': customer.email,
+            'is_active': customer.is_active,
+            'vehicles': [
+                {
+                    'id': vehicle.id,
+                    'make': vehicle.make,
+                    'model': vehicle.model,
+                    'year': vehicle.year,
+                    'license_plate': vehicle.license_plate,
+                    'vin': vehicle.vin,
+                }
+                for vehicle in customer.vehicles.all()
+            ],
+        }
+        for customer in customers
+    ])
 
 
 @api_view(['GET'])
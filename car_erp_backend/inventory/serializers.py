@@ -102,7 +102,7 @@ class PartDetailSerializer(PartSerializer):
     photos = PartPhotoSerializer(many=True, read_only=True)
     
     class Meta(PartSerializer.Meta):
-        fields = PartSerializer.Meta.fields + ['category', 'supplier', 'created_by', 'photos']
+        fields = '__all__'
 
 
 class PurchaseOrderItemSerializer(serializers.ModelSerializer):
@@ -150,7 +150,7 @@ class PurchaseOrderDetailSerializer(PurchaseOrderSerializer):
     items = PurchaseOrderItemSerializer(many=True, read_only=True)
     
     class Meta(PurchaseOrderSerializer.Meta):
-        fields = PurchaseOrderSerializer.Meta.fields + ['supplier', 'created_by', 'items']
+        fields = '__all__'
 
 
 class StockMovementSerializer(serializers.ModelSerializer):
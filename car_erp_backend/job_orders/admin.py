@@ -3,7 +3,8 @@ Admin configuration for job_orders app.
 """
 from django.contrib import admin
 from .models import (
-    JobOrder, JobOrderItem, TechnicianTime, JobOrderPhoto, JobOrderStatusHistory
+    JobOrder, JobOrderItem, TechnicianTime, TechnicianDailyHours, JobOrderPhoto, JobOrderPhotoUpload,
+    JobOrderStatusHistory, ArchivedJobOrder
 )
 
 
@@ -69,6 +70,18 @@ class TechnicianTimeAdmin(admin.ModelAdmin):
     readonly_fields = ['hours_worked', 'created_at', 'updated_at']
 
 
+@admin.register(TechnicianDailyHours)
+class TechnicianDailyHoursAdmin(admin.ModelAdmin):
+    """
+    Technician Daily Hours admin interface.
+    """
+    list_display = ['technician', 'work_date', 'hours_worked', 'entry_count']
+    list_filter = ['work_date', 'technician']
+    raw_id_fields = ['technician']
+    readonly_fields = ['hours_worked', 'entry_count', 'updated_at']
+    date_hierarchy = 'work_date'
+
+
 @admin.register(JobOrderPhoto)
 class JobOrderPhotoAdmin(admin.ModelAdmin):
     """
@@ -81,6 +94,18 @@ class JobOrderPhotoAdmin(admin.ModelAdmin):
     readonly_fields = ['taken_at']
 
 
+@admin.register(JobOrderPhotoUpload)
+class JobOrderPhotoUploadAdmin(admin.ModelAdmin):
+    """
+    Job Order Photo Upload admin interface.
+    """
+    list_display = ['job_order', 'filename', 'status', 'received_bytes', 'total_size', 'updated_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['job_order__job_number', 'filename', 'title']
+    raw_id_fields = ['job_order', 'photo', 'uploaded_by']
+    readonly_fields = ['received_bytes', 'created_at', 'updated_at']
+
+
 @admin.register(JobOrderStatusHistory)
 class JobOrderStatusHistoryAdmin(admin.ModelAdmin):
     """
@@ -89,6 +114,19 @@ class JobOrderStatusHistoryAdmin(admin.ModelAdmin):
     list_display = ['job_order', 'old_status', 'new_status', 'changed_at', 'changed_by']
     list_filter = ['old_status', 'new_status', 'changed_at']
     search_fields = ['job_order__job_number', 'notes']
-    raw_id_fields = ['job_order', 'changed_by']
+    raw_id_fields = ['job_order', 'assigned_technician', 'changed_by']
     readonly_fields = ['changed_at']
     date_hierarchy = 'changed_at'
+
+
+@admin.register(ArchivedJobOrder)
+class ArchivedJobOrderAdmin(admin.ModelAdmin):
+    """
+    Archived Job Order admin interface.
+    """
+    list_display = ['job_number', 'customer', 'vehicle', 'service_type', 'status', 'closed_at', 'archived_at']
+    list_filter = ['status', 'archived_at']
+    search_fields = ['job_number', 'service_type']
+    raw_id_fields = ['customer', 'vehicle', 'assigned_technician']
+    readonly_fields = ['original_id', 'data', 'archived_at']
+    date_hierarchy = 'received_date'
@@ -0,0 +1,145 @@
+"""
+Job order cycle-time analytics for Car ERP System.
+"""
+from collections import defaultdict
+from django.db.models import F, Q, Window
+from django.db.models.functions import Lag, Lead
+from django.utils import timezone
+from .models import JobOrder, JobOrderStatusHistory
+
+# Stages that end a job; time spent in them is not a cycle-time stage.
+TERMINAL_STATUSES = ['delivered', 'cancelled']
+
+
+def percentile(sorted_values, fraction):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(hours):
+    """Count, mean, p50 and p90 of a list of durations in hours."""
+    hours = sorted(hours)
+    return {
+        'count': len(hours),
+        'avg_hours': round(sum(hours) / len(hours), 2),
+        'p50_hours': round(percentile(hours, 0.5), 2),
+        'p90_hours': round(percentile(hours, 0.9), 2),
+    }
+
+
+def technician_name(first_name, last_name):
+    return f"{first_name} {last_name}".strip()
+
+
+def stage_durations(start_date, end_date):
+    """
+    Yield one record per stage visit entered between the two dates.
+
+    The time spent in a stage is the gap until the job's next status change,
+    taken with LEAD(changed_at) over each job's history in a single query.
+    The first stage runs from the job's received_date to its first recorded
+    change, and a job with no history at all is still in its first stage.
+    A stage the job is still sitting in is measured up to now. Each stage is
+    credited to the technician recorded on the history row that started it;
+    the first stage to the one recorded at the first change.
+    """
+    in_range = Q(changed_at__date__range=[start_date, end_date]) | Q(
+        job_order__received_date__date__range=[start_date, end_date]
+    )
+    jobs_in_range = JobOrderStatusHistory.objects.filter(in_range).values('job_order_id')
+
+    rows = JobOrderStatusHistory.objects.filter(
+        job_order_id__in=jobs_in_range
+    ).annotate(
+        left_at=Window(
+            expression=Lead('changed_at'),
+            partition_by=[F('job_order_id')],
+            order_by=[F('changed_at').asc(), F('id').asc()],
+        ),
+        previous_id=Window(
+            expression=Lag('id'),
+            partition_by=[F('job_order_id')],
+            order_by=[F('changed_at').asc(), F('id').asc()],
+        ),
+    ).values(
+        'old_status', 'new_status', 'changed_at', 'left_at', 'previous_id',
+        'job_order__received_date',
+        'job_order__service_type',
+        'assigned_technician',
+        'assigned_technician__first_name',
+        'assigned_technician__last_name',
+    )
+
+    stages = []
+    for row in rows:
+        technician = (row['assigned_technician'], row['assigned_technician__first_name'], row['assigned_technician__last_name'])
+        entered_at = row['changed_at']
+        if row['previous_id'] is None:
+            if row['old_status']:
+                # The history starts with a transition: the job sat in its
+                # first stage from reception until then.
+                stages.append((row['old_status'], row['job_order__service_type'], technician,
+                               row['job_order__received_date'], row['changed_at']))
+            else:
+                # The creation entry: the stage began when the job was received.
+                entered_at = min(entered_at, row['job_order__received_date'])
+        stages.append((row['new_status'], row['job_order__service_type'], technician, entered_at, row['left_at']))
+
+    untracked = JobOrder.objects.filter(
+        received_date__date__range=[start_date, end_date], status_history__isnull=True
+    ).values_list(
+        'status', 'service_type', 'assigned_technician',
+        'assigned_technician__first_name', 'assigned_technician__last_name', 'received_date',
+    )
+    for job_status, service_type, technician_id, first_name, last_name, received_date in untracked:
+        stages.append((job_status, service_type, (technician_id, first_name, last_name), received_date, None))
+
+    now = timezone.now()
+    for stage, service_type, (technician_id, first_name, last_name), entered_at, left_at in stages:
+        if stage in TERMINAL_STATUSES:
+            continue
+        if not start_date <= timezone.localdate(entered_at) <= end_date:
+            continue
+        yield {
+            'stage': stage,
+            'service_type': service_type,
+            'technician': technician_id,
+            'technician_name': technician_name(first_name, last_name) if technician_id else None,
+            'hours': ((left_at or now) - entered_at).total_seconds() / 3600,
+        }
+
+
+def cycle_time_report(start_date, end_date):
+    """
+    Stage duration distributions by stage, service type and technician.
+    """
+    by_stage = defaultdict(list)
+    by_service_type = defaultdict(list)
+    by_technician = defaultdict(list)
+    technician_names = {}
+
+    for record in stage_durations(start_date, end_date):
+        by_stage[record['stage']].append(record['hours'])
+        by_service_type[(record['stage'], record['service_type'])].append(record['hours'])
+        by_technician[(record['stage'], record['technician'])].append(record['hours'])
+        technician_names[record['technician']] = record['technician_name']
+
+    return {
+        'by_stage': [
+            {'stage': stage, **summarize(hours)}
+            for stage, hours in sorted(by_stage.items())
+        ],
+        'by_service_type': [
+            {'stage': stage, 'service_type': service_type, **summarize(hours)}
+            for (stage, service_type), hours in sorted(by_service_type.items())
+        ],
+        'by_technician': [
+            {'stage': stage, 'technician': technician, 'technician_name': technician_names[technician], **summarize(hours)}
+            for (stage, technician), hours in sorted(by_technician.items(), key=lambda item: (item[0][0], item[0][1] or 0))
+        ],
+    }
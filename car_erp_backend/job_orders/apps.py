@@ -0,0 +1,11 @@
+"""
+App configuration for job_orders app.
+"""
+from django.apps import AppConfig
+
+
+class JobOrdersConfig(AppConfig):
+    name = 'job_orders'
+
+    def ready(self):
+        from . import signals  # noqa: F401
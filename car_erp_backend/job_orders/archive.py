@@ -0,0 +1,138 @@
+"""
+Job order archival for Car ERP System.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from accounting.models import Invoice
+from .models import (
+    JobOrder, JobOrderItem, TechnicianTime, JobOrderPhoto, JobOrderPhotoUpload, JobOrderStatusHistory,
+    ArchivedJobOrder
+)
+
+CLOSED_STATUSES = ['delivered', 'cancelled']
+
+# Related rows copied into the archived snapshot, keyed by their name in it.
+SNAPSHOT_CHILDREN = {
+    'items': JobOrderItem,
+    'technician_times': TechnicianTime,
+    'photos': JobOrderPhoto,
+    'status_history': JobOrderStatusHistory,
+}
+
+# Hot-table rows removed with an archived job order, in a deletion order that
+# satisfies their foreign keys (upload sessions point at photos).
+ARCHIVED_ROWS = [JobOrderPhotoUpload, *SNAPSHOT_CHILDREN.values()]
+
+
+def archivable_job_orders(months):
+    """Closed job orders whose completion is older than `months` months."""
+    cutoff = timezone.now() - timedelta(days=30 * months)
+    return JobOrder.objects.filter(status__in=CLOSED_STATUSES).annotate(
+        closed_at=Coalesce('actual_completion', 'updated_at')
+    ).filter(closed_at__lt=cutoff)
+
+
+def archive_batch(months, batch_size):
+    """
+    Move one batch of closed job orders into the archive table.
+
+    Runs in a single transaction: the batch is locked, copied with its related
+    records, then deleted from the hot tables. The snapshot holds the stored
+    column values of the job order and its children, one query per table for
+    the whole batch. Invoices are re-pointed at the archive row.
+
+    The hot rows are removed with raw deletes so that no delete signals fire:
+    archiving moves labour records, it does not undo them, and the daily
+    hours totals kept by the TechnicianTime handlers must stay as they are.
+    Returns the number of job orders archived.
+    """
+    with transaction.atomic():
+        ids = list(
+            archivable_job_orders(months).order_by('id')
+            .select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+
+        children = {name: defaultdict(list) for name in [*SNAPSHOT_CHILDREN, 'invoices']}
+        for name, model in SNAPSHOT_CHILDREN.items():
+            for row in model.objects.filter(job_order_id__in=ids).order_by('pk').values():
+                children[name][row['job_order_id']].append(row)
+        for row in Invoice.objects.filter(job_order_id__in=ids).order_by('pk').values('id', 'invoice_number', 'job_order_id'):
+            children['invoices'][row.pop('job_order_id')].append(row)
+
+        archived = []
+        job_orders = JobOrder.objects.filter(pk__in=ids).annotate(closed_at=Coalesce('actual_completion', 'updated_at'))
+        for job_order in job_orders.values():
+            closed_at = job_order.pop('closed_at')
+            data = {**job_order, **{name: rows[job_order['id']] for name, rows in children.items()}}
+            archived.append(ArchivedJobOrder(
+                original_id=job_order['id'],
+                job_number=job_order['job_number'],
+                customer_id=job_order['customer_id'],
+                vehicle_id=job_order['vehicle_id'],
+                assigned_technician_id=job_order['assigned_technician_id'],
+                service_type=job_order['service_type'],
+                status=job_order['status'],
+                received_date=job_order['received_date'],
+                closed_at=closed_at,
+                actual_cost=job_order['actual_cost'],
+                data=data,
+            ))
+
+        ArchivedJobOrder.objects.bulk_create(archived)
+        Invoice.objects.filter(job_order_id__in=ids).update(
+            archived_job_order=Subquery(
+                ArchivedJobOrder.objects.filter(original_id=OuterRef('job_order_id')).values('pk')[:1]
+            ),
+            job_order=None,
+        )
+        for model in ARCHIVED_ROWS:
+            rows = model.objects.filter(job_order_id__in=ids)
+            rows._raw_delete(rows.db)
+        job_orders = JobOrder.objects.filter(pk__in=ids)
+        job_orders._raw_delete(job_orders.db)
+        return len(archived)
+
+
+def _restore(model, row):
+    """Build an unsaved `model` instance from a snapshot row of column values."""
+    return model(**{
+        field.attname: field.to_python(row[field.attname])
+        for field in model._meta.concrete_fields if field.attname in row
+    })
+
+
+def restore_job_order(archived):
+    """
+    Rebuild an unsaved JobOrder, with its children, from an archived snapshot.
+
+    The children are placed in the prefetch cache, so the live detail
+    serializer renders an archived job order in the same shape as a live one
+    without querying the hot tables. The customer, vehicle and technician
+    follow the archive row, which is cleared if they have since been deleted.
+    """
+    job_order = _restore(JobOrder, archived.data)
+    job_order.customer_id = archived.customer_id
+    job_order.vehicle_id = archived.vehicle_id
+    job_order.assigned_technician_id = archived.assigned_technician_id
+    job_order._prefetched_objects_cache = {
+        name: [_restore(model, row) for row in archived.data.get(name, [])]
+        for name, model in SNAPSHOT_CHILDREN.items()
+    }
+    return job_order
+
+
+def archive_closed_job_orders(months, batch_size=500):
+    """Archive every eligible job order, one batch per transaction."""
+    total = 0
+    while True:
+        archived = archive_batch(months, batch_size)
+        total += archived
+        if archived < batch_size:
+            return total
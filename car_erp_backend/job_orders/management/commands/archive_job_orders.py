@@ -0,0 +1,22 @@
+"""
+Management command to move old closed job orders into the archive table.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from job_orders.archive import archive_closed_job_orders
+
+
+class Command(BaseCommand):
+    help = 'Archive delivered or cancelled job orders closed more than N months ago'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months', type=int, default=settings.JOB_ORDER_ARCHIVE_MONTHS,
+            help='Archive jobs closed more than this many months ago'
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Job orders moved per transaction')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Archiving job orders closed more than {options['months']} month(s) ago...")
+        total = archive_closed_job_orders(options['months'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} job order(s)'))
@@ -0,0 +1,121 @@
+"""
+Management command to turn finalized chunked uploads into job order photos.
+"""
+import os
+import time
+from datetime import timedelta
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image
+from job_orders.models import JobOrderPhoto, JobOrderPhotoUpload
+
+# An upload left processing this long (e.g. by a worker that died) is claimed again.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def remove_if_exists(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class Command(BaseCommand):
+    help = 'Process queued job order photo uploads and expire abandoned ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20, help='Uploads claimed per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new uploads')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop')
+        parser.add_argument('--expire-hours', type=int, default=24, help='Fail unfinished uploads idle this long')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.process_batch(options['batch_size'])
+            expired = self.expire_abandoned(options['expire_hours'])
+            if processed or expired:
+                self.stdout.write(f'Processed {processed} upload(s), expired {expired}')
+            if not options['loop']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
+
+    def process_batch(self, batch_size):
+        """Claim and process up to `batch_size` queued uploads, one at a time."""
+        processed = 0
+        while processed < batch_size:
+            upload = self.claim_upload()
+            if upload is None:
+                break
+            self.process_upload(upload)
+            processed += 1
+        return processed
+
+    def claim_upload(self):
+        """
+        Mark the oldest queued upload as processing and return it.
+
+        The row lock is held only for this short transaction; uploads locked
+        by another worker are skipped.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            upload = (
+                JobOrderPhotoUpload.objects.select_for_update(skip_locked=True)
+                .filter(Q(status='queued') | Q(status='processing', updated_at__lt=now - CLAIM_TIMEOUT))
+                .order_by('updated_at').first()
+            )
+            if upload is not None:
+                upload.status = 'processing'
+                upload.save(update_fields=['status', 'updated_at'])
+        return upload
+
+    def process_upload(self, upload):
+        """
+        Verify the assembled file is an image and attach it as a JobOrderPhoto.
+
+        The image check and the copy to storage run outside any transaction.
+        The result is then recorded in a short one, and only if this worker
+        still holds the claim (the row is unchanged since it was claimed);
+        otherwise, or on any failure, the stored copy is removed. The partial
+        file is removed once the photo is attached.
+        """
+        claim = JobOrderPhotoUpload.objects.filter(pk=upload.pk, status='processing', updated_at=upload.updated_at)
+        photo = None
+        try:
+            with Image.open(upload.temp_path) as image:
+                image.verify()
+            with open(upload.temp_path, 'rb') as assembled:
+                photo = JobOrderPhoto(
+                    job_order_id=upload.job_order_id,
+                    photo_type=upload.photo_type,
+                    title=upload.title,
+                    description=upload.description,
+                    taken_by_id=upload.uploaded_by_id,
+                )
+                photo.image.save(os.path.basename(upload.filename), File(assembled), save=False)
+            with transaction.atomic():
+                photo.save()
+                claimed = claim.update(photo=photo, status='completed', error=None, updated_at=timezone.now())
+                if not claimed:
+                    raise RuntimeError('Upload is no longer claimed by this worker')
+        except Exception as e:
+            if photo is not None and photo.image.name:
+                photo.image.storage.delete(photo.image.name)
+            claim.update(photo=None, status='failed', error=str(e), updated_at=timezone.now())
+            self.stderr.write(f'Upload {upload.pk} failed: {e}')
+            return
+
+        remove_if_exists(upload.temp_path)
+
+    def expire_abandoned(self, expire_hours):
+        """Fail uploads that stopped receiving chunks and remove their partial files."""
+        cutoff = timezone.now() - timedelta(hours=expire_hours)
+        stale = list(JobOrderPhotoUpload.objects.filter(status='uploading', updated_at__lt=cutoff))
+        for upload in stale:
+            remove_if_exists(upload.temp_path)
+        JobOrderPhotoUpload.objects.filter(pk__in=[upload.pk for upload in stale]).update(
+            status='failed', error='Upload expired', updated_at=timezone.now()
+        )
+        return len(stale)
@@ -1,14 +1,22 @@
 """
 Job Order models for Car ERP System.
 """
-from django.db import models
+import os
+from decimal import Decimal
+from django.conf import settings
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Q
+from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
 from customers.models import Customer
 from vehicles.models import Vehicle
 
 User = get_user_model()
 
+OPEN_TIMER_CONSTRAINT = 'one_open_timer_per_technician'
+
 
 class JobOrder(models.Model):
     """
@@ -77,6 +85,10 @@ class JobOrder(models.Model):
         verbose_name = 'Job Order'
         verbose_name_plural = 'Job Orders'
         ordering = ['-received_date']
+        indexes = [
+            models.Index(fields=['status', 'assigned_technician']),
+            models.Index(fields=['vehicle', 'received_date']),
+        ]
     
     def __str__(self):
         return f"{self.job_number} - {self.customer.full_name} ({self.vehicle.license_plate})"
@@ -174,16 +186,75 @@ class TechnicianTime(models.Model):
         verbose_name = 'Technician Time'
         verbose_name_plural = 'Technician Times'
         ordering = ['-start_time']
+        constraints = [
+            # Also serves as the partial index used to find a technician's open timer.
+            models.UniqueConstraint(
+                fields=['technician'],
+                condition=Q(end_time__isnull=True),
+                name=OPEN_TIMER_CONSTRAINT
+            ),
+        ]
     
     def __str__(self):
         return f"{self.technician.get_full_name()} - {self.job_order.job_number}"
     
     def save(self, *args, **kwargs):
-        """Calculate hours worked."""
+        """
+        Calculate hours worked; an open entry has none.
+        
+        Daily totals are kept in step by the post_save and post_delete
+        handlers in signals.py, which run inside this transaction.
+        """
         if self.start_time and self.end_time:
             delta = self.end_time - self.start_time
-            self.hours_worked = delta.total_seconds() / 3600  # Convert to hours
-        super().save(*args, **kwargs)
+            self.hours_worked = (Decimal(delta.total_seconds()) / 3600).quantize(Decimal('0.01'))  # Convert to hours
+        elif not self.end_time:
+            self.hours_worked = None
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class TechnicianDailyHours(models.Model):
+    """
+    Per-technician hours worked per day, maintained as time entries close.
+    """
+    technician = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_hours')
+    work_date = models.DateField()
+    hours_worked = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    entry_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'technician_daily_hours'
+        verbose_name = 'Technician Daily Hours'
+        verbose_name_plural = 'Technician Daily Hours'
+        ordering = ['-work_date']
+        unique_together = ['technician', 'work_date']
+    
+    def __str__(self):
+        return f"{self.technician.get_full_name()} - {self.work_date} ({self.hours_worked}h)"
+    
+    @classmethod
+    def add_hours(cls, technician_id, work_date, hours, entries=1):
+        """Apply an hours delta to a technician's day with a single UPDATE."""
+        updated = cls.objects.filter(technician_id=technician_id, work_date=work_date).update(
+            hours_worked=F('hours_worked') + hours,
+            entry_count=F('entry_count') + entries,
+            updated_at=timezone.now()
+        )
+        if updated or hours < 0:
+            # A day without a row has nothing to remove, e.g. when it went with its deleted technician.
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    technician_id=technician_id, work_date=work_date,
+                    hours_worked=hours, entry_count=entries
+                )
+        except IntegrityError:
+            # Another request created the row first; apply the delta to it.
+            cls.add_hours(technician_id, work_date, hours, entries)
 
 
 class JobOrderPhoto(models.Model):
@@ -217,6 +288,54 @@ class JobOrderPhoto(models.Model):
         return f"{self.job_order.job_number} - {self.title}"
 
 
+class JobOrderPhotoUpload(models.Model):
+    """
+    Resumable chunked upload session for a job order photo.
+    """
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('queued', 'Queued for Processing'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    job_order = models.ForeignKey(JobOrder, on_delete=models.CASCADE, related_name='photo_uploads')
+    photo_type = models.CharField(max_length=20, choices=JobOrderPhoto.PHOTO_TYPES)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True, null=True)
+    
+    # Upload Progress
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    error = models.TextField(blank=True, null=True)
+    photo = models.OneToOneField(JobOrderPhoto, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload')
+    
+    # System Fields
+    uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'job_order_photo_uploads'
+        verbose_name = 'Job Order Photo Upload'
+        verbose_name_plural = 'Job Order Photo Uploads'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_order.job_number} - {self.filename} ({self.received_bytes}/{self.total_size})"
+    
+    @property
+    def temp_path(self):
+        """Path of the partial file that chunks are written into."""
+        return os.path.join(settings.CHUNKED_UPLOAD_TEMP_DIR, f"{self.pk}.part")
+
+
 class JobOrderStatusHistory(models.Model):
     """
     History of status changes for job orders.
@@ -225,6 +344,10 @@ class JobOrderStatusHistory(models.Model):
     old_status = models.CharField(max_length=20, choices=JobOrder.STATUS_CHOICES, blank=True, null=True)
     new_status = models.CharField(max_length=20, choices=JobOrder.STATUS_CHOICES)
     notes = models.TextField(blank=True, null=True)
+    # Technician assigned when the status changed; cycle-time analytics credit the stage to them.
+    assigned_technician = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
     changed_at = models.DateTimeField(auto_now_add=True)
     changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     
@@ -233,7 +356,50 @@ class JobOrderStatusHistory(models.Model):
         verbose_name = 'Job Order Status History'
         verbose_name_plural = 'Job Order Status Histories'
         ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['job_order', 'changed_at']),
+            models.Index(fields=['changed_at']),
+        ]
     
     def __str__(self):
         return f"{self.job_order.job_number} - {self.old_status} → {self.new_status}"
 
+
+
+class ArchivedJobOrder(models.Model):
+    """
+    Cold-storage copy of a closed job order.
+    
+    The indexed columns support lookups by customer, vehicle and date; `data`
+    holds the full detail payload (items, technician times, photos and
+    status history) as it was served when the job was archived.
+    """
+    original_id = models.BigIntegerField(unique=True)
+    job_number = models.CharField(max_length=50, unique=True)
+    customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, related_name='archived_job_orders')
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.SET_NULL, null=True, related_name='archived_job_orders')
+    assigned_technician = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_job_orders'
+    )
+    
+    service_type = models.CharField(max_length=200)
+    status = models.CharField(max_length=20, choices=JobOrder.STATUS_CHOICES)
+    received_date = models.DateTimeField()
+    closed_at = models.DateTimeField()
+    actual_cost = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'job_orders_archive'
+        verbose_name = 'Archived Job Order'
+        verbose_name_plural = 'Archived Job Orders'
+        ordering = ['-received_date']
+        indexes = [
+            models.Index(fields=['vehicle', 'received_date']),
+            models.Index(fields=['customer', 'received_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_number} (archived)"
@@ -2,7 +2,11 @@
 Job Order serializers for Car ERP System.
 """
 from rest_framework import serializers
-from .models import JobOrder, JobOrderItem, TechnicianTime, JobOrderPhoto, JobOrderStatusHistory
+from django.conf import settings
+from .models import (
+    JobOrder, JobOrderItem, TechnicianTime, TechnicianDailyHours, JobOrderPhoto, JobOrderPhotoUpload,
+    JobOrderStatusHistory
+)
 from customers.serializers import CustomerSerializer
 from vehicles.serializers import VehicleSerializer
 from authentication.serializers import UserSerializer
@@ -33,6 +37,20 @@ class TechnicianTimeSerializer(serializers.ModelSerializer):
         return obj.technician.get_full_name()
 
 
+class TechnicianDailyHoursSerializer(serializers.ModelSerializer):
+    """
+    Technician Daily Hours serializer.
+    """
+    technician_name = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = TechnicianDailyHours
+        fields = '__all__'
+    
+    def get_technician_name(self, obj):
+        return obj.technician.get_full_name()
+
+
 class JobOrderPhotoSerializer(serializers.ModelSerializer):
     """
     Job Order Photo serializer.
@@ -50,6 +68,23 @@ class JobOrderPhotoSerializer(serializers.ModelSerializer):
         return None
 
 
+class JobOrderPhotoUploadSerializer(serializers.ModelSerializer):
+    """
+    Job Order Photo Upload session serializer.
+    """
+    class Meta:
+        model = JobOrderPhotoUpload
+        fields = '__all__'
+        read_only_fields = ['received_bytes', 'status', 'error', 'photo', 'uploaded_by', 'created_at', 'updated_at']
+    
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('total_size must be positive.')
+        if value > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f'Uploads are limited to {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes.')
+        return value
+
+
 class JobOrderStatusHistorySerializer(serializers.ModelSerializer):
     """
     Job Order Status History serializer.
@@ -82,10 +117,14 @@ class JobOrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['job_number', 'received_date', 'updated_at']
     
     def get_customer_name(self, obj):
-        return obj.customer.full_name
+        if obj.customer_id:
+            return obj.customer.full_name
+        return None
     
     def get_vehicle_description(self, obj):
-        return obj.vehicle.full_description
+        if obj.vehicle_id:
+            return obj.vehicle.full_description
+        return None
     
     def get_assigned_technician_name(self, obj):
         if obj.assigned_technician:
@@ -112,10 +151,7 @@ class JobOrderDetailSerializer(JobOrderSerializer):
     status_history = JobOrderStatusHistorySerializer(many=True, read_only=True)
     
     class Meta(JobOrderSerializer.Meta):
-        fields = JobOrderSerializer.Meta.fields + [
-            'customer', 'vehicle', 'assigned_technician', 'created_by',
-            'items', 'technician_times', 'photos', 'status_history'
-        ]
+        fields = '__all__'
 
 
 class JobOrderCreateSerializer(serializers.ModelSerializer):
@@ -135,6 +171,7 @@ class JobOrderCreateSerializer(serializers.ModelSerializer):
             job_order=job_order,
             new_status=job_order.status,
             notes='Job order created',
+            assigned_technician_id=job_order.assigned_technician_id,
             changed_by=self.context['request'].user
         )
         
@@ -0,0 +1,49 @@
+"""
+Signal handlers for job_orders app.
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import TechnicianTime, TechnicianDailyHours
+
+
+def _contribution(technician_id, start_time, hours_worked):
+    """(technician, day, hours) a time entry adds to the daily totals, or None while it is open."""
+    if not hours_worked:
+        return None
+    return technician_id, timezone.localdate(start_time), hours_worked
+
+
+@receiver(pre_save, sender=TechnicianTime, dispatch_uid='daily_hours_pre_save')
+def remember_daily_contribution(sender, instance, raw=False, **kwargs):
+    """Read what the stored entry counts towards the daily totals before it is overwritten."""
+    previous = None
+    if instance.pk and not raw:
+        previous = TechnicianTime.objects.select_for_update().filter(pk=instance.pk).values_list(
+            'technician_id', 'start_time', 'hours_worked'
+        ).first()
+    instance._daily_contribution = _contribution(*previous) if previous else None
+
+
+@receiver(post_save, sender=TechnicianTime, dispatch_uid='daily_hours_post_save')
+def update_daily_hours(sender, instance, raw=False, **kwargs):
+    """Move the entry's hours in the daily totals, including when it is reopened or moved to another day."""
+    if raw:
+        return
+    previous = getattr(instance, '_daily_contribution', None)
+    current = _contribution(instance.technician_id, instance.start_time, instance.hours_worked)
+    if previous:
+        technician_id, work_date, hours = previous
+        TechnicianDailyHours.add_hours(technician_id, work_date, -hours, entries=-1)
+    if current:
+        TechnicianDailyHours.add_hours(*current)
+    instance._daily_contribution = current
+
+
+@receiver(post_delete, sender=TechnicianTime, dispatch_uid='daily_hours_post_delete')
+def remove_daily_hours(sender, instance, **kwargs):
+    """Remove a deleted entry's hours; also runs for cascades and queryset deletes."""
+    current = _contribution(instance.technician_id, instance.start_time, instance.hours_worked)
+    if current:
+        technician_id, work_date, hours = current
+        TechnicianDailyHours.add_hours(technician_id, work_date, -hours, entries=-1)
@@ -0,0 +1,94 @@
+"""
+Job order tests for Car ERP System.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from authentication.models import User
+from customers.models import Customer
+from vehicles.models import Vehicle
+from accounting.models import Invoice
+from .archive import archive_batch
+from .models import JobOrder, JobOrderItem, TechnicianTime, TechnicianDailyHours, ArchivedJobOrder
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class ArchiveTests(TestCase):
+    """
+    Closed job orders moved to the archive with their time entries and invoices.
+    """
+    def setUp(self):
+        self.technician = User.objects.create_user(
+            username='tech', email='tech@example.com', password='x', role='technician',
+            first_name='Rui', last_name='Costa'
+        )
+        self.receptionist = User.objects.create_user(
+            username='frontdesk', email='frontdesk@example.com', password='x', role='receptionist'
+        )
+        customer = Customer.objects.create(
+            first_name='Ana', last_name='Silva', phone='5550100', address_line1='1 Main St',
+            city='Springfield', state='IL', postal_code='62701'
+        )
+        vehicle = Vehicle.objects.create(
+            customer=customer, make='Toyota', model='Corolla', year=2018, vin='JTDBR32E720123456',
+            license_plate='ABC123', color='Blue'
+        )
+        self.job_order = JobOrder.objects.create(
+            customer=customer, vehicle=vehicle, service_type='Brakes', description='Replace pads',
+            customer_complaint='Squeaking', assigned_technician=self.technician, created_by=self.receptionist
+        )
+        JobOrderItem.objects.create(
+            job_order=self.job_order, item_type='labor', name='Brake pads', quantity=1, unit_price=Decimal('80.00')
+        )
+        started = timezone.now() - timedelta(days=200)
+        self.work_date = started.date()
+        TechnicianTime.objects.create(
+            job_order=self.job_order, technician=self.technician,
+            start_time=started, end_time=started + timedelta(hours=3), work_description='Pads'
+        )
+        self.invoice = Invoice.objects.create(
+            customer=customer, job_order=self.job_order, status='sent', subtotal=Decimal('80.00')
+        )
+        JobOrder.objects.filter(pk=self.job_order.pk).update(
+            status='delivered', actual_completion=started + timedelta(hours=4)
+        )
+
+    def detail(self, pk):
+        client = APIClient()
+        client.force_authenticate(self.receptionist)
+        response = client.get(f'/api/job-orders/{pk}/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_archive_keeps_daily_hours_and_invoice_link(self):
+        self.assertEqual(archive_batch(months=6, batch_size=10), 1)
+
+        self.assertFalse(JobOrder.objects.filter(pk=self.job_order.pk).exists())
+        self.assertFalse(TechnicianTime.objects.filter(job_order_id=self.job_order.pk).exists())
+        daily = TechnicianDailyHours.objects.get(technician=self.technician, work_date=self.work_date)
+        self.assertEqual((daily.hours_worked, daily.entry_count), (Decimal('3.00'), 1))
+
+        archived = ArchivedJobOrder.objects.get(original_id=self.job_order.pk)
+        self.invoice.refresh_from_db()
+        self.assertIsNone(self.invoice.job_order_id)
+        self.assertEqual(self.invoice.archived_job_order, archived)
+
+    def test_archived_detail_matches_live_schema(self):
+        live = self.detail(self.job_order.pk)
+        archive_batch(months=6, batch_size=10)
+        archived = self.detail(self.job_order.pk)
+
+        self.assertTrue(archived.pop('is_archived'))
+        archived.pop('archived_at')
+        self.assertEqual(archived.keys(), live.keys())
+        self.assertEqual(archived['customer'], live['customer'])
+        self.assertEqual(archived['assigned_technician_name'], 'Rui Costa')
+        for name in ['items', 'technician_times', 'status_history']:
+            # The snapshot stores timestamps to the millisecond, so compare the shape and ids.
+            self.assertEqual([(row.keys(), row['id']) for row in archived[name]],
+                             [(row.keys(), row['id']) for row in live[name]], name)
+        self.assertEqual(archived['technician_times'][0]['hours_worked'], '3.00')
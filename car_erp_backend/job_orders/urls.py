@@ -9,7 +9,11 @@ urlpatterns = [
     path('', views.JobOrderListView.as_view(), name='job_order_list'),
     path('<int:pk>/', views.JobOrderDetailView.as_view(), name='job_order_detail'),
     path('<int:pk>/update-status/', views.update_job_order_status, name='update_job_order_status'),
+    path('<int:pk>/dispatch/', views.recommend_technician, name='recommend_technician'),
     path('stats/', views.job_order_stats, name='job_order_stats'),
+    path('stats/cycle-times/', views.job_order_cycle_times, name='job_order_cycle_times'),
+    path('dispatch/', views.dispatch_job_orders, name='dispatch_job_orders'),
+    path('invoice/', views.invoice_job_orders, name='invoice_job_orders'),
     
     # Job Order Item endpoints
     path('items/', views.JobOrderItemListView.as_view(), name='job_order_item_list'),
@@ -18,8 +22,16 @@ urlpatterns = [
     # Technician Time endpoints
     path('technician-times/', views.TechnicianTimeListView.as_view(), name='technician_time_list'),
     path('technician-times/<int:pk>/', views.TechnicianTimeDetailView.as_view(), name='technician_time_detail'),
+    path('technician-times/clock-in/', views.clock_in, name='technician_clock_in'),
+    path('technician-times/clock-out/', views.clock_out, name='technician_clock_out'),
+    path('technician-times/daily/', views.TechnicianDailyHoursListView.as_view(), name='technician_daily_hours_list'),
     
     # Job Order Photo endpoints
     path('photos/', views.JobOrderPhotoListView.as_view(), name='job_order_photo_list'),
     path('photos/<int:pk>/', views.JobOrderPhotoDetailView.as_view(), name='job_order_photo_detail'),
+    
+    # Resumable photo upload endpoints
+    path('photos/uploads/', views.JobOrderPhotoUploadListView.as_view(), name='job_order_photo_upload_list'),
+    path('photos/uploads/<int:pk>/', views.job_order_photo_upload_chunk, name='job_order_photo_upload_chunk'),
+    path('photos/uploads/<int:pk>/finalize/', views.finalize_job_order_photo_upload, name='finalize_job_order_photo_upload'),
 ]
@@ -5,14 +5,44 @@ from rest_framework import generics, permissions, filters, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from decimal import Decimal, InvalidOperation
+import os
+import shutil
+import uuid
+from django.db import transaction, IntegrityError
 from django.db.models import Q
-from .models import JobOrder, JobOrderItem, TechnicianTime, JobOrderPhoto, JobOrderStatusHistory
+from django.http import Http404
+from django.utils import timezone
+from datetime import datetime, timedelta
+from .models import (
+    JobOrder, JobOrderItem, TechnicianTime, TechnicianDailyHours, JobOrderPhoto, JobOrderPhotoUpload,
+    JobOrderStatusHistory, ArchivedJobOrder, OPEN_TIMER_CONSTRAINT
+)
+from .archive import restore_job_order
+from .dispatch import Dispatcher, OPEN_STATUSES
+from .analytics import cycle_time_report
 from .serializers import (
     JobOrderSerializer, JobOrderDetailSerializer, JobOrderCreateSerializer,
-    JobOrderItemSerializer, TechnicianTimeSerializer, JobOrderPhotoSerializer,
-    JobOrderStatusHistorySerializer
+    JobOrderItemSerializer, TechnicianTimeSerializer, TechnicianDailyHoursSerializer,
+    JobOrderPhotoSerializer, JobOrderPhotoUploadSerializer, JobOrderStatusHistorySerializer
 )
 from authentication.models import User
+from accounting.models import Invoice
+from accounting.invoicing import create_invoices_for_job_orders
+
+# Bytes read from the request stream per write when receiving upload chunks.
+UPLOAD_READ_SIZE = 64 * 1024
+
+
+def _violated_constraint(error):
+    """Name of the constraint an IntegrityError violated, when the database driver reports it."""
+    diag = getattr(error.__cause__, 'diag', None)
+    return getattr(diag, 'constraint_name', None)
+
+
+def _is_truthy(value):
+    """Interpret a request flag that may arrive as a bool or a string."""
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
 
 
 class JobOrderListView(generics.ListCreateAPIView):
@@ -40,8 +70,14 @@ class JobOrderListView(generics.ListCreateAPIView):
         return JobOrderSerializer
     
     def perform_create(self, serializer):
-        """Set the created_by field."""
-        serializer.save(created_by=self.request.user)
+        """Set the created_by field and optionally auto-assign a technician."""
+        job_order = serializer.save(created_by=self.request.user)
+        
+        if not job_order.assigned_technician_id and _is_truthy(self.request.data.get('auto_assign')):
+            assignments = Dispatcher().plan([job_order])
+            if assignments:
+                job_order.assigned_technician_id = assignments[0]['technician']
+                job_order.save(update_fields=['assigned_technician', 'updated_at'])
 
 
 class JobOrderDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -63,6 +99,19 @@ class JobOrderDetailView(generics.RetrieveUpdateDestroyAPIView):
             return JobOrder.objects.all()
         return JobOrder.objects.none()
     
+    def retrieve(self, request, *args, **kwargs):
+        """Fall back to the archive for job orders moved out of the hot tables."""
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            if not request.user.can_access_workshop():
+                raise
+            archived = ArchivedJobOrder.objects.filter(original_id=kwargs['pk']).first()
+            if archived is None:
+                raise
+            serializer = JobOrderDetailSerializer(restore_job_order(archived), context=self.get_serializer_context())
+            return Response({**serializer.data, 'is_archived': True, 'archived_at': archived.archived_at})
+    
     def perform_update(self, serializer):
         """Track status changes."""
         instance = self.get_object()
@@ -78,6 +127,7 @@ class JobOrderDetailView(generics.RetrieveUpdateDestroyAPIView):
                 job_order=updated_instance,
                 old_status=old_status,
                 new_status=new_status,
+                assigned_technician_id=updated_instance.assigned_technician_id,
                 changed_by=self.request.user
             )
 
@@ -152,6 +202,119 @@ class TechnicianTimeDetailView(generics.RetrieveUpdateDestroyAPIView):
         return TechnicianTime.objects.none()
 
 
+class TechnicianDailyHoursListView(generics.ListAPIView):
+    """
+    List daily hour totals per technician.
+    """
+    queryset = TechnicianDailyHours.objects.all()
+    serializer_class = TechnicianDailyHoursSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = {
+        'technician': ['exact'],
+        'work_date': ['exact', 'gte', 'lte'],
+    }
+    ordering_fields = ['work_date', 'hours_worked']
+    ordering = ['-work_date']
+    
+    def get_queryset(self):
+        """Filter daily hours based on user permissions."""
+        user = self.request.user
+        if user.can_access_workshop():
+            return TechnicianDailyHours.objects.select_related('technician')
+        return TechnicianDailyHours.objects.none()
+
+
+def _clock_technician(request):
+    """
+    Technician a clock request applies to, as a (technician_id, error_response) pair.
+    
+    Technicians clock themselves; anyone else must name an existing technician
+    in `technician`.
+    """
+    if request.user.is_technician():
+        return request.user.id, None
+    try:
+        technician_id = int(request.data.get('technician'))
+    except (TypeError, ValueError):
+        return None, Response({'error': 'technician must be a technician id'}, status=status.HTTP_400_BAD_REQUEST)
+    if not User.objects.filter(pk=technician_id, role='technician').exists():
+        return None, Response({'error': 'Technician not found'}, status=status.HTTP_400_BAD_REQUEST)
+    return technician_id, None
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def clock_in(request):
+    """
+    Start a time entry on a job order for a technician.
+    """
+    user = request.user
+    if not user.can_access_workshop():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    job_order_id = request.data.get('job_order')
+    if not job_order_id:
+        return Response({'error': 'job_order is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        job_order_id = int(job_order_id)
+    except (TypeError, ValueError):
+        return Response({'error': 'job_order must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    if not JobOrder.objects.filter(pk=job_order_id).exists():
+        return Response({'error': 'Job order not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    technician_id, error = _clock_technician(request)
+    if error is not None:
+        return error
+    try:
+        with transaction.atomic():
+            entry = TechnicianTime.objects.create(
+                job_order_id=job_order_id,
+                technician_id=technician_id,
+                start_time=timezone.now(),
+                work_description=request.data.get('work_description', ''),
+            )
+    except IntegrityError as e:
+        open_entry = TechnicianTime.objects.filter(technician_id=technician_id, end_time__isnull=True).first()
+        if _violated_constraint(e) not in (OPEN_TIMER_CONSTRAINT, None) or open_entry is None:
+            raise
+        return Response({
+            'error': 'Technician already has an open timer',
+            'time_entry': TechnicianTimeSerializer(open_entry).data if open_entry else None,
+        }, status=status.HTTP_409_CONFLICT)
+    
+    return Response(TechnicianTimeSerializer(entry).data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def clock_out(request):
+    """
+    Close a technician's open time entry and roll its hours into the daily total.
+    """
+    user = request.user
+    if not user.can_access_workshop():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    technician_id, error = _clock_technician(request)
+    if error is not None:
+        return error
+    with transaction.atomic():
+        entry = TechnicianTime.objects.select_for_update().filter(
+            technician_id=technician_id, end_time__isnull=True
+        ).first()
+        if entry is None:
+            return Response({'error': 'No open timer for technician'}, status=status.HTTP_404_NOT_FOUND)
+        
+        entry.end_time = timezone.now()
+        for field in ['work_description', 'parts_used', 'notes']:
+            if field in request.data:
+                setattr(entry, field, request.data[field])
+        entry.save()
+    
+    return Response(TechnicianTimeSerializer(entry).data)
+
+
 class JobOrderPhotoListView(generics.ListCreateAPIView):
     """
     List all job order photos or create a new photo.
@@ -190,6 +353,160 @@ class JobOrderPhotoDetailView(generics.RetrieveUpdateDestroyAPIView):
         return JobOrderPhoto.objects.none()
 
 
+class JobOrderPhotoUploadListView(generics.ListCreateAPIView):
+    """
+    List photo upload sessions or start a new resumable upload.
+    """
+    queryset = JobOrderPhotoUpload.objects.all()
+    serializer_class = JobOrderPhotoUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['job_order', 'status']
+    
+    def get_queryset(self):
+        """Filter uploads based on user permissions."""
+        user = self.request.user
+        if user.can_access_workshop():
+            return JobOrderPhotoUpload.objects.all()
+        return JobOrderPhotoUpload.objects.none()
+    
+    def perform_create(self, serializer):
+        """Set the uploaded_by field and create the empty partial file."""
+        upload = serializer.save(uploaded_by=self.request.user)
+        os.makedirs(os.path.dirname(upload.temp_path), exist_ok=True)
+        open(upload.temp_path, 'wb').close()
+
+
+@api_view(['GET', 'PUT'])
+@permission_classes([permissions.IsAuthenticated])
+def job_order_photo_upload_chunk(request, pk):
+    """
+    Report upload progress, or write the request body at `Upload-Offset`.
+    
+    The body is streamed into a spool file next to the partial file without
+    holding any lock, so a slow client does not keep a transaction open. The
+    upload row is then locked only to re-check the offset, append the spool
+    to the partial file and advance `received_bytes`. A chunk cut off
+    mid-transfer keeps the bytes that arrived, so the client resumes from
+    the returned `received_bytes`.
+    """
+    user = request.user
+    if not user.can_access_workshop():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        upload = JobOrderPhotoUpload.objects.get(pk=pk)
+    except JobOrderPhotoUpload.DoesNotExist:
+        return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if request.method == 'GET':
+        return Response(JobOrderPhotoUploadSerializer(upload).data)
+    
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+    except ValueError:
+        return Response({'error': 'Upload-Offset header is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    conflict = _upload_conflict(upload, offset)
+    if conflict:
+        return conflict
+    
+    remaining = upload.total_size - offset
+    written = 0
+    stream = request.stream
+    spool_path = f"{upload.temp_path}.{uuid.uuid4().hex}"
+    try:
+        try:
+            with open(spool_path, 'wb') as spool:
+                while stream is not None:
+                    try:
+                        data = stream.read(UPLOAD_READ_SIZE)
+                    except OSError:
+                        break
+                    if not data:
+                        break
+                    if written + len(data) > remaining:
+                        return Response(
+                            {'error': 'Chunk exceeds declared total_size', 'received_bytes': upload.received_bytes},
+                            status=status.HTTP_400_BAD_REQUEST
+                        )
+                    spool.write(data)
+                    written += len(data)
+        except FileNotFoundError:
+            return _partial_file_missing(pk)
+        
+        with transaction.atomic():
+            upload = JobOrderPhotoUpload.objects.select_for_update().get(pk=pk)
+            conflict = _upload_conflict(upload, offset)
+            if conflict:
+                return conflict
+            try:
+                with open(upload.temp_path, 'r+b') as part, open(spool_path, 'rb') as spool:
+                    part.seek(offset)
+                    shutil.copyfileobj(spool, part, UPLOAD_READ_SIZE)
+            except FileNotFoundError:
+                return _partial_file_missing(pk)
+            
+            upload.received_bytes = offset + written
+            upload.save(update_fields=['received_bytes', 'updated_at'])
+    finally:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+    
+    return Response(JobOrderPhotoUploadSerializer(upload).data)
+
+
+def _upload_conflict(upload, offset):
+    """409 response if the upload cannot take a chunk at `offset`, else None."""
+    if upload.status != 'uploading':
+        return Response({'error': f'Upload is {upload.status}'}, status=status.HTTP_409_CONFLICT)
+    if offset != upload.received_bytes:
+        return Response(
+            {'error': 'Offset mismatch', 'received_bytes': upload.received_bytes},
+            status=status.HTTP_409_CONFLICT
+        )
+    return None
+
+
+def _partial_file_missing(pk):
+    """Mark an upload whose partial file is gone as failed."""
+    error = 'Partial file is missing'
+    JobOrderPhotoUpload.objects.filter(pk=pk, status='uploading').update(
+        status='failed', error=error, updated_at=timezone.now()
+    )
+    return Response({'error': error}, status=status.HTTP_410_GONE)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def finalize_job_order_photo_upload(request, pk):
+    """
+    Queue a fully received upload for background processing.
+    """
+    user = request.user
+    if not user.can_access_workshop():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    with transaction.atomic():
+        try:
+            upload = JobOrderPhotoUpload.objects.select_for_update().get(pk=pk)
+        except JobOrderPhotoUpload.DoesNotExist:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if upload.status != 'uploading':
+            return Response({'error': f'Upload is {upload.status}'}, status=status.HTTP_409_CONFLICT)
+        if upload.received_bytes != upload.total_size:
+            return Response(
+                {'error': 'Upload is incomplete', 'received_bytes': upload.received_bytes},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        upload.status = 'queued'
+        upload.save(update_fields=['status', 'updated_at'])
+    
+    return Response(JobOrderPhotoUploadSerializer(upload).data, status=status.HTTP_202_ACCEPTED)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def job_order_stats(request):
@@ -217,6 +534,40 @@ def job_order_stats(request):
     })
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def job_order_cycle_times(request):
+    """
+    Get time-in-status distributions (p50/p90) for a date range.
+    """
+    user = request.user
+    if not user.can_access_workshop():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        start_date = request.GET.get('start_date')
+        if start_date:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+        else:
+            start_date = timezone.now().date() - timedelta(days=30)
+        
+        end_date = request.GET.get('end_date')
+        if end_date:
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+        else:
+            end_date = timezone.now().date()
+    except ValueError:
+        return Response({'error': 'Dates must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'period': {
+            'start_date': start_date,
+            'end_date': end_date,
+        },
+        **cycle_time_report(start_date, end_date),
+    })
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def update_job_order_status(request, pk):
@@ -248,6 +599,7 @@ def update_job_order_status(request, pk):
         old_status=old_status,
         new_status=new_status,
         notes=notes,
+        assigned_technician_id=job_order.assigned_technician_id,
         changed_by=user
     )
     
@@ -255,3 +607,124 @@ def update_job_order_status(request, pk):
         'message': 'Status updated successfully',
         'job_order': JobOrderSerializer(job_order).data
     })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def recommend_technician(request, pk):
+    """
+    Recommend the least loaded technicians for a job order.
+    """
+    try:
+        job_order = JobOrder.objects.get(pk=pk)
+    except JobOrder.DoesNotExist:
+        return Response({'error': 'Job order not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    user = request.user
+    if not user.can_access_workshop():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        limit = int(request.GET.get('limit', 5))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'job_order': job_order.id,
+        'recommendations': Dispatcher().recommend(job_order, limit=limit),
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def dispatch_job_orders(request):
+    """
+    Assign technicians to open job orders, balancing workload across the shop.
+    
+    Accepts an optional list of `job_ids` (defaults to every unassigned open job)
+    and a `dry_run` flag that returns the plan without saving it.
+    """
+    user = request.user
+    if not user.can_access_workshop():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    job_orders = JobOrder.objects.filter(status__in=OPEN_STATUSES, assigned_technician__isnull=True)
+    job_ids = request.data.get('job_ids')
+    if job_ids is not None:
+        if not isinstance(job_ids, list):
+            return Response({'error': 'job_ids must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            job_ids = [int(pk) for pk in job_ids]
+        except (TypeError, ValueError):
+            return Response({'error': 'job_ids must be a list of integers'}, status=status.HTTP_400_BAD_REQUEST)
+        job_orders = job_orders.filter(pk__in=job_ids)
+    job_orders = list(job_orders.only('id', 'job_number', 'service_type'))
+    
+    assignments = Dispatcher().plan(job_orders)
+    
+    if assignments and not _is_truthy(request.data.get('dry_run')):
+        technician_by_job = {assignment['job_order']: assignment['technician'] for assignment in assignments}
+        with transaction.atomic():
+            # Skip jobs another request assigned (or moved on) since they were planned.
+            still_open = set(
+                JobOrder.objects.select_for_update().filter(
+                    pk__in=list(technician_by_job), status__in=OPEN_STATUSES, assigned_technician__isnull=True
+                ).values_list('id', flat=True)
+            )
+            job_orders = [job_order for job_order in job_orders if job_order.id in still_open]
+            assignments = [assignment for assignment in assignments if assignment['job_order'] in still_open]
+            now = timezone.now()
+            for job_order in job_orders:
+                job_order.assigned_technician_id = technician_by_job[job_order.id]
+                job_order.updated_at = now
+            JobOrder.objects.bulk_update(job_orders, ['assigned_technician', 'updated_at'])
+    
+    return Response({
+        'assigned_count': len(assignments),
+        'assignments': assignments,
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def invoice_job_orders(request):
+    """
+    Convert delivered job orders into invoices in one batch.
+    """
+    user = request.user
+    if not user.can_access_accounting():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    job_ids = request.data.get('job_ids')
+    if not job_ids or not isinstance(job_ids, list):
+        return Response({'error': 'job_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        tax_rate = Decimal(str(request.data.get('tax_rate', '0')))
+    except InvalidOperation:
+        return Response({'error': 'Invalid tax_rate'}, status=status.HTTP_400_BAD_REQUEST)
+    if not tax_rate.is_finite() or not 0 <= tax_rate <= 100:
+        return Response({'error': 'tax_rate must be between 0 and 100'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    payment_terms = request.data.get('payment_terms', 'due_on_receipt')
+    if payment_terms not in Invoice.PAYMENT_TERMS_DAYS:
+        return Response({'error': 'Invalid payment_terms'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    invoices, skipped = create_invoices_for_job_orders(job_ids, user, tax_rate=tax_rate, payment_terms=payment_terms)
+    
+    return Response({
+        'created_count': len(invoices),
+        'invoices': [
+            {
+                'id': invoice.id,
+                'invoice_number': invoice.invoice_number,
+                'job_order': invoice.job_order_id,
+                'customer': invoice.customer_id,
+                'subtotal': invoice.subtotal,
+                'tax_amount': invoice.tax_amount,
+                'total_amount': invoice.total_amount,
+            }
+            for invoice in invoices
+        ],
+        'skipped': skipped,
+    }, status=status.HTTP_201_CREATED if invoices else status.HTTP_200_OK)
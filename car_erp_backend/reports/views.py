@@ -5,6 +5,8 @@ from rest_framework import generics, permissions, filters, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.db.models import Q, Sum, Count, Avg
 from django.utils import timezone
 from datetime import datetime, timedelta
@@ -16,6 +18,8 @@ from vehicles.models import Vehicle
 from job_orders.models import JobOrder
 from inventory.models import Part
 from accounting.models import Invoice, Payment
+from accounting.documents import report_payload
+from accounting.pdf import render as render_pdf
 
 
 class ReportListView(generics.ListCreateAPIView):
@@ -319,6 +323,10 @@ def generate_report(request):
         else:
             data = dashboard_stats(request).data
         
+        if format_type == 'pdf':
+            content = render_pdf('report', report_payload(report.name, report.created_at, data))
+            report.file_path = default_storage.save(f'reports/report-{report.pk}.pdf', ContentFile(content))
+        
         # Update report status
         report.is_generated = True
         report.generation_status = 'completed'
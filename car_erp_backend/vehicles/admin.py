@@ -2,7 +2,9 @@
 Admin configuration for vehicles app.
 """
 from django.contrib import admin
-from .models import Vehicle, VehicleDocument, VehiclePhoto, VehicleHistory
+from .models import (
+    Vehicle, VehicleDocument, VehiclePhoto, VehicleHistory, ServiceReminder, ScanWatermark, ExpiryNotification
+)
 
 
 @admin.register(Vehicle)
@@ -14,12 +16,12 @@ class VehicleAdmin(admin.ModelAdmin):
     list_filter = ['make', 'model', 'year', 'fuel_type', 'is_active', 'created_at']
     search_fields = ['make', 'model', 'license_plate', 'vin', 'customer__first_name', 'customer__last_name']
     list_editable = ['is_active']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['plate_normalized', 'created_at', 'updated_at']
     raw_id_fields = ['customer', 'created_by']
     
     fieldsets = (
         ('Vehicle Information', {
-            'fields': ('make', 'model', 'year', 'vin', 'license_plate', 'color')
+            'fields': ('make', 'model', 'year', 'vin', 'license_plate', 'plate_normalized', 'color')
         }),
         ('Specifications', {
             'fields': ('engine_size', 'fuel_type', 'transmission', 'mileage', 'engine_number')
@@ -72,3 +74,37 @@ class VehicleHistoryAdmin(admin.ModelAdmin):
     raw_id_fields = ['vehicle', 'created_by']
     readonly_fields = ['created_at']
     date_hierarchy = 'service_date'
+
+
+@admin.register(ServiceReminder)
+class ServiceReminderAdmin(admin.ModelAdmin):
+    """
+    Service Reminder admin interface.
+    """
+    list_display = ['vehicle', 'customer', 'due_date', 'due_mileage', 'daily_miles', 'reason', 'status']
+    list_filter = ['status', 'reason', 'due_date']
+    search_fields = ['vehicle__license_plate', 'customer__first_name', 'customer__last_name']
+    raw_id_fields = ['vehicle', 'customer']
+    readonly_fields = ['created_at', 'updated_at']
+    date_hierarchy = 'due_date'
+
+
+@admin.register(ScanWatermark)
+class ScanWatermarkAdmin(admin.ModelAdmin):
+    """
+    Scan Watermark admin interface.
+    """
+    list_display = ['name', 'scanned_through', 'updated_at']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(ExpiryNotification)
+class ExpiryNotificationAdmin(admin.ModelAdmin):
+    """
+    Expiry Notification admin interface.
+    """
+    list_display = ['customer', 'first_expiry', 'window_start', 'window_end', 'status', 'created_at']
+    list_filter = ['status', 'first_expiry']
+    search_fields = ['customer__first_name', 'customer__last_name']
+    raw_id_fields = ['customer']
+    readonly_fields = ['created_at', 'updated_at']
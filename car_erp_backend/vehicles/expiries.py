@@ -0,0 +1,132 @@
+"""
+Insurance and document expiry scanning for Car ERP System.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from .models import Vehicle, VehicleDocument, ScanWatermark, ExpiryNotification
+
+WATERMARK_NAME = 'vehicle_expiries'
+
+
+def expiring_items(start, end, changed_since=None):
+    """
+    Insurance policies and documents expiring after `start` up to and including `end`, per customer.
+
+    Both lookups are range scans on the indexed expiry columns. With
+    `changed_since` only rows created or edited after that moment are
+    returned.
+    """
+    by_customer = defaultdict(list)
+    vehicles = Vehicle.objects.filter(insurance_expiry__gt=start, insurance_expiry__lte=end, is_active=True)
+    documents = VehicleDocument.objects.filter(expiry_date__gt=start, expiry_date__lte=end, vehicle__is_active=True)
+    if changed_since is not None:
+        vehicles = vehicles.filter(updated_at__gt=changed_since)
+        documents = documents.filter(updated_at__gt=changed_since)
+
+    vehicles = vehicles.values('id', 'customer_id', 'year', 'make', 'model', 'license_plate', 'insurance_expiry')
+    for vehicle in vehicles:
+        by_customer[vehicle['customer_id']].append({
+            'kind': 'insurance',
+            'vehicle': vehicle['id'],
+            'description': f"{vehicle['year']} {vehicle['make']} {vehicle['model']} ({vehicle['license_plate']}) insurance",
+            'expiry_date': vehicle['insurance_expiry'].isoformat(),
+        })
+
+    documents = documents.values('id', 'vehicle_id', 'vehicle__customer_id', 'vehicle__license_plate', 'title', 'document_type', 'expiry_date')
+    for document in documents:
+        by_customer[document['vehicle__customer_id']].append({
+            'kind': document['document_type'],
+            'vehicle': document['vehicle_id'],
+            'document': document['id'],
+            'description': f"{document['title']} ({document['vehicle__license_plate']})",
+            'expiry_date': document['expiry_date'].isoformat(),
+        })
+    return by_customer
+
+
+def item_key(item):
+    return item['kind'], item['vehicle'], item.get('document'), item['expiry_date']
+
+
+def late_expiring_items(start, end, changed_since):
+    """
+    Expiries in an already-scanned range that were entered or edited since the last run.
+
+    Items already listed on one of the customer's current notifications
+    are dropped, so editing an unrelated field does not repeat a notice.
+    """
+    by_customer = expiring_items(start, end, changed_since)
+    notified = defaultdict(set)
+    existing = ExpiryNotification.objects.filter(
+        customer_id__in=list(by_customer), window_end__gt=start
+    ).values_list('customer_id', 'items')
+    for customer_id, items in existing:
+        notified[customer_id].update(item_key(item) for item in items)
+    late = {}
+    for customer_id, items in by_customer.items():
+        items = [item for item in items if item_key(item) not in notified[customer_id]]
+        if items:
+            late[customer_id] = items
+    return late
+
+
+def scan_expiries(lead_days, window_days=7):
+    """
+    Enqueue one notification per customer for expiries entering the lead window.
+
+    Each run covers only the dates between the stored watermark and
+    today + `lead_days`, queried in ranges of at most `window_days` so a
+    long backlog never becomes one unbounded scan. The items found are
+    merged per customer and saved with the advanced watermark in one
+    transaction.
+
+    Expiries dated inside the range already covered (from today up to the
+    watermark) that were created or edited since the previous run are
+    picked up as well, and go out with the same run's notifications.
+
+    Returns (date ranges scanned, notifications created).
+    """
+    started = timezone.now()
+    today = timezone.localdate()
+    target = today + timedelta(days=lead_days)
+    with transaction.atomic():
+        watermark, _ = ScanWatermark.objects.select_for_update().get_or_create(
+            name=WATERMARK_NAME, defaults={'scanned_through': today - timedelta(days=1)}
+        )
+
+        by_customer = defaultdict(list)
+        window_start = {}
+        if watermark.scanned_through >= today:
+            late = late_expiring_items(today - timedelta(days=1), watermark.scanned_through, watermark.updated_at)
+            for customer_id, items in late.items():
+                by_customer[customer_id].extend(items)
+                window_start[customer_id] = today
+
+        windows = 0
+        start = watermark.scanned_through
+        while start < target:
+            end = min(start + timedelta(days=window_days), target)
+            for customer_id, items in expiring_items(start, end).items():
+                by_customer[customer_id].extend(items)
+            start = end
+            windows += 1
+
+        notifications = []
+        for customer_id, items in by_customer.items():
+            items.sort(key=lambda item: item['expiry_date'])
+            notifications.append(ExpiryNotification(
+                customer_id=customer_id,
+                window_start=window_start.get(customer_id, watermark.scanned_through + timedelta(days=1)),
+                window_end=max(target, watermark.scanned_through),
+                first_expiry=items[0]['expiry_date'],
+                items=items,
+            ))
+        ExpiryNotification.objects.bulk_create(notifications, batch_size=1000)
+
+        # The run's start time, not its end, so rows edited while it ran are seen next time.
+        ScanWatermark.objects.filter(pk=watermark.pk).update(
+            scanned_through=max(target, watermark.scanned_through), updated_at=started
+        )
+    return windows, len(notifications)
@@ -0,0 +1,26 @@
+"""
+Management command to queue reminders for vehicles coming due for service.
+"""
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from vehicles.reminders import generate_service_reminders
+
+
+class Command(BaseCommand):
+    help = 'Predict next service dates from mileage history and queue due reminders (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lookahead-days', type=int, default=settings.SERVICE_REMINDER_LOOKAHEAD_DAYS,
+            help='Queue reminders for services due within this many days'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Reminders per INSERT')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        scanned, queued = generate_service_reminders(options['lookahead_days'], batch_size=options['batch_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Scanned {scanned} vehicle(s) in {elapsed:.1f}s; {queued} new reminder(s) due within {options["lookahead_days"]} day(s)'
+        ))
@@ -0,0 +1,33 @@
+"""
+Management command to backfill normalized VINs and plate lookup columns.
+"""
+from django.core.management.base import BaseCommand
+from vehicles.models import Vehicle
+
+NORMALIZED_FIELDS = ['vin', 'plate_normalized']
+
+
+class Command(BaseCommand):
+    help = 'Uppercase VINs and recompute the normalized license plate column'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Vehicles updated per query')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        batch = []
+        total = 0
+        vehicles = Vehicle.objects.only('id', 'license_plate', *NORMALIZED_FIELDS)
+        for vehicle in vehicles.order_by('id').iterator(chunk_size=batch_size):
+            current = [getattr(vehicle, field) for field in NORMALIZED_FIELDS]
+            vehicle.normalize_identifiers()
+            if current != [getattr(vehicle, field) for field in NORMALIZED_FIELDS]:
+                batch.append(vehicle)
+            if len(batch) >= batch_size:
+                Vehicle.objects.bulk_update(batch, NORMALIZED_FIELDS)
+                total += len(batch)
+                batch = []
+        if batch:
+            Vehicle.objects.bulk_update(batch, NORMALIZED_FIELDS)
+            total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'Normalized {total} vehicle(s)'))
@@ -0,0 +1,23 @@
+"""
+Management command to queue notifications for upcoming insurance and document expiries.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from vehicles.expiries import scan_expiries
+
+
+class Command(BaseCommand):
+    help = 'Scan newly entered expiry dates and queue one notification per customer (run daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lead-days', type=int, default=settings.EXPIRY_NOTICE_DAYS,
+            help='Notify this many days before an expiry'
+        )
+        parser.add_argument('--window-days', type=int, default=7, help='Largest date range scanned per query')
+
+    def handle(self, *args, **options):
+        windows, notifications = scan_expiries(options['lead_days'], options['window_days'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Scanned {windows} window(s), queued {notifications} notification(s)'
+        ))
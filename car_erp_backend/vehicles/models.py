@@ -34,6 +34,7 @@ class Vehicle(models.Model):
     year = models.IntegerField()
     vin = models.CharField(max_length=17, unique=True, verbose_name='VIN/Chassis Number')
     license_plate = models.CharField(max_length=20, unique=True)
+    plate_normalized = models.CharField(max_length=20, blank=True, default='', db_index=True, editable=False)
     color = models.CharField(max_length=50)
     
     # Vehicle Specifications
@@ -46,7 +47,7 @@ class Vehicle(models.Model):
     # Ownership Information
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='vehicles')
     registration_date = models.DateField(blank=True, null=True)
-    insurance_expiry = models.DateField(blank=True, null=True)
+    insurance_expiry = models.DateField(blank=True, null=True, db_index=True)
     
     # Additional Information
     notes = models.TextField(blank=True, null=True)
@@ -67,6 +68,16 @@ class Vehicle(models.Model):
     def __str__(self):
         return f"{self.year} {self.make} {self.model} - {self.license_plate}"
     
+    def save(self, *args, **kwargs):
+        """Normalize the VIN and the plate lookup column."""
+        self.normalize_identifiers()
+        super().save(*args, **kwargs)
+    
+    def normalize_identifiers(self):
+        from .vin import normalize_vin, normalize_plate
+        self.vin = normalize_vin(self.vin)
+        self.plate_normalized = normalize_plate(self.license_plate)
+    
     @property
     def full_description(self):
         return f"{self.year} {self.make} {self.model} ({self.license_plate})"
@@ -90,8 +101,9 @@ class VehicleDocument(models.Model):
     title = models.CharField(max_length=200)
     file = models.FileField(upload_to='vehicle_documents/')
     description = models.TextField(blank=True, null=True)
-    expiry_date = models.DateField(blank=True, null=True)
+    expiry_date = models.DateField(blank=True, null=True, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     
     class Meta:
@@ -160,7 +172,107 @@ class VehicleHistory(models.Model):
         verbose_name = 'Vehicle History'
         verbose_name_plural = 'Vehicle History'
         ordering = ['-service_date']
+        indexes = [
+            models.Index(fields=['vehicle', 'service_date']),
+        ]
     
     def __str__(self):
         return f"{self.vehicle.full_description} - {self.service_type} ({self.service_date.strftime('%Y-%m-%d')})"
 
+
+
+class ServiceReminder(models.Model):
+    """
+    Predicted upcoming service for a vehicle, queued for follow-up.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('booked', 'Booked'),
+        ('dismissed', 'Dismissed'),
+    ]
+    
+    REASON_CHOICES = [
+        ('mileage', 'Mileage Interval'),
+        ('time', 'Time Interval'),
+    ]
+    
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='service_reminders')
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='service_reminders')
+    last_service_date = models.DateField()
+    due_date = models.DateField()
+    due_mileage = models.IntegerField()
+    daily_miles = models.FloatField(blank=True, null=True, help_text='Fitted miles driven per day')
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'vehicle_service_reminders'
+        verbose_name = 'Service Reminder'
+        verbose_name_plural = 'Service Reminders'
+        ordering = ['due_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['vehicle', 'last_service_date'], name='one_reminder_per_vehicle_service'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'due_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.vehicle.full_description} - due {self.due_date}"
+
+
+class ScanWatermark(models.Model):
+    """
+    Last date a scheduled scanner has covered, so each run starts where the previous one stopped.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    scanned_through = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'scan_watermarks'
+        verbose_name = 'Scan Watermark'
+        verbose_name_plural = 'Scan Watermarks'
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} through {self.scanned_through}"
+
+
+class ExpiryNotification(models.Model):
+    """
+    Consolidated notice of a customer's insurance and document expiries in one scan window.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('dismissed', 'Dismissed'),
+    ]
+    
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='expiry_notifications')
+    window_start = models.DateField()
+    window_end = models.DateField()
+    first_expiry = models.DateField()
+    items = models.JSONField(help_text='Expiring insurance policies and documents')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'vehicle_expiry_notifications'
+        verbose_name = 'Expiry Notification'
+        verbose_name_plural = 'Expiry Notifications'
+        ordering = ['first_expiry']
+        indexes = [
+            models.Index(fields=['status', 'first_expiry']),
+        ]
+    
+    def __str__(self):
+        return f"{self.customer} - {len(self.items)} expiring item(s)"
@@ -0,0 +1,141 @@
+"""
+Mileage-based service reminders for Car ERP System.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from .models import VehicleHistory, ServiceReminder
+
+
+class MileageFit:
+    """
+    Running least-squares fit of odometer readings against time.
+
+    Readings are added one at a time, so a vehicle's rate is known as soon
+    as its last reading has streamed past, without keeping its history.
+    """
+
+    def __init__(self):
+        self.origin = None
+        self.count = 0
+        self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = 0.0
+        self.last_date = None
+        self.last_mileage = None
+
+    def add(self, when, mileage):
+        if self.origin is None:
+            self.origin = when
+        x = (when - self.origin).total_seconds() / 86400
+        self.count += 1
+        self.sum_x += x
+        self.sum_y += mileage
+        self.sum_xx += x * x
+        self.sum_xy += x * mileage
+        if self.last_date is None or when >= self.last_date:
+            self.last_date, self.last_mileage = when, mileage
+
+    def daily_rate(self):
+        """Fitted miles per day, or None with fewer than two distinct dates."""
+        denominator = self.count * self.sum_xx - self.sum_x ** 2
+        if self.count < 2 or denominator <= 1e-9:
+            return None
+        return (self.count * self.sum_xy - self.sum_x * self.sum_y) / denominator
+
+
+def fit_mileage_rates():
+    """
+    Yield (vehicle_id, customer_id, last service, MileageFit) per active vehicle with history.
+
+    One query streams all service records ordered by vehicle; the vehicle's
+    current odometer is added as the latest reading when it is ahead of the
+    last service.
+    """
+    rows = VehicleHistory.objects.filter(vehicle__is_active=True).order_by('vehicle_id', 'service_date').values_list(
+        'vehicle_id', 'vehicle__customer_id', 'service_date', 'mileage_at_service',
+        'vehicle__mileage', 'vehicle__updated_at',
+    )
+
+    current = None
+    for vehicle_id, customer_id, service_date, mileage, odometer, odometer_date in rows.iterator(chunk_size=10000):
+        if current is None or current[0] != vehicle_id:
+            if current is not None:
+                yield finish(*current)
+            current = [vehicle_id, customer_id, None, MileageFit(), (odometer_date, odometer)]
+        current[2] = (service_date, mileage)
+        current[3].add(service_date, mileage)
+    if current is not None:
+        yield finish(*current)
+
+
+def finish(vehicle_id, customer_id, last_service, fit, odometer):
+    """Add the current odometer reading when it is newer than the last service."""
+    odometer_date, odometer_mileage = odometer
+    if odometer_mileage > fit.last_mileage and odometer_date > fit.last_date:
+        fit.add(odometer_date, odometer_mileage)
+    return vehicle_id, customer_id, last_service, fit
+
+
+def predict_due(last_service, fit, interval_miles, interval_days):
+    """
+    Due date, due mileage, fitted daily miles and reason for the next service.
+
+    The service falls due at the earlier of the time and mileage limits;
+    the mileage limit is projected forward from the latest reading at the
+    fitted daily rate.
+    """
+    service_date, service_mileage = last_service
+    due_mileage = service_mileage + interval_miles
+    due_date = service_date + timedelta(days=interval_days)
+    reason = 'time'
+    rate = fit.daily_rate()
+    if rate and rate > 0:
+        mileage_due_date = fit.last_date + timedelta(days=(due_mileage - fit.last_mileage) / rate)
+        if mileage_due_date < due_date:
+            due_date, reason = mileage_due_date, 'mileage'
+    return timezone.localdate(due_date), due_mileage, rate, reason
+
+
+def generate_service_reminders(lookahead_days=None, batch_size=1000):
+    """
+    Queue a reminder for every vehicle due for service within the lookahead.
+
+    A vehicle gets one reminder per last service, whatever became of it, so
+    a sent or dismissed reminder is not queued again the next night; the
+    (vehicle, last_service_date) unique constraint skips those rows. A new
+    reminder dismisses any still-pending one left from an earlier service.
+    Returns (vehicles scanned, reminders inserted).
+    """
+    if lookahead_days is None:
+        lookahead_days = settings.SERVICE_REMINDER_LOOKAHEAD_DAYS
+    horizon = timezone.localdate() + timedelta(days=lookahead_days)
+    interval_miles = settings.SERVICE_INTERVAL_MILES
+    interval_days = settings.SERVICE_INTERVAL_DAYS
+
+    scanned = 0
+    due = []
+    for vehicle_id, customer_id, last_service, fit in fit_mileage_rates():
+        scanned += 1
+        due_date, due_mileage, rate, reason = predict_due(last_service, fit, interval_miles, interval_days)
+        if due_date <= horizon:
+            due.append(ServiceReminder(
+                vehicle_id=vehicle_id,
+                customer_id=customer_id,
+                last_service_date=timezone.localdate(last_service[0]),
+                due_date=due_date,
+                due_mileage=due_mileage,
+                daily_miles=round(rate, 2) if rate else None,
+                reason=reason,
+            ))
+    started = timezone.now()
+    with transaction.atomic():
+        ServiceReminder.objects.bulk_create(due, batch_size=batch_size, ignore_conflicts=True)
+        inserted = ServiceReminder.objects.filter(created_at__gte=started).count()
+        newer = ServiceReminder.objects.filter(
+            vehicle_id=OuterRef('vehicle_id'), last_service_date__gt=OuterRef('last_service_date')
+        )
+        ServiceReminder.objects.filter(status='pending').filter(Exists(newer)).update(
+            status='dismissed', updated_at=timezone.now()
+        )
+    return scanned, inserted
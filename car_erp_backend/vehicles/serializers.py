@@ -2,7 +2,8 @@
 Vehicle serializers for Car ERP System.
 """
 from rest_framework import serializers
-from .models import Vehicle, VehicleDocument, VehiclePhoto, VehicleHistory
+from .models import Vehicle, VehicleDocument, VehiclePhoto, VehicleHistory, ServiceReminder, ExpiryNotification
+from .vin import decode_vin, normalize_vin, normalize_plate
 from customers.serializers import CustomerSerializer
 from authentication.serializers import UserSerializer
 
@@ -19,6 +20,41 @@ class VehicleSerializer(serializers.ModelSerializer):
         model = Vehicle
         fields = '__all__'
         read_only_fields = ['created_at', 'updated_at']
+        # Filled from the VIN on intake when left blank.
+        extra_kwargs = {
+            'make': {'required': False},
+            'model': {'required': False},
+            'year': {'required': False},
+        }
+    
+    def to_internal_value(self, data):
+        # Normalize before the unique VIN check runs.
+        if data.get('vin'):
+            data = data.copy()
+            data['vin'] = normalize_vin(data['vin'])
+        return super().to_internal_value(data)
+    
+    def validate_license_plate(self, value):
+        duplicates = Vehicle.objects.filter(plate_normalized=normalize_plate(value))
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError('A vehicle with this license plate already exists.')
+        return value
+    
+    def validate(self, attrs):
+        if self.instance is None and attrs.get('vin'):
+            decoded = decode_vin(attrs['vin'])
+            for field in ('make', 'model', 'year'):
+                if not attrs.get(field) and decoded.get(field):
+                    attrs[field] = decoded[field]
+        missing = [
+            field for field in ('make', 'model', 'year')
+            if not attrs.get(field) and not getattr(self.instance, field, None)
+        ]
+        if missing:
+            raise serializers.ValidationError({field: 'This field is required.' for field in missing})
+        return attrs
     
     def get_customer_name(self, obj):
         return obj.customer.full_name
@@ -92,6 +128,34 @@ class VehicleHistorySerializer(serializers.ModelSerializer):
         return None
 
 
+class ServiceReminderSerializer(serializers.ModelSerializer):
+    """
+    Service reminder serializer.
+    """
+    vehicle_description = serializers.CharField(source='vehicle.full_description', read_only=True)
+    customer_name = serializers.CharField(source='customer.full_name', read_only=True)
+    
+    class Meta:
+        model = ServiceReminder
+        fields = '__all__'
+        read_only_fields = [
+            'vehicle', 'customer', 'last_service_date', 'due_date', 'due_mileage',
+            'daily_miles', 'reason', 'created_at', 'updated_at'
+        ]
+
+
+class ExpiryNotificationSerializer(serializers.ModelSerializer):
+    """
+    Expiry notification serializer.
+    """
+    customer_name = serializers.CharField(source='customer.full_name', read_only=True)
+    
+    class Meta:
+        model = ExpiryNotification
+        fields = '__all__'
+        read_only_fields = ['customer', 'window_start', 'window_end', 'first_expiry', 'items', 'created_at', 'updated_at']
+
+
 class VehicleDetailSerializer(VehicleSerializer):
     """
     Detailed vehicle serializer with related data.
@@ -102,4 +166,4 @@ class VehicleDetailSerializer(VehicleSerializer):
     history = VehicleHistorySerializer(many=True, read_only=True)
     
     class Meta(VehicleSerializer.Meta):
-        fields = VehicleSerializer.Meta.fields + ['customer', 'documents', 'photos', 'history']
+        fields = '__all__'
@@ -0,0 +1,107 @@
+"""
+Vehicle service timeline for Car ERP System.
+"""
+import base64
+import json
+from datetime import datetime
+from django.db import connection, models
+from django.db.models import F, Q, Value
+from job_orders.models import JobOrder, ArchivedJobOrder
+from .models import VehicleHistory
+
+# Entry kinds; the kind is also the tie-breaker after the date in the sort order.
+HISTORY = 'service_record'
+JOB_ORDER = 'job_order'
+ARCHIVED_JOB_ORDER = 'archived_job_order'
+
+
+def encode_cursor(entry):
+    """Opaque cursor pointing just after a timeline entry."""
+    payload = json.dumps([entry['date'].isoformat(), entry['kind'], entry['id']])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(date, kind, id) from a cursor; raises ValueError when it is malformed."""
+    try:
+        date, kind, entry_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(date), str(kind), int(entry_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError(f'Invalid cursor: {e}')
+
+
+def after_cursor(date_field, kind, cursor):
+    """
+    Keyset condition for one source: rows sorting after the cursor.
+
+    The timeline sorts by (date, kind, id) descending and every source has
+    a single kind, so the tuple comparison reduces to a date range plus an
+    id bound on the cursor's own source.
+    """
+    cursor_date, cursor_kind, cursor_id = cursor
+    if kind < cursor_kind:
+        return Q(**{f'{date_field}__lte': cursor_date})
+    if kind > cursor_kind:
+        return Q(**{f'{date_field}__lt': cursor_date})
+    return Q(**{f'{date_field}__lt': cursor_date}) | Q(**{date_field: cursor_date, 'id__lt': cursor_id})
+
+
+def timeline_source(queryset, kind, date_field, reference, job_status, amount, mileage, cursor, limit):
+    """
+    Project one source onto the shared timeline columns.
+
+    Each source is cut down to its own first `limit` rows before the union,
+    so the outer sort only ever sees a few pages' worth of rows rather than
+    the vehicle's whole history.
+    """
+    if cursor:
+        queryset = queryset.filter(after_cursor(date_field, kind, cursor))
+    rows = queryset.order_by().values(
+        'id',
+        kind=Value(kind, output_field=models.CharField()),
+        date=F(date_field),
+        title=F('service_type'),
+        reference=reference,
+        job_status=job_status,
+        amount=amount,
+        mileage=mileage,
+    )
+    if connection.features.supports_slicing_ordering_in_compound:
+        rows = rows.order_by('-date', '-id')[:limit]
+    return rows
+
+
+def vehicle_timeline(vehicle_id, limit=25, cursor=None):
+    """
+    One page of a vehicle's service records and job orders, newest first.
+
+    The three sources are combined with UNION ALL and sorted in the
+    database. Each page starts from the last entry of the previous one
+    (keyset pagination), so with the (vehicle, date) indexes every page
+    costs the same however far back the history goes.
+
+    Returns (entries, next cursor or None).
+    """
+    no_text = Value(None, output_field=models.CharField())
+    sources = [
+        timeline_source(
+            VehicleHistory.objects.filter(vehicle_id=vehicle_id), HISTORY, 'service_date',
+            reference=F('service_provider'), job_status=no_text, amount=F('cost'), mileage=F('mileage_at_service'),
+            cursor=cursor, limit=limit + 1,
+        ),
+        timeline_source(
+            JobOrder.objects.filter(vehicle_id=vehicle_id), JOB_ORDER, 'received_date',
+            reference=F('job_number'), job_status=F('status'), amount=F('actual_cost'),
+            mileage=Value(None, output_field=models.IntegerField()), cursor=cursor, limit=limit + 1,
+        ),
+        timeline_source(
+            ArchivedJobOrder.objects.filter(vehicle_id=vehicle_id), ARCHIVED_JOB_ORDER, 'received_date',
+            reference=F('job_number'), job_status=F('status'), amount=F('actual_cost'),
+            mileage=Value(None, output_field=models.IntegerField()), cursor=cursor, limit=limit + 1,
+        ),
+    ]
+    rows = list(
+        sources[0].union(*sources[1:], all=True).order_by('-date', '-kind', '-id')[:limit + 1]
+    )
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
@@ -8,6 +8,9 @@ urlpatterns = [
     # Vehicle endpoints
     path('', views.VehicleListView.as_view(), name='vehicle_list'),
     path('<int:pk>/', views.VehicleDetailView.as_view(), name='vehicle_detail'),
+    path('<int:pk>/timeline/', views.vehicle_timeline_view, name='vehicle_timeline'),
+    path('lookup/', views.vehicle_lookup, name='vehicle_lookup'),
+    path('vin/<str:vin>/decode/', views.decode_vehicle_vin, name='vehicle_vin_decode'),
     path('stats/', views.vehicle_stats, name='vehicle_stats'),
     
     # Vehicle document endpoints
@@ -18,6 +21,14 @@ urlpatterns = [
     path('photos/', views.VehiclePhotoListView.as_view(), name='vehicle_photo_list'),
     path('photos/<int:pk>/', views.VehiclePhotoDetailView.as_view(), name='vehicle_photo_detail'),
     
+    # Service reminder endpoints
+    path('reminders/', views.ServiceReminderListView.as_view(), name='service_reminder_list'),
+    path('reminders/<int:pk>/', views.ServiceReminderDetailView.as_view(), name='service_reminder_detail'),
+    
+    # Expiry notification endpoints
+    path('expiry-notifications/', views.ExpiryNotificationListView.as_view(), name='expiry_notification_list'),
+    path('expiry-notifications/<int:pk>/', views.ExpiryNotificationDetailView.as_view(), name='expiry_notification_detail'),
+    
     # Vehicle history endpoints
     path('history/', views.VehicleHistoryListView.as_view(), name='vehicle_history_list'),
     path('history/<int:pk>/', views.VehicleHistoryDetailView.as_view(), name='vehicle_history_detail'),
@@ -5,10 +5,12 @@ from rest_framework import generics, permissions, filters, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Vehicle, VehicleDocument, VehiclePhoto, VehicleHistory
+from .models import Vehicle, VehicleDocument, VehiclePhoto, VehicleHistory, ServiceReminder, ExpiryNotification
+from .timeline import vehicle_timeline, decode_cursor
+from .vin import decode_vin, normalize_vin, normalize_plate
 from .serializers import (
     VehicleSerializer, VehicleDetailSerializer, VehicleDocumentSerializer,
-    VehiclePhotoSerializer, VehicleHistorySerializer
+    VehiclePhotoSerializer, VehicleHistorySerializer, ServiceReminderSerializer, ExpiryNotificationSerializer
 )
 from authentication.models import User
 
@@ -16,6 +18,8 @@ from authentication.models import User
 class VehicleListView(generics.ListCreateAPIView):
     """
     List all vehicles or create a new vehicle.
+    
+    `vin` and `plate` filter by exact match on the normalized columns.
     """
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
@@ -29,9 +33,16 @@ class VehicleListView(generics.ListCreateAPIView):
     def get_queryset(self):
         """Filter vehicles based on user permissions."""
         user = self.request.user
-        if user.can_access_crm():
-            return Vehicle.objects.all()
-        return Vehicle.objects.none()
+        if not user.can_access_crm():
+            return Vehicle.objects.none()
+        queryset = Vehicle.objects.select_related('customer', 'created_by')
+        vin = self.request.query_params.get('vin')
+        if vin:
+            queryset = queryset.filter(vin=normalize_vin(vin))
+        plate = self.request.query_params.get('plate')
+        if plate:
+            queryset = queryset.filter(plate_normalized=normalize_plate(plate))
+        return queryset
     
     def perform_create(self, serializer):
         """Set the created_by field."""
@@ -174,6 +185,141 @@ class VehicleHistoryDetailView(generics.RetrieveUpdateDestroyAPIView):
         return VehicleHistory.objects.none()
 
 
+class ServiceReminderListView(generics.ListAPIView):
+    """
+    List predicted service reminders, soonest first.
+    """
+    serializer_class = ServiceReminderSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['status', 'reason', 'vehicle', 'customer']
+    ordering_fields = ['due_date', 'created_at']
+    ordering = ['due_date']
+    
+    def get_queryset(self):
+        """Filter reminders based on user permissions."""
+        user = self.request.user
+        if user.can_access_crm():
+            return ServiceReminder.objects.select_related('vehicle', 'customer')
+        return ServiceReminder.objects.none()
+
+
+class ServiceReminderDetailView(generics.RetrieveUpdateAPIView):
+    """
+    Retrieve a service reminder or update its status.
+    """
+    serializer_class = ServiceReminderSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        """Filter reminders based on user permissions."""
+        user = self.request.user
+        if user.can_access_crm():
+            return ServiceReminder.objects.select_related('vehicle', 'customer')
+        return ServiceReminder.objects.none()
+
+
+class ExpiryNotificationListView(generics.ListAPIView):
+    """
+    List consolidated insurance and document expiry notifications.
+    """
+    serializer_class = ExpiryNotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['status', 'customer']
+    ordering_fields = ['first_expiry', 'created_at']
+    ordering = ['first_expiry']
+    
+    def get_queryset(self):
+        """Filter notifications based on user permissions."""
+        user = self.request.user
+        if user.can_access_crm():
+            return ExpiryNotification.objects.select_related('customer')
+        return ExpiryNotification.objects.none()
+
+
+class ExpiryNotificationDetailView(generics.RetrieveUpdateAPIView):
+    """
+    Retrieve an expiry notification or update its status.
+    """
+    serializer_class = ExpiryNotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        """Filter notifications based on user permissions."""
+        user = self.request.user
+        if user.can_access_crm():
+            return ExpiryNotification.objects.select_related('customer')
+        return ExpiryNotification.objects.none()
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def vehicle_lookup(request):
+    """
+    Find a vehicle by exact VIN or license plate, in any spacing or case.
+    """
+    user = request.user
+    if not user.can_access_crm():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    term = request.query_params.get('q', '')
+    if not term.strip():
+        return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    vehicles = Vehicle.objects.select_related('customer', 'created_by')
+    vehicle = vehicles.filter(vin=normalize_vin(term)).first() or vehicles.filter(plate_normalized=normalize_plate(term)).first()
+    if vehicle is None:
+        return Response({'error': 'Vehicle not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(VehicleSerializer(vehicle).data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def decode_vehicle_vin(request, vin):
+    """
+    Decode make, year and origin from a VIN to pre-fill vehicle intake.
+    """
+    user = request.user
+    if not user.can_access_crm():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    decoded = decode_vin(vin)
+    if not decoded['valid']:
+        return Response({'error': 'A VIN has 17 letters and digits, without I, O or Q'}, status=status.HTTP_400_BAD_REQUEST)
+    existing = Vehicle.objects.filter(vin=decoded['vin']).values_list('id', flat=True).first()
+    return Response({**decoded, 'existing_vehicle': existing})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def vehicle_timeline_view(request, pk):
+    """
+    Get a vehicle's service records and job orders as one timeline, newest first.
+    
+    Pass the returned `next_cursor` as `cursor` to fetch the next page.
+    """
+    user = request.user
+    if not user.can_access_crm():
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    if not Vehicle.objects.filter(pk=pk).exists():
+        return Response({'error': 'Vehicle not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        limit = min(max(int(request.query_params.get('limit', 25)), 1), 100)
+        cursor = request.query_params.get('cursor')
+        cursor = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    entries, next_cursor = vehicle_timeline(pk, limit=limit, cursor=cursor)
+    return Response({
+        'results': entries,
+        'next_cursor': next_cursor,
+    })
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def vehicle_stats(request):
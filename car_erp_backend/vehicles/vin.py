@@ -0,0 +1,100 @@
+"""
+Offline VIN decoding and identifier normalization for Car ERP System.
+"""
+import csv
+import re
+from functools import lru_cache
+from pathlib import Path
+from django.utils import timezone
+
+WMI_TABLE = Path(__file__).resolve().parent / 'data' / 'wmi.csv'
+
+VIN_RE = re.compile(r'^[A-HJ-NPR-Z0-9]{17}$')
+
+# ISO 3779 check digit transliteration and position weights.
+TRANSLITERATION = {
+    **{str(digit): digit for digit in range(10)},
+    'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8,
+    'J': 1, 'K': 2, 'L': 3, 'M': 4, 'N': 5, 'P': 7, 'R': 9,
+    'S': 2, 'T': 3, 'U': 4, 'V': 5, 'W': 6, 'X': 7, 'Y': 8, 'Z': 9,
+}
+WEIGHTS = [8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2]
+
+# Position 10 model-year codes for the 1980-2009 cycle; the code repeats every 30 years.
+YEAR_CODES = {code: 1980 + offset for offset, code in enumerate('ABCDEFGHJKLMNPRSTVWXY123456789')}
+
+# Country or region by the first VIN character.
+REGIONS = {
+    **dict.fromkeys('ABCDEFGH', 'Africa'),
+    'J': 'Japan', 'K': 'South Korea', 'L': 'China', 'M': 'India',
+    **dict.fromkeys('NPR', 'Asia'),
+    'S': 'United Kingdom', 'T': 'Europe', 'V': 'France / Spain', 'W': 'Germany',
+    'X': 'Europe', 'Y': 'Sweden / Finland', 'Z': 'Italy',
+    '1': 'United States', '2': 'Canada', '3': 'Mexico', '4': 'United States', '5': 'United States',
+    '6': 'Australia', '7': 'New Zealand', '8': 'South America', '9': 'Brazil',
+}
+
+
+def normalize_vin(vin):
+    """Uppercase a VIN and drop spaces and dashes."""
+    return re.sub(r'[\s-]', '', vin or '').upper()
+
+
+def normalize_plate(plate):
+    """Uppercase a licence plate and keep only letters and digits."""
+    return re.sub(r'[^0-9A-Z]', '', (plate or '').upper())
+
+
+@lru_cache(maxsize=None)
+def wmi_table():
+    """World manufacturer identifiers mapped to makes, read once per process."""
+    with open(WMI_TABLE, newline='') as table:
+        return {row['wmi']: row['make'] for row in csv.DictReader(table)}
+
+
+def check_digit_valid(vin):
+    """Whether position 9 matches the ISO 3779 check digit (mandatory in North America)."""
+    total = sum(TRANSLITERATION[char] * weight for char, weight in zip(vin, WEIGHTS))
+    expected = total % 11
+    return vin[8] == ('X' if expected == 10 else str(expected))
+
+
+def model_year(vin):
+    """
+    Model year from position 10.
+
+    For North American VINs a letter in position 7 marks the 2010-2039
+    cycle and a digit the 1980-2009 one. Elsewhere the most recent year
+    that is not in the future is used.
+    """
+    year = YEAR_CODES.get(vin[9])
+    if year is None:
+        return None
+    if vin[0] in '12345':
+        return year + 30 if vin[6].isalpha() else year
+    while year + 30 <= timezone.now().year + 1:
+        year += 30
+    return year
+
+
+@lru_cache(maxsize=4096)
+def decode_vin(vin):
+    """
+    Decode make, model year and origin from a VIN without any network call.
+
+    The model is not encoded in a way that can be read without
+    manufacturer-specific tables, so it is left empty.
+    """
+    vin = normalize_vin(vin)
+    if not VIN_RE.match(vin):
+        return {'vin': vin, 'valid': False}
+    return {
+        'vin': vin,
+        'valid': True,
+        'check_digit_valid': check_digit_valid(vin),
+        'wmi': vin[:3],
+        'make': wmi_table().get(vin[:3]),
+        'model': None,
+        'year': model_year(vin),
+        'country': REGIONS.get(vin[0]),
+    }